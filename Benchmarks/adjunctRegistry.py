@@ -0,0 +1,89 @@
+"""
+Compares re-observing every glyph of the session when a font opens or closes
+with the incremental `AdjunctObjectsRegistry`.
+
+    python Benchmarks/adjunctRegistry.py
+"""
+from benchTools import loadModule, timeCall, printTable, MockFont
+
+registry = loadModule("RFGadgets/observers/registry.py")
+
+GLYPHS_PER_FONT = 3000
+SESSION_SIZES = (1, 4, 8, 12)
+
+
+class MockSubscriber:
+
+    def __init__(self):
+        self.observed = set()
+
+    def setAdjunctObjectsToObserve(self, objects):
+        self.observed = set(objects)
+
+    def addAdjunctObjectToObserve(self, obj):
+        self.observed.add(obj)
+
+    def removeObservedAdjunctObject(self, obj):
+        self.observed.discard(obj)
+
+
+def refreshAll(subscriber, fonts):
+    # the previous `LazyGlyphSubscriber._refreshObjectsToObserve`
+    objects = []
+    for f in fonts:
+        objects.extend([g for g in f])
+    subscriber.setAdjunctObjectsToObserve(objects)
+
+
+def main():
+    rows = []
+    for sessionSize in SESSION_SIZES:
+        fonts = [MockFont(GLYPHS_PER_FONT) for _ in range(sessionSize)]
+        newFont = MockFont(GLYPHS_PER_FONT)
+
+        subscriber = MockSubscriber()
+        refreshAll(subscriber, fonts)
+
+        def fullOpenAndClose():
+            refreshAll(subscriber, fonts + [newFont])
+            refreshAll(subscriber, fonts)
+
+        full = timeCall(fullOpenAndClose)
+
+        subscriber = MockSubscriber()
+        reg = registry.AdjunctObjectsRegistry(subscriber)
+        reg.reset(fonts)
+
+        def openAndClose():
+            reg.addFont(newFont)
+            reg.removeFont(newFont)
+
+        incremental = timeCall(openAndClose)
+        assert len(subscriber.observed) == sessionSize * (GLYPHS_PER_FONT + 1)
+
+        # glyph add/remove/rename events are synced per font
+        reg.addFont(newFont)
+        newFont.newGlyph("added")
+        assert reg.updateFont(newFont) == (["added"], [])
+        newFont.removeGlyph("added")
+        newFont.newGlyph("added.alt")
+        assert reg.updateFont(newFont) == (["added.alt"], ["added"])
+        rows.append((
+            sessionSize,
+            sessionSize * GLYPHS_PER_FONT,
+            f"{full:.2f}",
+            f"{incremental:.2f}",
+        ))
+    printTable(
+        (
+            "open fonts",
+            "glyphs",
+            "refresh all open+close ms",
+            "registry open+close ms",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
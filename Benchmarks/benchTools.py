@@ -0,0 +1,164 @@
+"""
+Helpers shared by the headless benchmarks. The benchmarks run outside of
+RoboFont, so modules are loaded directly from their file path to avoid
+importing `RFGadgets/__init__.py` which depends on `mojo`.
+"""
+import os
+import time
+import importlib.util
+
+LIB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "FontGadgets.roboFontExt",
+    "lib",
+)
+
+
+def loadModule(relativePath, name=None):
+    """
+    Loads a module from a path relative to the extension `lib` folder.
+    """
+    path = os.path.join(LIB_PATH, relativePath)
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def timeCall(func, *args, repeat=5, **kwargs):
+    """
+    Returns the best wall time of calling `func` in milliseconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def printTable(header, rows):
+    widths = [len(h) for h in header]
+    for row in rows:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], len(str(cell)))
+    line = "  ".join(h.ljust(w) for h, w in zip(header, widths))
+    print(line)
+    print("-" * len(line))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
+
+
+class MockPoint:
+    __slots__ = ("x", "y", "segmentType")
+
+    def __init__(self, x, y, segmentType=None):
+        self.x = x
+        self.y = y
+        self.segmentType = segmentType
+
+
+class MockComponent:
+
+    def __init__(self, baseGlyph, offset=(0, 0)):
+        self.baseGlyph = baseGlyph
+        self.transformation = (1, 0, 0, 1) + tuple(offset)
+
+    def moveBy(self, offset):
+        xx, xy, yx, yy, dx, dy = self.transformation
+        self.transformation = (xx, xy, yx, yy, dx + offset[0], dy + offset[1])
+
+
+class MockGlyph:
+    """
+    A glyph that behaves both as the fontParts wrapper and its naked object:
+    iterating it returns the contours as lists of `MockPoint`.
+    """
+
+    def __init__(self, name, font=None, contours=None, components=None):
+        self.name = name
+        self.font = font
+        self.contours = contours or []
+        self.components = components or []
+        self.width = 500
+
+    def naked(self):
+        return self
+
+    def __iter__(self):
+        return iter(self.contours)
+
+    def moveBy(self, offset):
+        dx, dy = offset
+        for contour in self.contours:
+            for point in contour:
+                point.x += dx
+                point.y += dy
+        for component in self.components:
+            component.moveBy(offset)
+
+    def draw(self, pen):
+        for contour in self.contours:
+            pen.moveTo((contour[-1].x, contour[-1].y))
+            offCurves = []
+            for point in contour:
+                if point.segmentType is None:
+                    offCurves.append((point.x, point.y))
+                    continue
+                if offCurves:
+                    pen.curveTo(*offCurves, (point.x, point.y))
+                    offCurves = []
+                else:
+                    pen.lineTo((point.x, point.y))
+            pen.closePath()
+
+
+def makeContour(x, y, size, pointCount):
+    """
+    Returns a closed contour of curve segments with `pointCount` points.
+    """
+    contour = []
+    segments = max(pointCount // 3, 1)
+    for i in range(segments * 3):
+        segmentType = "curve" if i % 3 == 2 else None
+        contour.append(MockPoint(x + (i * 7) % size, y + (i * 13) % size, segmentType))
+    return contour
+
+
+class MockFont:
+    """
+    A minimal fontParts-like font, containing only what the benchmarks need.
+    """
+
+    def __init__(self, glyphCount, prefix="glyph"):
+        self._glyphs = {}
+        for i in range(glyphCount):
+            name = f"{prefix}{i:05d}"
+            self._glyphs[name] = MockGlyph(name, self)
+
+    def __iter__(self):
+        return iter(self._glyphs.values())
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    def __contains__(self, name):
+        return name in self._glyphs
+
+    def __getitem__(self, name):
+        return self._glyphs[name]
+
+    def keys(self):
+        return self._glyphs.keys()
+
+    def newGlyph(self, name):
+        glyph = MockGlyph(name, self)
+        self._glyphs[name] = glyph
+        return glyph
+
+    def removeGlyph(self, name):
+        del self._glyphs[name]
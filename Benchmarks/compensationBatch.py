@@ -0,0 +1,227 @@
+"""
+Counts undo steps and change notifications when the components of many
+composites are compensated for one base glyph shift, with and without
+`GlyphChangeBatch`, and with the batch on a font without `font.undo`.
+
+    python Benchmarks/compensationBatch.py
+
+Each column shows: per glyph -> batched -> batched without `font.undo`.
+"""
+from benchTools import (
+    loadModule,
+    timeCall,
+    printTable,
+    MockFont,
+    MockGlyph,
+    MockComponent,
+)
+
+changeBatch = loadModule("RFGadgets/observers/changeBatch.py")
+
+COMPOSITE_COUNTS = (10, 100, 500)
+UNDO_TITLE = "Compensate position of component."
+
+
+class CountingDispatcher:
+    """
+    Like defcon, held notifications are posted once per observable and
+    notification name, and posted again when the hold is released, so the
+    holds that are left apply to them.
+    """
+
+    def __init__(self, counter):
+        self.counter = counter
+        self.holds = {}
+
+    def post(self, observable, notification):
+        # least specific hold first
+        for key in (None, notification):
+            if key in self.holds:
+                held = self.holds[key]
+                if (observable, notification) not in held:
+                    held.append((observable, notification))
+                return
+        if observable is self.counter:
+            self.counter.fontNotifications += 1
+        elif isinstance(observable, NotifyingComponent):
+            # the glyph observes its components
+            self.post(observable.glyph, "Glyph.Changed")
+        else:
+            self.counter.glyphNotifications += 1
+
+    def holdNotifications(self, notification=None):
+        self.holds[notification] = []
+
+    def releaseHeldNotifications(self, notification=None):
+        for observable, name in self.holds.pop(notification):
+            self.post(observable, name)
+
+
+class NotifyingComponent(MockComponent):
+
+    def __init__(self, baseGlyph, glyph):
+        super().__init__(baseGlyph)
+        self.glyph = glyph
+
+    def moveBy(self, offset):
+        super().moveBy(offset)
+        font = self.glyph.font
+        font.dispatcher.post(self, "Component.Changed")
+        font.dispatcher.post(font, "Layer.GlyphsChanged")
+
+
+class UndoGlyph(MockGlyph):
+
+    def __init__(self, name, font):
+        super().__init__(name, font)
+        self.preparedUndo = False
+
+    def prepareUndo(self, title):
+        assert not self.preparedUndo
+        self.preparedUndo = True
+        self.font.undoSteps += 1
+
+    def performUndo(self):
+        assert self.preparedUndo
+        self.preparedUndo = False
+
+    def changed(self):
+        self.font.dispatcher.post(self, "Glyph.Changed")
+
+
+class UndoFont(MockFont):
+    """
+    Font that counts undo steps and notifications, without grouping undo
+    (like a plain fontParts font). Like defcon, held notifications are
+    posted once per observable and notification name.
+    """
+
+    def __init__(self, compositeCount):
+        super().__init__(0)
+        self.undoSteps = 0
+        self.fontNotifications = 0
+        self.glyphNotifications = 0
+        self.dispatcher = CountingDispatcher(self)
+        self._glyphs["a"] = UndoGlyph("a", self)
+        for i in range(compositeCount):
+            name = f"a.comp{i}"
+            glyph = UndoGlyph(name, self)
+            glyph.components.append(NotifyingComponent("a", glyph))
+            self._glyphs[name] = glyph
+
+    def naked(self):
+        return self
+
+
+class GroupingUndoFont(UndoFont):
+    """
+    Font that groups undo with `font.undo`, like a RoboFont font.
+    """
+
+    def undo(self, title):
+        font = self
+
+        class UndoGroup:
+            def __enter__(self):
+                font.undoSteps += 1
+
+            def __exit__(self, *exc):
+                pass
+
+        return UndoGroup()
+
+
+def compensatePerGlyph(font, offset):
+    # the previous `_fixRelatedCompositeComponentPositions`
+    for glyph in list(font):
+        if not glyph.components:
+            continue
+        glyph.prepareUndo(UNDO_TITLE)
+        glyph.components[0].moveBy(offset)
+        glyph.changed()
+        glyph.performUndo()
+
+
+def compensateBatched(font, offset):
+    with changeBatch.GlyphChangeBatch(font, UNDO_TITLE) as batch:
+        for glyph in list(font):
+            if not glyph.components:
+                continue
+            batch.add(glyph)
+            glyph.components[0].moveBy(offset)
+
+
+def checkFontParts():
+    # the fallback on a plain fontParts font, without font.undo and without
+    # undo on the glyphs
+    from fontParts.fontshell import RFont
+
+    class Observer:
+
+        def __init__(self):
+            self.notifications = []
+
+        def glyphChanged(self, notification):
+            self.notifications.append(notification.object.name)
+
+    font = RFont()
+    font.newGlyph("a")
+    observer = Observer()
+    for i in range(3):
+        glyph = font.newGlyph(f"a.comp{i}")
+        glyph.appendComponent("a")
+        glyph.naked().addObserver(observer, "glyphChanged", "Glyph.Changed")
+    with changeBatch.GlyphChangeBatch(font, UNDO_TITLE) as batch:
+        for i in range(3):
+            glyph = font[f"a.comp{i}"]
+            batch.add(glyph)
+            glyph.components[0].moveBy((10, 0))
+    assert [font[f"a.comp{i}"].components[0].offset for i in range(3)] == [(10, 0)] * 3
+    # one Glyph.Changed per glyph
+    assert sorted(observer.notifications) == [f"a.comp{i}" for i in range(3)], observer.notifications
+
+
+def main():
+    checkFontParts()
+    rows = []
+    runs = (
+        (compensatePerGlyph, GroupingUndoFont),
+        (compensateBatched, GroupingUndoFont),
+        (compensateBatched, UndoFont),
+    )
+    for compositeCount in COMPOSITE_COUNTS:
+        results = []
+        for compensate, fontClass in runs:
+            font = fontClass(compositeCount)
+            compensate(font, (10, 0))
+            elapsed = timeCall(compensate, font, (10, 0), repeat=1)
+            # counters include the warm up call
+            results.append((
+                font.undoSteps // 2,
+                font.fontNotifications // 2,
+                font.glyphNotifications // 2,
+                f"{elapsed:.2f}",
+            ))
+        perGlyph, batched, fallback = results
+        # one undo step for the batch, one per glyph without font.undo,
+        # the notifications are batched the same way
+        assert batched[0] == 1 and fallback[0] == compositeCount
+        assert batched[1:3] == fallback[1:3] == (1, compositeCount)
+        assert not any(glyph.preparedUndo for glyph in font)
+        rows.append(
+            (compositeCount,) + tuple(" -> ".join(map(str, values)) for values in zip(*results))
+        )
+    printTable(
+        (
+            "composites",
+            "undo steps",
+            "font notifications",
+            "glyph notifications",
+            "ms",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Compares a full compile of synthetic compile records with compiles through
+`RFGadgets.compileCache` after a few glyphs are edited.
+
+The records have the shape of `font.iterSerializedDataForCompile()`. A glyph
+is compiled like ufo2ft does it for a TrueType font: the cubic curves are
+converted with cu2qu and the glyf data is built with fontTools. Without
+fontTools the coordinates are only packed and compressed, which is cheaper
+than a real compile. Some glyphs are composites of the edited glyphs, they
+have to be compiled again with their base glyphs.
+
+    python Benchmarks/compileCache.py
+"""
+import copy
+import time
+import zlib
+import struct
+import tempfile
+from benchTools import loadModule, printTable
+
+compileCache = loadModule("RFGadgets/compileCache.py")
+
+GLYPH_COUNT = 3000
+COMPOSITE_COUNT = 300
+EDITED_GLYPHS = 5
+# the glyphs at this step are edited, the composites use them as bases
+EDIT_STEP = 97
+
+
+def makeRecords(glyphCount):
+    records = [
+        ("section", "features", "feature liga {\n sub f i by f_i;\n} liga;\n" * 200),
+        ("section", "groups", {f"public.kern1.g{i}": [f"glyph{i:05d}"] for i in range(300)}),
+        ("section", "kerning", {(f"glyph{i:05d}", f"glyph{i + 1:05d}"): -10 for i in range(2000)}),
+        ("layer", "public.default", {"lib": {}, "tempLib": {}, "color": None}, True),
+    ]
+    for i in range(glyphCount):
+        contours = [
+            [(x * 7 % 500, x * 13 % 700, "curve" if x % 3 == 2 else None) for x in range(c, c + 30)]
+            for c in range(3)
+        ]
+        records.append(
+            ("glyph", f"glyph{i:05d}", {"name": f"glyph{i:05d}", "width": 500 + i % 50, "contours": contours})
+        )
+    for i in range(COMPOSITE_COUNT):
+        bases = (f"glyph{i * EDIT_STEP % glyphCount:05d}", f"glyph{i:05d}")
+        components = [
+            {"baseGlyph": base, "transformation": (1, 0, 0, 1, 0, 0), "identifier": None}
+            for base in bases
+        ]
+        records.append(
+            ("glyph", f"composite{i:03d}", {"name": f"composite{i:03d}", "width": 500, "contours": [], "components": components})
+        )
+    return records
+
+
+try:
+    from fontTools.pens.cu2quPen import Cu2QuPen
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+except ImportError:
+    TTGlyphPen = None
+
+
+def drawContours(contours, pen):
+    for contour in contours:
+        pen.moveTo(contour[-1][:2])
+        offCurves = []
+        for x, y, segmentType in contour:
+            if segmentType is None:
+                offCurves.append((x, y))
+            elif offCurves:
+                pen.curveTo(*offCurves, (x, y))
+                offCurves = []
+            else:
+                pen.lineTo((x, y))
+        pen.closePath()
+
+
+def compileRecord(record):
+    if record[0] != "glyph" or record[2].get("components"):
+        return zlib.compress(repr(record).encode("utf-8"), 9)
+    data = record[2]
+    if TTGlyphPen is not None:
+        ttPen = TTGlyphPen(None)
+        drawContours(data["contours"], Cu2QuPen(ttPen, max_err=1, reverse_direction=True))
+        return ttPen.glyph().compile(None)
+    packed = b"".join(
+        struct.pack(">hhB", x, y, 1 if t else 0)
+        for contour in data["contours"]
+        for x, y, t in contour
+    )
+    return zlib.compress(packed, 9)
+
+
+def edit(records, count):
+    records = copy.deepcopy(records)
+    for i in range(count):
+        kind, name, data = records[4 + i * EDIT_STEP]
+        data["contours"][0][0] = (1, 1, None)
+    return records
+
+
+def editedComposites(records, count):
+    edited = {records[4 + i * EDIT_STEP][1] for i in range(count)}
+    return {
+        f"glyph:{name}"
+        for kind, name, data, *_ in records[4:]
+        if any(c["baseGlyph"] in edited for c in data.get("components", ()))
+    }
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    records = makeRecords(GLYPH_COUNT)
+    edited = edit(records, EDITED_GLYPHS)
+    rows = []
+    elapsed, _ = timed(lambda: [compileRecord(r) for r in records])
+    rows.append(("no cache, full compile", f"{elapsed:.1f}", "-"))
+    with tempfile.TemporaryDirectory() as path:
+        cache = compileCache.CompileCache(path)
+        elapsed, (_, delta) = timed(compileCache.compileRecords, records, compileRecord, cache, "font")
+        rows.append(("cache, first compile", f"{elapsed:.1f}", str(delta)))
+        # a new cache object, like a compile after restarting RoboFont
+        cache.close()
+        cache = compileCache.CompileCache(path)
+        elapsed, (_, delta) = timed(compileCache.compileRecords, edited, compileRecord, cache, "font")
+        composites = editedComposites(records, EDITED_GLYPHS)
+        # the composites of the edited glyphs are compiled again
+        assert composites <= set(delta.changed), composites - set(delta.changed)
+        assert len(delta.changed) == EDITED_GLYPHS + len(composites)
+        rows.append(
+            (
+                f"cache, {EDITED_GLYPHS} glyphs edited ({len(composites)} composites)",
+                f"{elapsed:.1f}",
+                str(delta),
+            )
+        )
+        elapsed, (_, delta) = timed(compileCache.compileRecords, edited, compileRecord, cache, "font")
+        rows.append(("cache, nothing edited", f"{elapsed:.1f}", str(delta)))
+        cache.maxBytes = cache.totalBytes // 4
+        removed = cache.evict()
+        rows.append(
+            ("LRU limited to 1/4", "-", f"{removed} outputs removed, {len(cache)} kept")
+        )
+        cache.close()
+    printTable(("compile", "ms", "delta"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Measures the cost of fingerprinting the base glyphs of a synthetic font,
+compared to calculating their bounds through a pen (only if fontTools is
+available), and checks that the fingerprint tells a translation apart from a
+shape edit. The last column is the time to activate and deactivate
+`AutoOffsetComponents` with a font of as many base glyphs, which takes the
+fingerprints lazily.
+
+    python Benchmarks/compositeFingerprint.py
+"""
+from benchTools import (
+    loadModule,
+    timeCall,
+    printTable,
+    MockFont,
+    MockGlyph,
+    MockComponent,
+    makeContour,
+)
+
+from harness import loadSubscriberClass, replay
+from standins.fonts import makeSyntheticFont
+
+fingerprint = loadModule("RFGadgets/observers/fingerprint.py")
+glyphState = loadModule("RFGadgets/observers/glyphState.py")
+
+try:
+    from fontTools.pens.boundsPen import BoundsPen
+except ImportError:
+    BoundsPen = None
+
+GLYPH_COUNTS = (500, 3000)
+
+
+def makeFont(glyphCount):
+    # CJK-like glyphs with many contours, used as components in composites
+    font = MockFont(0)
+    for i in range(glyphCount):
+        name = f"uni{0x4E00 + i:04X}"
+        contours = [makeContour(j * 40, j * 30, 400, 24) for j in range(8)]
+        font._glyphs[name] = MockGlyph(name, font, contours)
+        composite = MockGlyph(f"{name}.comp", font, components=[MockComponent(name)])
+        font._glyphs[composite.name] = composite
+    return font
+
+
+def baseGlyphs(font):
+    return [g for g in font if not g.components]
+
+
+def fingerprintAll(glyphs):
+    store = glyphState.GlyphStateStore(fingerprint.FINGERPRINT_FIELDS)
+    for glyph in glyphs:
+        store.set(glyph.name, fingerprint.outlineFingerprint(glyph))
+    return store
+
+
+def boundsAll(glyphs):
+    bounds = {}
+    for glyph in glyphs:
+        pen = BoundsPen(None)
+        glyph.draw(pen)
+        bounds[glyph.name] = pen.bounds
+    return bounds
+
+
+def activate(subscriberClass, font):
+    replay(subscriberClass, [font], [])
+
+
+def checkDetection():
+    glyph = MockGlyph("a", contours=[makeContour(0, 0, 300, 12)])
+    before = fingerprint.outlineFingerprint(glyph)
+    glyph.moveBy((25, -10))
+    moved = fingerprint.outlineFingerprint(glyph)
+    assert fingerprint.translationOffset(before, moved) == (25, -10)
+    # swap two points: same bounds, different shape
+    contour = glyph.contours[0]
+    contour[0].x, contour[1].x = contour[1].x, contour[0].x
+    edited = fingerprint.outlineFingerprint(glyph)
+    assert fingerprint.translationOffset(moved, edited) is None
+
+
+def main():
+    checkDetection()
+    AutoOffsetComponents = loadSubscriberClass("compositeFixature", "AutoOffsetComponents")
+    rows = []
+    for glyphCount in GLYPH_COUNTS:
+        glyphs = baseGlyphs(makeFont(glyphCount))
+        fingerprintTime = timeCall(fingerprintAll, glyphs, repeat=3)
+        boundsTime = "n/a"
+        if BoundsPen is not None:
+            boundsTime = f"{timeCall(boundsAll, glyphs, repeat=3):.1f}"
+        font = makeSyntheticFont(glyphCount, glyphCount, contoursPerGlyph=8)
+        activationTime = timeCall(activate, AutoOffsetComponents, font, repeat=3)
+        rows.append(
+            (glyphCount, boundsTime, f"{fingerprintTime:.1f}", f"{activationTime:.1f}")
+        )
+    printTable(
+        ("base glyphs", "bounds ms", "fingerprint ms", "subscriber activation ms"), rows
+    )
+
+
+if __name__ == "__main__":
+    main()
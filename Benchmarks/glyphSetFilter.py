@@ -0,0 +1,108 @@
+"""
+Measures the latency of limiting the font overview to a glyph set against
+the size of the set: the previous `Name in {"..."}` literal predicate, the
+`Name IN %@` predicate with an `NSSet` of `RFGadgets.UI`, and a cache hit of
+`RFGadgets.glyphSetFilter.GlyphSetFilters` when switching back to a set.
+
+With PyObjC the real predicates are built and evaluated on the cells of a
+font. Without it, only the python side (formatting the literal, hashing the
+set) is measured and the evaluation of a cell is emulated: the literal is
+an array that is searched, the set argument is a hash lookup.
+
+    python Benchmarks/glyphSetFilter.py
+"""
+from benchTools import loadModule, timeCall, printTable
+
+glyphSetFilter = loadModule("RFGadgets/glyphSetFilter.py")
+
+FONT_GLYPH_COUNT = 30000
+SET_SIZES = (100, 1000, 5000, 20000)
+# cells evaluated to estimate the evaluation of the whole font without
+# PyObjC
+SAMPLE_CELLS = 2000
+
+try:
+    from Foundation import NSArray, NSPredicate, NSSet
+except ImportError:
+    NSPredicate = None
+
+
+def literalQuery(glyphSet):
+    # the previous `limitFontViewToGlyphSet`
+    queryText = 'Name in {"%s"}' % '", "'.join(glyphSet)
+    if NSPredicate is None:
+        return queryText
+    return NSPredicate.predicateWithFormat_(queryText)
+
+
+def setQuery(glyphSet):
+    if NSPredicate is None:
+        return frozenset(glyphSet)
+    names = NSSet.setWithArray_(list(glyphSet))
+    return NSPredicate.predicateWithFormat_argumentArray_("Name IN %@", [names])
+
+
+def evaluate(query, cells, literal):
+    if NSPredicate is not None:
+        return cells.filteredArrayUsingPredicate_(query)
+    names = query
+    if literal:
+        # an array literal is searched from the start for each cell
+        names = query[len('Name in {"'):-2].split('", "')
+    return [cell for cell in cells if cell["Name"] in names]
+
+
+def main():
+    fontNames = [f"glyph{i:05d}" for i in range(FONT_GLYPH_COUNT)]
+    cellCount = FONT_GLYPH_COUNT if NSPredicate is not None else SAMPLE_CELLS
+    cells = [{"Name": name} for name in fontNames[::FONT_GLYPH_COUNT // cellCount]]
+    if NSPredicate is not None:
+        cells = NSArray.arrayWithArray_(cells)
+    scale = FONT_GLYPH_COUNT / len(cells)
+    rows = []
+    for size in SET_SIZES:
+        glyphSet = fontNames[::FONT_GLYPH_COUNT // size][:size]
+        literal = literalQuery(glyphSet)
+        hashed = setQuery(glyphSet)
+        assert len(evaluate(literal, cells, True)) == len(evaluate(hashed, cells, False))
+        filters = glyphSetFilter.GlyphSetFilters(setQuery)
+        filters.predicate(glyphSet)
+        build = timeCall(literalQuery, glyphSet)
+        evaluateLiteral = timeCall(evaluate, literal, cells, True, repeat=3) * scale
+        buildSet = timeCall(setQuery, glyphSet)
+        evaluateSet = timeCall(evaluate, hashed, cells, False, repeat=3) * scale
+        hit = timeCall(filters.predicate, glyphSet)
+        # a saved glyph set kept as a frozenset is the key itself
+        frozenGlyphSet = frozenset(glyphSet)
+        filters = glyphSetFilter.GlyphSetFilters(setQuery)
+        filters.predicate(frozenGlyphSet)
+        frozenHit = timeCall(filters.predicate, frozenGlyphSet)
+        rows.append(
+            (
+                size,
+                f"{build:.2f}",
+                f"{evaluateLiteral:.1f}",
+                f"{buildSet:.2f}",
+                f"{evaluateSet:.2f}",
+                f"{hit:.2f}",
+                f"{frozenHit:.3f}",
+            )
+        )
+    mode = "PyObjC" if NSPredicate is not None else f"emulated, {len(cells)} cells scaled"
+    print(f"font of {FONT_GLYPH_COUNT} glyphs ({mode}), ms")
+    printTable(
+        (
+            "set size",
+            "literal build",
+            "literal filter",
+            "set build",
+            "set filter",
+            "LRU hit",
+            "LRU hit frozenset",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Compares the per font bookkeeping of a subscriber kept in a dict of glyph
+name to bounds tuple and a set of changed glyph names with
+`RFGadgets.observers.glyphState.GlyphStateStore` on fonts with tens of
+thousands of glyphs: memory, marking and iterating the changed glyphs,
+processing a part of them and renaming, removing and adding glyphs.
+
+The second table is the state of `AutoOffsetComponents`, which only keeps
+the fingerprints of the base glyphs: the previous fingerprint store with a
+set of changed glyphs and the store.
+
+    python Benchmarks/glyphState.py
+"""
+import time
+import tracemalloc
+from array import array
+from benchTools import loadModule, timeCall, printTable
+
+glyphState = loadModule("RFGadgets/observers/glyphState.py")
+
+GLYPH_COUNTS = (5000, 30000, 60000)
+BOUNDS_FIELDS = (("xMin", "d"), ("yMin", "d"), ("xMax", "d"), ("yMax", "d"))
+FINGERPRINT_FIELDS = (("pointCount", "q"), ("shapeHash", "q"), ("anchorX", "d"), ("anchorY", "d"))
+# every n-th glyph is changed
+DIRTY_STEP = 10
+EDIT_COUNT = 200
+# every n-th glyph is a base glyph of composites, every other base glyph is
+# changed
+BASE_STEP = 10
+
+
+def glyphOrder(count):
+    return [f"uni{0x4E00 + i:05X}" for i in range(count)]
+
+
+def bounds(i):
+    return (float(i % 50), -120.0, 900.0 + i % 7, 880.5)
+
+
+def fingerprint(i):
+    return (24 + i % 7, (i * 2654435761) % (1 << 62), float(i % 50), -120.0)
+
+
+class DictState:
+    # a dict of bounds and a set of changed glyphs
+
+    def __init__(self, names, fields=BOUNDS_FIELDS):
+        self.bounds = {}
+        self.changes = set()
+
+    def fill(self, names, values=bounds):
+        for i, name in enumerate(names):
+            self.bounds[name] = values(i)
+
+    def mark(self, names):
+        for name in names:
+            self.changes.add(name)
+
+    def iterDirty(self):
+        return sorted(self.changes)
+
+    def processPart(self, shouldProcess):
+        # rebuilt as a new set on each partial update
+        newChanges = set()
+        processed = []
+        for name in self.changes:
+            if shouldProcess(name):
+                processed.append(name)
+            else:
+                newChanges.add(name)
+        self.changes = newChanges
+        return processed
+
+    def edit(self, renames, removed, added):
+        for old, new in renames:
+            self.bounds[new] = self.bounds.pop(old)
+            if old in self.changes:
+                self.changes.discard(old)
+                self.changes.add(new)
+        for name in removed:
+            self.bounds.pop(name, None)
+            self.changes.discard(name)
+        for name in added:
+            self.bounds[name] = (0.0, 0.0, 0.0, 0.0)
+
+
+class StoreState:
+
+    def __init__(self, names, fields=BOUNDS_FIELDS):
+        self.store = glyphState.GlyphStateStore(fields)
+
+    def fill(self, names, values=bounds):
+        for i, name in enumerate(names):
+            self.store.set(name, values(i))
+
+    def mark(self, names):
+        for name in names:
+            self.store.markDirty(name)
+
+    def iterDirty(self):
+        return self.store.dirtyGlyphNames()
+
+    def processPart(self, shouldProcess):
+        return self.store.popDirty(shouldProcess)
+
+    def edit(self, renames, removed, added):
+        for old, new in renames:
+            self.store.rename(old, new)
+        for name in removed:
+            self.store.remove(name)
+        for name in added:
+            self.store.set(name, (0, 0, 0, 0))
+
+
+class FingerprintSetState:
+    # the state of `AutoOffsetComponents` before `GlyphStateStore`: the
+    # fingerprints of the base glyphs in typed arrays by slot and a set of
+    # changed glyphs
+
+    def __init__(self, names, fields=FINGERPRINT_FIELDS):
+        self.slots = {}
+        self.free = []
+        self.columns = [array(typecode) for _, typecode in fields]
+        self.changes = set()
+
+    def set(self, name, values):
+        slot = self.slots.get(name)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+            else:
+                slot = len(self.columns[0])
+                for column in self.columns:
+                    column.append(0)
+            self.slots[name] = slot
+        for column, value in zip(self.columns, values):
+            column[slot] = value
+
+    def fill(self, names, values=fingerprint):
+        for i, name in enumerate(names):
+            self.set(name, values(i))
+
+    def mark(self, names):
+        for name in names:
+            self.changes.add(name)
+
+    def iterDirty(self):
+        return sorted(self.changes)
+
+    def processPart(self, shouldProcess):
+        newChanges = set()
+        processed = []
+        for name in self.changes:
+            if shouldProcess(name):
+                processed.append(name)
+            else:
+                newChanges.add(name)
+        self.changes = newChanges
+        return processed
+
+    def edit(self, renames, removed, added):
+        # a rename came through as a remove and an add
+        for old, new in renames:
+            self.remove(old)
+        for name in removed:
+            self.remove(name)
+        for name in added:
+            self.set(name, (0, 0, 0, 0))
+
+    def remove(self, name):
+        slot = self.slots.pop(name, None)
+        if slot is not None:
+            self.free.append(slot)
+        self.changes.discard(name)
+
+
+def measureMemory(stateClass, names, dirty, filled=None, fields=BOUNDS_FIELDS, values=bounds):
+    if filled is None:
+        filled = names
+    tracemalloc.start()
+    state = stateClass(names, fields)
+    state.fill(filled, values)
+    state.mark(dirty)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, state
+
+
+def timeEdit(
+    stateClass, names, dirty, renames, removed, added,
+    filled=None, fields=BOUNDS_FIELDS, values=bounds, repeat=5,
+):
+    if filled is None:
+        filled = names
+    best = None
+    for _ in range(repeat):
+        state = stateClass(names, fields)
+        state.fill(filled, values)
+        state.mark(dirty)
+        start = time.perf_counter()
+        state.edit(renames, removed, added)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def checkSame(names, dirty):
+    old = DictState(names)
+    new = StoreState(names)
+    for state in (old, new):
+        state.fill(names)
+        state.mark(dirty)
+    assert old.iterDirty() == new.iterDirty()
+    renames = [(name, name + ".alt") for name in names[:EDIT_COUNT]]
+    removed = names[EDIT_COUNT : EDIT_COUNT * 2]
+    added = [f"new{i}" for i in range(EDIT_COUNT)]
+    old.edit(renames, removed, added)
+    new.edit(renames, removed, added)
+    assert sorted(old.iterDirty()) == sorted(new.iterDirty())
+    for name, values in old.bounds.items():
+        assert new.store.get(name) == values, name
+    assert sorted(new.store.glyphNames()) == sorted(old.bounds)
+
+
+def measureRow(
+    count, title, stateClass, names, dirty, edits,
+    filled=None, fields=BOUNDS_FIELDS, values=bounds,
+):
+    size, state = measureMemory(stateClass, names, dirty, filled, fields, values)
+    mark = timeCall(state.mark, dirty)
+    iterate = timeCall(state.iterDirty)
+
+    def processPart():
+        state.mark(dirty)
+        # the changes of the current glyph's bases, e.g. 1 in 20
+        state.processPart(lambda name: name.endswith("0"))
+
+    part = timeCall(processPart)
+    editTime = timeEdit(stateClass, names, dirty, *edits, filled, fields, values)
+    return (
+        count,
+        title,
+        f"{size / 1024:.0f}",
+        f"{size / count:.0f}",
+        f"{mark:.2f}",
+        f"{iterate:.2f}",
+        f"{part:.2f}",
+        f"{editTime:.2f}",
+    )
+
+
+def checkSameBases(names, bases, dirty, edits):
+    states = [
+        stateClass(names, FINGERPRINT_FIELDS)
+        for stateClass in (FingerprintSetState, StoreState)
+    ]
+    for state in states:
+        state.fill(bases, fingerprint)
+        state.mark(dirty)
+        state.edit(*edits)
+    renamed = {new for _, new in edits[0]}
+    # the store keeps the changes of the renamed glyphs under their new
+    # names, the previous state dropped them
+    old, new = states
+    assert sorted(n for n in new.iterDirty() if n not in renamed) == old.iterDirty()
+
+
+TABLE_HEADER = (
+    "glyphs",
+    "state",
+    "KiB",
+    "bytes per glyph",
+    "mark ms",
+    "dirty in order ms",
+    "partial update ms",
+    "rename/remove/add ms",
+)
+
+
+def main():
+    rows = []
+    baseRows = []
+    for count in GLYPH_COUNTS:
+        names = glyphOrder(count)
+        dirty = names[::DIRTY_STEP]
+        checkSame(names, dirty)
+        renames = [(name, name + ".alt") for name in names[:EDIT_COUNT]]
+        removed = names[EDIT_COUNT : EDIT_COUNT * 2]
+        added = [f"new{i}" for i in range(EDIT_COUNT)]
+        edits = (renames, removed, added)
+        for title, stateClass in (("dict + set", DictState), ("GlyphStateStore", StoreState)):
+            rows.append(measureRow(count, title, stateClass, names, dirty, edits))
+
+        bases = names[::BASE_STEP]
+        baseDirty = bases[::2]
+        renames = [(name, name + ".alt") for name in bases[:EDIT_COUNT]]
+        removed = bases[EDIT_COUNT : EDIT_COUNT * 2]
+        edits = (renames, removed, added)
+        checkSameBases(names, bases, baseDirty, edits)
+        for title, stateClass in (
+            ("fingerprints + set", FingerprintSetState),
+            ("GlyphStateStore", StoreState),
+        ):
+            baseRows.append(
+                measureRow(
+                    count, title, stateClass, names, baseDirty, edits,
+                    bases, FINGERPRINT_FIELDS, fingerprint,
+                )
+            )
+    print(
+        f"bounds for every glyph, every {DIRTY_STEP}th glyph changed, "
+        f"{EDIT_COUNT} renamed, removed and added glyphs"
+    )
+    printTable(TABLE_HEADER, rows)
+    print()
+    print(
+        f"fingerprints of every {BASE_STEP}th glyph (the base glyphs), every other "
+        f"base glyph changed, {EDIT_COUNT} renamed, removed and added base glyphs"
+    )
+    printTable(TABLE_HEADER, baseRows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Drives the subscribers of the extension headless with streams of events on
+synthetic fonts, and measures the latency of the callbacks, the time spent
+in the delayed updates and the memory.
+
+The RoboFont modules are replaced by the stand-ins of `Benchmarks/standins`.
+The subscribers get a `ManualClock`, so the delayed `updateChanges` and the
+idle time work run when the replay moves the clock forward, and a replay
+takes as long as the work of the subscriber, not as long as the session.
+Unlike RoboFont, the events are not coalesced by the `<callback>Delay`
+attributes, every event is delivered.
+"""
+import os
+import sys
+import time
+import importlib
+import statistics
+import tracemalloc
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+import standins
+
+standins.install()
+from benchTools import LIB_PATH
+
+SUBSCRIBERS_PATH = os.path.join(LIB_PATH, "RFGadgets", "observers", "subscribers")
+for path in (LIB_PATH, SUBSCRIBERS_PATH):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from mojo import roboFont
+from RFGadgets.observers.scheduler import ManualClock
+
+# seconds the clock is moved forward after the last event, so all the
+# delayed work is done
+SETTLE_TIME = 10.0
+
+
+class Event(NamedTuple):
+    """
+    An event of a stream. `font` is the index of the font in the fonts of
+    the replay and `action` is applied to the glyph (or the font) before the
+    event is delivered, e.g. `("moveBy", (10, 0))`, `("scaleBy", 1.1)`,
+    `("open",)` or `("close",)`.
+    """
+
+    time: float
+    name: str
+    font: Optional[int] = None
+    glyph: Optional[str] = None
+    action: Optional[Tuple] = None
+
+
+class ReplayResult(NamedTuple):
+    events: int
+    latencies: List[float]
+    deferred: float
+    peakMemory: Optional[int]
+    notifications: int
+    undoSteps: int
+
+    @property
+    def total(self) -> float:
+        return sum(self.latencies)
+
+    def row(self, title: str) -> Tuple:
+        latencies = sorted(self.latencies) or [0.0]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        peak = "-" if self.peakMemory is None else f"{self.peakMemory / 1024:.0f}"
+        return (
+            title,
+            self.events,
+            f"{self.total * 1000:.2f}",
+            f"{statistics.median(latencies) * 1e6:.0f}",
+            f"{p99 * 1e6:.0f}",
+            f"{latencies[-1] * 1000:.2f}",
+            f"{self.deferred * 1000:.2f}",
+            peak,
+            self.notifications,
+            self.undoSteps,
+        )
+
+
+RESULT_HEADER = (
+    "scenario",
+    "events",
+    "callbacks ms",
+    "p50 us",
+    "p99 us",
+    "max ms",
+    "deferred ms",
+    "peak KiB",
+    "notifications",
+    "undo steps",
+)
+
+
+def loadSubscriberClass(moduleName: str, className: str) -> type:
+    """
+    Imports a subscriber class from the subscribers folder.
+    """
+    module = importlib.import_module(moduleName)
+    return getattr(module, className)
+
+
+def _withClock(subscriberClass: type, clock: ManualClock) -> type:
+    # a subclass, so the clock of the class isn't changed for other replays
+    return type(
+        subscriberClass.__name__,
+        (subscriberClass,),
+        {"makeClock": lambda self: clock, "__module__": subscriberClass.__module__},
+    )
+
+
+def _applyAction(action: Tuple, font: Any, glyph: Any) -> None:
+    name = action[0]
+    if name == "open":
+        roboFont.setOpenFonts(roboFont.AllFonts() + [font])
+    elif name == "close":
+        pass  # the font is removed after the event
+    elif glyph is None:
+        # font actions, e.g. ("renameGlyph", oldName, newName)
+        getattr(font, name)(*action[1:])
+    else:
+        getattr(glyph, name)(*action[1:])
+
+
+def _info(event: Event, font: Any, glyph: Any) -> dict:
+    info = {"subscriberEventName": event.name, "lowLevelEvents": []}
+    if font is not None:
+        info["font"] = font
+    if glyph is not None:
+        info["glyph"] = glyph
+    return info
+
+
+def replay(
+    subscriberClass: type,
+    fonts: List[Any],
+    events: List[Event],
+    openFonts: Optional[List[Any]] = None,
+    realtime: bool = False,
+    measureMemory: bool = False,
+    beforeActivate: Optional[Callable[[type], None]] = None,
+) -> ReplayResult:
+    """
+    Activates the subscriber with the open fonts, delivers the events and
+    then moves the clock forward until the delayed work is done.
+
+    Args:
+        subscriberClass: The subscriber class, it is subclassed to use a
+            `ManualClock`.
+        fonts: The fonts the events refer to by index.
+        events: The `Event`s in order of time.
+        openFonts: The fonts that are open when the subscriber is activated,
+            defaults to all the fonts.
+        realtime (bool): Wait between the events as long as recorded,
+            otherwise the events are delivered right after each other.
+        measureMemory (bool): Trace the peak memory with `tracemalloc`, this
+            slows down the replay, so the latencies are not reliable.
+        beforeActivate: Called with the subclass before it's activated, e.g.
+            to enable profiling.
+    """
+    clock = ManualClock()
+    cls = _withClock(subscriberClass, clock)
+    if beforeActivate is not None:
+        beforeActivate(cls)
+    roboFont.setOpenFonts(list(fonts if openFonts is None else openFonts))
+    roboFont.setCurrentGlyph(None)
+    notificationsBefore = sum(f.dispatcher.posted for f in fonts)
+    undoBefore = sum(f.undoCount for f in fonts)
+    if measureMemory:
+        tracemalloc.start()
+    latencies = []
+    deferred = 0.0
+    try:
+        subscriber = cls.activate()
+        start = time.perf_counter()
+        for event in events:
+            if event.time > clock.now():
+                if realtime:
+                    time.sleep(max(0.0, start + event.time - time.perf_counter()))
+                begin = time.perf_counter()
+                clock.advance(event.time - clock.now())
+                deferred += time.perf_counter() - begin
+            font = fonts[event.font] if event.font is not None else None
+            glyph = font[event.glyph] if font is not None and event.glyph else None
+            if event.action is not None:
+                _applyAction(event.action, font, glyph)
+            if event.name in ("roboFontDidSwitchCurrentGlyph", "glyphEditorWillSetGlyph"):
+                roboFont.setCurrentGlyph(glyph)
+            callback = getattr(subscriber, event.name, None)
+            if callback is not None:
+                info = _info(event, font, glyph)
+                begin = time.perf_counter()
+                callback(info)
+                latencies.append(time.perf_counter() - begin)
+            if event.action is not None and event.action[0] == "close":
+                roboFont.setOpenFonts([f for f in roboFont.AllFonts() if f is not font])
+        begin = time.perf_counter()
+        clock.advance(SETTLE_TIME)
+        deferred += time.perf_counter() - begin
+        cls.deactivate()
+        peakMemory = None
+        if measureMemory:
+            peakMemory = tracemalloc.get_traced_memory()[1]
+    finally:
+        if measureMemory:
+            tracemalloc.stop()
+        if cls.isActive():
+            cls.deactivate()
+    return ReplayResult(
+        events=len(events),
+        latencies=latencies,
+        deferred=deferred,
+        peakMemory=peakMemory,
+        notifications=sum(f.dispatcher.posted for f in fonts) - notificationsBefore,
+        undoSteps=sum(f.undoCount for f in fonts) - undoBefore,
+    )
+
+
+def measure(
+    subscriberClass: type,
+    makeFonts: Callable[[], List[Any]],
+    makeEvents: Callable[[List[Any]], List[Event]],
+    **kwargs: Any,
+) -> ReplayResult:
+    """
+    Replays the events twice on new fonts: once for the latencies and once
+    with `tracemalloc` for the peak memory.
+    """
+    fonts = makeFonts()
+    result = replay(subscriberClass, fonts, makeEvents(fonts), **kwargs)
+    fonts = makeFonts()
+    memory = replay(
+        subscriberClass, fonts, makeEvents(fonts), measureMemory=True, **kwargs
+    )
+    return result._replace(peakMemory=memory.peakMemory)
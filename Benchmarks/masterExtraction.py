@@ -0,0 +1,86 @@
+"""
+Extracts the compile data of a family of synthetic UFOs with
+`RFGadgets.masterExtraction.extractCompileData`, font by font and with a
+growing number of worker processes, for each transport.
+
+Needs defcon and fontgadgets in the python path. The pool is only measured
+on a machine with more than one CPU.
+
+    python Benchmarks/masterExtraction.py
+    python Benchmarks/masterExtraction.py --masters 16 --glyphs 2000
+"""
+import os
+import sys
+import argparse
+import tempfile
+import standins
+from benchTools import LIB_PATH, timeCall, printTable
+
+sys.path.insert(0, LIB_PATH)
+standins.install()
+
+
+def makeFamily(folder, masterCount, glyphCount, layerCount):
+    import defcon
+
+    paths = []
+    for m in range(masterCount):
+        font = defcon.Font()
+        for l in range(layerCount - 1):
+            font.newLayer(f"layer{l}")
+        for i in range(glyphCount):
+            for layer in font.layers:
+                glyph = layer.newGlyph(f"glyph{i:05d}")
+                glyph.width = 400 + i % 300 + m * 10
+                pen = glyph.getPen()
+                for c in range(2):
+                    pen.moveTo((c * 100, 0))
+                    for j in range(1, 12):
+                        pen.curveTo((j * 10, j * 5 + m), (j * 12, j * 7), (j * 15 + c, j * 9))
+                    pen.closePath()
+        for i in range(0, glyphCount - 1, 3):
+            font.kerning[(f"glyph{i:05d}", f"glyph{i + 1:05d}")] = -10 - m
+        path = os.path.join(folder, f"Master{m}.ufo")
+        font.save(path)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--masters", type=int, default=8)
+    parser.add_argument("--glyphs", type=int, default=1000)
+    parser.add_argument("--layers", type=int, default=2)
+    args = parser.parse_args()
+    try:
+        from RFGadgets.masterExtraction import TRANSPORTS, extractCompileData
+        import RFGadgets.font  # noqa: F401
+        import defcon  # noqa: F401
+    except ImportError as e:
+        print(f"skipped, {e}")
+        return
+    cpuCount = os.cpu_count() or 1
+    processCounts = sorted({1, 2, 4, 8, 16, cpuCount} & set(range(1, cpuCount + 1)))
+    with tempfile.TemporaryDirectory() as folder:
+        paths = makeFamily(folder, args.masters, args.glyphs, args.layers)
+        rows = []
+        serial = timeCall(lambda: [defcon.Font(p).serializedDataForCompile() for p in paths], repeat=3)
+        rows.append(("font by font", "-", f"{serial:.0f}", "1.00"))
+        for transport in TRANSPORTS:
+            for processes in processCounts:
+                if processes == 1 and transport != TRANSPORTS[0]:
+                    continue
+                elapsed = timeCall(
+                    extractCompileData, paths, processes=processes, transport=transport, repeat=3
+                )
+                rows.append(
+                    (transport, processes, f"{elapsed:.0f}", f"{serial / elapsed:.2f}")
+                )
+    print(f"{args.masters} masters, {args.glyphs} glyphs, {args.layers} layers, {cpuCount} CPUs")
+    printTable(("transport", "processes", "ms", "speedup"), rows)
+    if cpuCount == 1:
+        print("the process pool is not measured with 1 CPU")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Replays a script that moves base glyphs in all the masters of a family
+through `AutoOffsetComponents`, with the pending changes processed font by
+font and glyph by glyph, and with the same glyph compared across all the
+masters and compensated in one batch per font
+(`AutoOffsetComponents.synchronizeMasters`).
+
+    python Benchmarks/masterSync.py
+"""
+from harness import Event, loadSubscriberClass, replay
+from benchTools import printTable
+from standins.fonts import makeSyntheticFamily
+
+MASTER_COUNT = 16
+CHANGED_GLYPH_COUNTS = (1, 20, 200)
+GLYPH_COUNT = 400
+COMPOSITE_COUNT = 300
+
+
+def scriptMovesMasters(fonts, glyphCount):
+    # a script moves the glyphs in all the masters, then the fonts are saved
+    events = []
+    for i, font in enumerate(fonts):
+        for glyphName in font.glyphOrder[:glyphCount]:
+            events.append(
+                Event(0.0, "adjunctGlyphDidChangeOutline", i, glyphName, ("moveBy", (20, 0)))
+            )
+    for i in range(len(fonts)):
+        events.append(Event(1.0, "fontDocumentWillSave", i))
+    return events
+
+
+def run(subscriberClass, glyphCount):
+    fonts = makeSyntheticFamily(
+        MASTER_COUNT, glyphCount=GLYPH_COUNT, compositeCount=COMPOSITE_COUNT
+    )
+    before = [[c.offset for g in font for c in g.components] for font in fonts]
+    result = replay(subscriberClass, fonts, scriptMovesMasters(fonts, glyphCount))
+    after = [[c.offset for g in font for c in g.components] for font in fonts]
+    moved = sum(a != b for font in zip(before, after) for a, b in zip(*font))
+    return result, moved
+
+
+def main():
+    AutoOffsetComponents = loadSubscriberClass("compositeFixature", "AutoOffsetComponents")
+    modes = (
+        ("font by font", type("Serial", (AutoOffsetComponents,), {"synchronizeMasters": False})),
+        ("synchronized", AutoOffsetComponents),
+    )
+    rows = []
+    for glyphCount in CHANGED_GLYPH_COUNTS:
+        results = {}
+        for title, subscriberClass in modes:
+            # warm up, then keep the faster of two runs
+            run(subscriberClass, glyphCount)
+            results[title] = min(
+                (run(subscriberClass, glyphCount) for _ in range(2)),
+                key=lambda r: r[0].deferred + r[0].total,
+            )
+        (serial, serialMoved), (synced, syncedMoved) = results.values()
+        assert serialMoved == syncedMoved, (serialMoved, syncedMoved)
+        rows.append(
+            (
+                glyphCount,
+                MASTER_COUNT,
+                syncedMoved,
+                f"{(serial.total + serial.deferred) * 1000:.2f}",
+                f"{(synced.total + synced.deferred) * 1000:.2f}",
+                serial.undoSteps,
+                synced.undoSteps,
+                serial.notifications,
+                synced.notifications,
+            )
+        )
+    printTable(
+        (
+            "changed glyphs",
+            "masters",
+            "moved components",
+            "font by font ms",
+            "synchronized ms",
+            "font by font undo",
+            "synchronized undo",
+            "font by font notifications",
+            "synchronized notifications",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
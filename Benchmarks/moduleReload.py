@@ -0,0 +1,161 @@
+"""
+Compares reloading a generated package with the previous `reloadSubModules`
+(every submodule found with `dir`, in discovery order) with
+`RFGadgets.moduleReloader.ModuleReloader` after editing a leaf module and a
+core module that most modules import, and after editing a module that was
+imported without bytecode, before the reloader was made.
+
+    python Benchmarks/moduleReload.py
+"""
+import os
+import sys
+import time
+import tempfile
+import importlib
+from types import ModuleType
+from benchTools import loadModule, printTable
+
+moduleReloader = loadModule("RFGadgets/moduleReloader.py")
+
+PACKAGE = "fakegadgets"
+LAYERS = 4
+MODULES_PER_LAYER = 30
+# work done when a module is executed, like the font_method registrations
+# and the tables built by the fontgadgets modules
+FUNCTIONS_PER_MODULE = 150
+
+
+def writeModule(path, layer, index, version=0):
+    lines = [f"VERSION = {version}"]
+    if layer:
+        # each module imports a few modules of the layer below
+        for k in range(3):
+            lines.append(f"from {PACKAGE}.layer{layer - 1}.m{(index + k) % MODULES_PER_LAYER} import VERSION as V{k}")
+    else:
+        lines.append(f"from {PACKAGE} import core")
+    for i in range(FUNCTIONS_PER_MODULE):
+        lines.append(f"def function{i}(x):\n    return x * {i} + VERSION")
+    lines.append("TABLE = {f'key{i}': i for i in range(2000)}")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def makePackage(root):
+    packagePath = os.path.join(root, PACKAGE)
+    os.makedirs(packagePath)
+    with open(os.path.join(packagePath, "core.py"), "w") as f:
+        f.write("CORE = 0\n")
+    init = ["from . import core"]
+    for layer in range(LAYERS):
+        layerPath = os.path.join(packagePath, f"layer{layer}")
+        os.makedirs(layerPath)
+        names = []
+        for index in range(MODULES_PER_LAYER):
+            writeModule(os.path.join(layerPath, f"m{index}.py"), layer, index)
+            names.append(f"m{index}")
+        with open(os.path.join(layerPath, "__init__.py"), "w") as f:
+            f.write("\n".join(f"from . import {name}" for name in names) + "\n")
+        init.append(f"from . import layer{layer}")
+    with open(os.path.join(packagePath, "__init__.py"), "w") as f:
+        f.write("\n".join(init) + "\n")
+    return packagePath
+
+
+def oldReloadSubModules(moduleName, skipSubModules, skipPaths):
+    # the previous `RFGadgets.tools.reloadSubModules`
+    module = importlib.import_module(moduleName)
+    for attributeName in dir(module):
+        if attributeName in skipSubModules:
+            continue
+        fullAttrName = f"{module.__name__}.{attributeName}"
+        attribute = getattr(module, attributeName)
+        if isinstance(attribute, ModuleType):
+            if not hasattr(attribute, '__file__') or attribute.__file__ in skipPaths:
+                continue
+            skipPaths.add(attribute.__file__)
+            skipSubModules.add(fullAttrName)
+            skipSubModules, skipPaths = oldReloadSubModules(fullAttrName, skipSubModules, skipPaths)
+    importlib.reload(module)
+    return skipSubModules, skipPaths
+
+
+def touch(path, layer, index, version):
+    writeModule(path, layer, index, version)
+    # a new mtime even on file systems with a coarse resolution
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000 * version))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    dontWriteBytecode = sys.dont_write_bytecode
+    # the bytecode is written, unless PYTHONDONTWRITEBYTECODE is set
+    sys.dont_write_bytecode = False
+    with tempfile.TemporaryDirectory() as root:
+        packagePath = makePackage(root)
+        sys.path.insert(0, root)
+        importlib.import_module(PACKAGE)
+        moduleCount = len([n for n in sys.modules if n.startswith(PACKAGE)])
+        rows = []
+        elapsed, _ = timed(oldReloadSubModules, PACKAGE, set(), set())
+        rows.append(("previous reloadSubModules", "-", "all", f"{elapsed:.1f}"))
+
+        reloader = moduleReloader.ModuleReloader([PACKAGE])
+        elapsed, report = timed(reloader.reload)
+        rows.append(("ModuleReloader, nothing changed", "-", len(report.timings), f"{elapsed:.1f}"))
+
+        leaf = os.path.join(packagePath, f"layer{LAYERS - 1}", "m0.py")
+        touch(leaf, LAYERS - 1, 0, 1)
+        elapsed, report = timed(reloader.reload)
+        rows.append(("ModuleReloader, leaf edited", len(report.changed), len(report.timings), f"{elapsed:.1f}"))
+
+        base = os.path.join(packagePath, "layer0", "m0.py")
+        touch(base, 0, 0, 2)
+        elapsed, report = timed(reloader.reload)
+        rows.append(("ModuleReloader, base module edited", len(report.changed), len(report.timings), f"{elapsed:.1f}"))
+        # the dependents see the new value
+        top = sys.modules[f"{PACKAGE}.layer1.m{MODULES_PER_LAYER - 2}"]
+        assert top.V2 == 2, top.V2
+        order = [name for name, _ in report.timings]
+        assert order.index(f"{PACKAGE}.layer0.m0") < order.index(f"{PACKAGE}.layer1.m0")
+        slowest = max(report.timings, key=lambda t: t[1])
+
+        # saved again without changes
+        stat = os.stat(base)
+        os.utime(base, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+        elapsed, report = timed(reloader.reload)
+        rows.append(("ModuleReloader, saved unchanged", len(report.changed), len(report.timings), f"{elapsed:.1f}"))
+
+        # imported again without bytecode, then edited before the first reload
+        for name in [n for n in sys.modules if n.startswith(PACKAGE)]:
+            del sys.modules[name]
+        for folder, _, _ in os.walk(packagePath):
+            for cacheFile in os.listdir(folder):
+                if cacheFile.endswith(".pyc"):
+                    os.remove(os.path.join(folder, cacheFile))
+        sys.dont_write_bytecode = True
+        try:
+            importlib.import_module(PACKAGE)
+            reloader = moduleReloader.ModuleReloader([PACKAGE])
+            touch(leaf, LAYERS - 1, 0, 3)
+            elapsed, report = timed(reloader.reload)
+            rows.append(("ModuleReloader, no bytecode, first reload", len(report.changed), len(report.timings), f"{elapsed:.1f}"))
+            assert sys.modules[f"{PACKAGE}.layer{LAYERS - 1}.m0"].VERSION == 3
+            touch(leaf, LAYERS - 1, 0, 4)
+            elapsed, report = timed(reloader.reload)
+            rows.append(("ModuleReloader, no bytecode, leaf edited", len(report.changed), len(report.timings), f"{elapsed:.1f}"))
+        finally:
+            sys.dont_write_bytecode = dontWriteBytecode
+        sys.path.remove(root)
+    print(f"{moduleCount} modules in {PACKAGE}")
+    printTable(("reload", "changed", "reloaded", "ms"), rows)
+    print(f"slowest reload of the base edit: {slowest[0]} {slowest[1] / 1e6:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
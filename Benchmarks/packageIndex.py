@@ -0,0 +1,86 @@
+"""
+Compares the startup package check of `installFontGadgets.py` before and
+after the installed package index, on a folder of fake distributions.
+
+    python Benchmarks/packageIndex.py
+"""
+import os
+import sys
+import tempfile
+from importlib import metadata
+from benchTools import loadModule, timeCall, printTable
+
+packageIndex = loadModule("RFGadgets/packageIndex.py")
+
+DISTRIBUTION_COUNT = 300
+# import names checked at startup, 'fontgadgets' is missing on purpose
+CHECKED_NAMES = ["git", "gitdb", "fontGit", "bidi", "uharfbuzz", "fontgadgets"]
+
+
+def makeDistributions(folder, count):
+    names = [f"package_{i}" for i in range(count)]
+    names += ["GitPython:git", "gitdb", "fontGit", "python_bidi:bidi", "uharfbuzz"]
+    for entry in names:
+        distName, _, importName = entry.partition(":")
+        distInfo = os.path.join(folder, f"{distName}-1.0.dist-info")
+        os.makedirs(distInfo)
+        with open(os.path.join(distInfo, "METADATA"), "w") as f:
+            f.write(f"Metadata-Version: 2.1\nName: {distName}\nVersion: 1.0\n")
+        with open(os.path.join(distInfo, "top_level.txt"), "w") as f:
+            f.write(f"{importName or distName}\n")
+
+
+def oldIsPackageInstalled(target_path, package_name):
+    # the previous `PIPManager._is_package_installed`
+    original_sys_path = sys.path[:]
+    if target_path not in sys.path:
+        sys.path.insert(0, target_path)
+    found = False
+    try:
+        metadata.distribution(package_name)
+        found = True
+    except metadata.PackageNotFoundError:
+        for dist in metadata.distributions():
+            try:
+                top_levels = dist.read_text('top_level.txt')
+                if top_levels and package_name in top_levels.split():
+                    found = True
+                    break
+            except Exception:
+                continue
+    finally:
+        sys.path[:] = original_sys_path
+    return found
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        target = os.path.join(root, "Python")
+        os.makedirs(target)
+        makeDistributions(target, DISTRIBUTION_COUNT)
+        cachePath = os.path.join(root, "index.json")
+
+        def old():
+            return [oldIsPackageInstalled(target, n) for n in CHECKED_NAMES]
+
+        def cold():
+            index = packageIndex.InstalledPackageIndex(target, cachePath)
+            index.invalidate()
+            return [index.is_installed(n) for n in CHECKED_NAMES]
+
+        def warm():
+            index = packageIndex.InstalledPackageIndex(target, cachePath)
+            return [index.is_installed(n) for n in CHECKED_NAMES]
+
+        assert old() == cold() == warm(), (old(), cold(), warm())
+        rows = [
+            ("previous check", f"{timeCall(old):.2f}"),
+            ("index, cold cache", f"{timeCall(cold):.2f}"),
+            ("index, warm cache", f"{timeCall(warm):.2f}"),
+        ]
+        print(f"{DISTRIBUTION_COUNT} distributions in the target folder, results: {warm()}")
+        printTable(("startup check", "ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
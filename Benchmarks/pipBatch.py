@@ -0,0 +1,109 @@
+"""
+Compares a cold install of several packages with one pip run per package and
+with `PIPManager.install_packages`, using a local wheelhouse so the timings
+don't depend on the network.
+
+    python Benchmarks/pipBatch.py
+"""
+import os
+import sys
+import time
+import types
+import zipfile
+import logging
+import tempfile
+from benchTools import LIB_PATH, loadModule, printTable
+
+PACKAGE_COUNT = 6
+
+
+def makeWheel(folder, name, version="1.0"):
+    distInfo = f"{name}-{version}.dist-info"
+    files = {
+        f"{name}/__init__.py": "",
+        f"{distInfo}/METADATA": f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n",
+        f"{distInfo}/WHEEL": "Wheel-Version: 1.0\nGenerator: bench\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+        f"{distInfo}/top_level.txt": f"{name}\n",
+    }
+    record = "".join(f"{path},,\n" for path in files) + f"{distInfo}/RECORD,,\n"
+    files[f"{distInfo}/RECORD"] = record
+    path = os.path.join(folder, f"{name}-{version}-py3-none-any.whl")
+    with zipfile.ZipFile(path, "w") as whl:
+        for arcname, data in files.items():
+            whl.writestr(arcname, data)
+
+
+def loadPipModule(appSupportFolder):
+    # outside of RoboFont: AppKit only has to provide the application support
+    # folder, and the `RFGadgets` package is created without its `__init__`
+    # which imports the UI
+    appKit = types.ModuleType("AppKit")
+    appKit.NSApplicationSupportDirectory = 14
+    appKit.NSUserDomainMask = 1
+    appKit.NSSearchPathForDirectoriesInDomains = lambda *args: [appSupportFolder]
+    sys.modules.setdefault("AppKit", appKit)
+    package = types.ModuleType("RFGadgets")
+    package.__path__ = [os.path.join(LIB_PATH, "RFGadgets")]
+    sys.modules.setdefault("RFGadgets", package)
+    return loadModule("RFGadgets/pip.py", "RFGadgets.pip")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        wheelhouse = os.path.join(root, "wheelhouse")
+        os.makedirs(wheelhouse)
+        specs = [f"benchpackage{i}" for i in range(PACKAGE_COUNT)]
+        for name in specs:
+            makeWheel(wheelhouse, name)
+        os.environ["PIP_NO_INDEX"] = "1"
+        os.environ["PIP_FIND_LINKS"] = wheelhouse
+        os.environ["PIP_DISABLE_PIP_VERSION_CHECK"] = "1"
+
+        pip = loadPipModule(os.path.join(root, "sequential"))
+        pip.logger.setLevel(logging.WARNING)
+        manager = pip.pipManager
+        start = time.perf_counter()
+        sequential = [manager.install_package(s, install_dependencies=False) for s in specs]
+        sequentialTime = time.perf_counter() - start
+        assert all(sequential)
+
+        def setTarget(folderName):
+            manager.target_path = os.path.join(root, folderName, "Python")
+            manager.package_index.target_path = manager.target_path
+            os.makedirs(manager.target_path)
+
+        setTarget("batch")
+        progress = []
+        start = time.perf_counter()
+        results = manager.install_packages(
+            specs,
+            install_dependencies=False,
+            progress_callback=lambda spec, status: progress.append(status),
+        )
+        batchTime = time.perf_counter() - start
+        assert all(results.values()) and progress.count("installed") == len(specs)
+        assert all(manager._is_package_installed(s) for s in specs)
+
+        # the wheels are kept in the cache, then installed again offline
+        cache = os.path.join(root, "wheelCache")
+        setTarget("cacheBuild")
+        manager.install_packages(specs, install_dependencies=False, wheel_cache=cache)
+        del os.environ["PIP_FIND_LINKS"]
+        setTarget("offline")
+        start = time.perf_counter()
+        results = manager.install_packages(specs, install_dependencies=False, wheel_cache=cache)
+        offlineTime = time.perf_counter() - start
+        assert all(results.values())
+
+        printTable(
+            ("cold install", f"{PACKAGE_COUNT} packages s"),
+            [
+                ("one pip run per package", f"{sequentialTime:.2f}"),
+                ("install_packages", f"{batchTime:.2f}"),
+                ("install_packages from wheel cache", f"{offlineTime:.2f}"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Measures the overhead that the timing decorators add to a cheap function.
+
+    python Benchmarks/profiler.py
+"""
+import time
+import logging
+from benchTools import loadModule, timeCall, printTable
+
+profiler = loadModule("RFGadgets/profiler.py")
+
+CALLS = 100_000
+logger = logging.getLogger("bench.timer")
+logger.addHandler(logging.NullHandler())
+
+
+def bounds(values=(1, 5, 3, 9, 2)):
+    return min(values), max(values)
+
+
+def oldTimeit(method):
+    # the previous `RFGadgets.tools.timeit` without printing
+    def timed(*args, **kw):
+        logger.setLevel(logging.DEBUG)
+        ts = time.time()
+        result = method(*args, **kw)
+        te = time.time()
+        logger.debug('%r  %2.2f ms' % (method.__name__, (te - ts) * 1000))
+        logger.setLevel(logging.WARNING)
+        return result
+    return timed
+
+
+def callMany(func):
+    for _ in range(CALLS):
+        func()
+
+
+def main():
+    variants = [
+        ("bare", bounds),
+        ("old timeit", oldTimeit(bounds)),
+        ("profiled", profiler.profiled("bounds")(bounds)),
+        ("profiled sampleEvery=100", profiler.profiled("sampled", sampleEvery=100)(bounds)),
+        ("profiled enabled=False", profiler.profiled(enabled=False)(bounds)),
+    ]
+    base = timeCall(callMany, bounds, repeat=3)
+    rows = []
+    for title, func in variants:
+        elapsed = timeCall(callMany, func, repeat=3)
+        rows.append((title, f"{elapsed:.1f}", f"{(elapsed - base) / CALLS * 1e6:.0f}"))
+    printTable(("variant", f"{CALLS} calls ms", "overhead ns/call"), rows)
+    print()
+    print(profiler.registry.toCSV())
+
+
+if __name__ == "__main__":
+    main()
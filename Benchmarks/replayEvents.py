@@ -0,0 +1,133 @@
+"""
+Replays an event recording of a subscriber (see
+`BaseSubscriber.startRecording`) headless on synthetic fonts, to reproduce
+a slow editing session as a benchmark.
+
+The fonts of the recording are rebuilt with the recorded glyph names as
+base glyphs, each used by `--composites` composites. The recording doesn't
+contain the edits, with `--nudge` the glyph of each outline change is moved,
+so the changes have something to compensate.
+
+    python Benchmarks/replayEvents.py AutoOffsetComponents.events.json.gz
+    python Benchmarks/replayEvents.py session.events.json.gz --subscriber compositeFixature:AutoOffsetComponents --nudge 2 --realtime
+    python Benchmarks/replayEvents.py --demo demo.events.json.gz
+"""
+import os
+import argparse
+from harness import Event, RESULT_HEADER, SUBSCRIBERS_PATH, loadSubscriberClass, replay
+from benchTools import printTable
+from RFGadgets.observers.manifest import readSubscriberManifests
+from RFGadgets.observers.recording import EventRecorder, loadRecording
+from standins.fonts import Component, Font, Glyph, makeContour
+
+OPEN_EVENTS = {"fontDocumentDidOpen", "fontDocumentWillOpen"}
+CLOSE_EVENTS = {"fontDocumentWillClose", "fontDocumentDidClose"}
+
+
+def findSubscriberClass(className):
+    for fileName in sorted(os.listdir(SUBSCRIBERS_PATH)):
+        if not fileName.endswith(".py") or fileName.startswith("_"):
+            continue
+        moduleName = fileName[:-3]
+        with open(os.path.join(SUBSCRIBERS_PATH, fileName), encoding="utf-8") as f:
+            manifests = readSubscriberManifests(f.read(), moduleName)
+        if any(m.className == className for m in manifests):
+            return loadSubscriberClass(moduleName, className)
+    raise LookupError(f"Subscriber class {className!r} not found")
+
+
+def makeFonts(recording, compositesPerGlyph):
+    glyphNames = [dict() for _ in recording.fonts]
+    for event in recording.events:
+        if event.font is not None and event.glyph is not None:
+            glyphNames[event.font][event.glyph] = None
+    fonts = []
+    for i, names in enumerate(glyphNames):
+        font = Font(os.path.basename(recording.fonts[i]))
+        for j, glyphName in enumerate(names):
+            font.insertGlyph(
+                Glyph(glyphName, contours=[makeContour(j % 400, 0, 300, 24)])
+            )
+        for glyphName in list(names):
+            for k in range(compositesPerGlyph):
+                compositeName = f"{glyphName}.composite{k}"
+                if compositeName not in font:
+                    font.insertGlyph(
+                        Glyph(compositeName, components=[Component(glyphName, (k * 10, 0))])
+                    )
+        fonts.append(font)
+    return fonts
+
+
+def makeEvents(recording, fonts, nudge):
+    events = []
+    openedLater = set()
+    seenFonts = set()
+    for recorded in recording.events:
+        action = None
+        if recorded.font is not None:
+            if recorded.name in OPEN_EVENTS and recorded.font not in seenFonts:
+                openedLater.add(recorded.font)
+                action = ("open",)
+            elif recorded.name in CLOSE_EVENTS:
+                action = ("close",)
+            seenFonts.add(recorded.font)
+        if nudge and recorded.name == "adjunctGlyphDidChangeOutline" and recorded.glyph:
+            action = ("moveBy", (nudge, 0))
+        events.append(Event(recorded.time, recorded.name, recorded.font, recorded.glyph, action))
+    openFonts = [font for i, font in enumerate(fonts) if i not in openedLater]
+    return events, openFonts
+
+
+def writeDemo(path):
+    # a recording of the "drag base glyph" scenario, made without RoboFont
+    from subscriberScenarios import dragBaseGlyph
+    from standins.fonts import makeSyntheticFont
+
+    fonts = [makeSyntheticFont(2000, 1500)]
+    current = [0.0]
+    recorder = EventRecorder("AutoOffsetComponents", timer=lambda: current[0])
+    for event in dragBaseGlyph(fonts):
+        current[0] = event.time
+        font = fonts[event.font] if event.font is not None else None
+        info = {"font": font}
+        if event.glyph is not None:
+            info["glyph"] = font[event.glyph]
+        recorder.record(event.name, info)
+    recorder.save(path)
+    print(f"Saved {len(recorder)} events to {path} ({os.path.getsize(path)} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path", help="the recording (.events.json.gz)")
+    parser.add_argument("--subscriber", help="module:Class, defaults to the recorded subscriber")
+    parser.add_argument("--composites", type=int, default=3, help="composites per recorded glyph")
+    parser.add_argument("--nudge", type=float, default=0, help="move each changed glyph by this")
+    parser.add_argument("--realtime", action="store_true", help="wait between the events as recorded")
+    parser.add_argument("--demo", action="store_true", help="write a demo recording to the path")
+    args = parser.parse_args()
+    if args.demo:
+        writeDemo(args.path)
+        return
+    recording = loadRecording(args.path)
+    if args.subscriber:
+        moduleName, className = args.subscriber.split(":")
+        subscriberClass = loadSubscriberClass(moduleName, className)
+    else:
+        subscriberClass = findSubscriberClass(recording.subscriber)
+    fonts = makeFonts(recording, args.composites)
+    events, openFonts = makeEvents(recording, fonts, args.nudge)
+    result = replay(
+        subscriberClass, fonts, events, openFonts=openFonts, realtime=args.realtime
+    )
+    duration = recording.events[-1].time if recording.events else 0
+    print(
+        f"{len(recording.events)} events of {recording.subscriber} over {duration:.1f} s, "
+        f"{len(fonts)} fonts, {sum(len(f) for f in fonts)} glyphs"
+    )
+    printTable(RESULT_HEADER, [result.row(subscriberClass.__name__)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Replays a burst of glyph switch events (e.g. holding an arrow key in the font
+overview) through the `Debouncer` used by `LazyGlyphSubscriber.trigger` and
+counts the timers that get armed, the moves of their deadline and the
+`updateChanges` calls, compared to re-creating a timer for each event and
+to a clock that can't move a timer (the armed timer re-arms itself when it
+fires too early).
+
+    python Benchmarks/scheduler.py
+"""
+from benchTools import loadModule, printTable
+
+scheduler = loadModule("RFGadgets/observers/scheduler.py")
+
+EVENT_COUNT = 100
+EVENT_INTERVALS = (0.01, 0.03, 0.1)
+
+
+class CountingClock(scheduler.ManualClock):
+
+    def __init__(self):
+        super().__init__()
+        self.armed = 0
+        self.moved = 0
+
+    def callLater(self, delay, callback):
+        self.armed += 1
+        return super().callLater(delay, callback)
+
+    def reschedule(self, handle, delay):
+        self.moved += 1
+        return super().reschedule(handle, delay)
+
+
+class RearmingClock(CountingClock):
+    # the Debouncer falls back to re-arming the timer
+    reschedule = None
+
+
+def replay(interval, delay, maxWait, clockClass=CountingClock):
+    clock = clockClass()
+    updates = []
+    debouncer = scheduler.Debouncer(updates.append, clock, delay=delay, maxWait=maxWait)
+    for i in range(EVENT_COUNT):
+        debouncer.schedule("glyph", {"glyph": f"glyph{i}"})
+        clock.advance(interval)
+    clock.advance(1)
+    return clock.armed, clock.moved, len(updates)
+
+
+def main():
+    rows = []
+    for interval in EVENT_INTERVALS:
+        # previous behaviour: a new timer with a 0 delay for each event
+        oldTimers, _, oldUpdates = replay(interval, 0, None)
+        rearmed, _, rearmedUpdates = replay(interval, 0.05, 0.5, RearmingClock)
+        timers, moves, updates = replay(interval, 0.05, 0.5)
+        assert updates == rearmedUpdates
+        rows.append((
+            EVENT_COUNT,
+            f"{interval * 1000:.0f}",
+            oldTimers,
+            oldUpdates,
+            rearmed,
+            timers,
+            moves,
+            updates,
+        ))
+    printTable(
+        (
+            "events",
+            "interval ms",
+            "timers (delay 0)",
+            "updates (delay 0)",
+            "timers (re-armed)",
+            "timers (debounced)",
+            "deadline moves",
+            "updates (debounced)",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compares sorting closed UFOs by opening them all and using the previous
+`getSortedFonts`, with passing their paths to `getSortedFonts`, which reads
+the advance widths from the `.glif` files.
+
+Needs defcon and fontgadgets in the python path.
+
+    python Benchmarks/sortFonts.py
+    python Benchmarks/sortFonts.py --fonts 40 --glyphs 2000
+"""
+import os
+import sys
+import random
+import argparse
+import tempfile
+import standins
+from benchTools import LIB_PATH, timeCall, printTable
+
+sys.path.insert(0, LIB_PATH)
+standins.install()
+
+
+def makeUFOs(folder, fontCount, glyphCount):
+    import defcon
+
+    paths = []
+    weights = list(range(fontCount))
+    random.Random(0).shuffle(weights)
+    for weight in weights:
+        font = defcon.Font()
+        for i in range(glyphCount):
+            glyph = font.newGlyph(f"glyph{i:05d}")
+            glyph.width = 300 + i % 400 + weight * 5
+            pen = glyph.getPen()
+            for c in range(3):
+                pen.moveTo((c * 100, 0))
+                for j in range(1, 10):
+                    pen.curveTo((j * 10, j * 5), (j * 12, j * 7 + weight), (j * 15 + c, j * 9))
+                pen.closePath()
+        path = os.path.join(folder, f"Weight{weight:03d}.ufo")
+        font.save(path)
+        paths.append(path)
+    return paths
+
+
+def oldGetSortedFonts(fonts):
+    # the previous `getSortedFonts`
+    numFonts = len(fonts)
+    for gname in fonts[0].glyphOrder:
+        try:
+            widths = {f[gname].width: f for f in fonts}
+        except KeyError:
+            continue
+        if len(widths) == numFonts:
+            return [widths[w] for w in sorted(widths)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fonts", type=int, default=40)
+    parser.add_argument("--glyphs", type=int, default=1000)
+    args = parser.parse_args()
+    try:
+        import defcon
+        from RFGadgets.font import getSortedFonts
+    except ImportError as e:
+        print(f"skipped, {e}")
+        return
+    with tempfile.TemporaryDirectory() as folder:
+        paths = makeUFOs(folder, args.fonts, args.glyphs)
+        expected = sorted(paths)
+        assert getSortedFonts(paths) == expected
+        assert [f.path for f in oldGetSortedFonts([defcon.Font(p) for p in paths])] == expected
+        rows = [
+            (
+                "open all, previous getSortedFonts",
+                f"{timeCall(lambda: oldGetSortedFonts([defcon.Font(p) for p in paths]), repeat=3):.0f}",
+            ),
+            ("getSortedFonts on the paths", f"{timeCall(getSortedFonts, paths, repeat=3):.0f}"),
+        ]
+        fonts = [defcon.Font(p) for p in paths]
+        for font in fonts:
+            font.keys()
+            for glyph in font:
+                pass
+        rows.append(("previous getSortedFonts, open fonts", f"{timeCall(oldGetSortedFonts, fonts):.2f}"))
+        rows.append(("getSortedFonts, open fonts", f"{timeCall(getSortedFonts, fonts):.2f}"))
+    print(f"{args.fonts} UFOs, {args.glyphs} glyphs")
+    printTable(("sort", "ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
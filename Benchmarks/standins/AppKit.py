@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+NSApplicationSupportDirectory = 14
+NSUserDomainMask = 1
+NSApp = None
+
+
+def NSSearchPathForDirectoriesInDomains(directory, domainMask, expandTilde):
+    # FONTGADGETS_APP_SUPPORT points to the fake "Application Support" folder
+    path = os.environ.get("FONTGADGETS_APP_SUPPORT")
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "FontGadgetsStandins")
+    return [path]
+
+
+class NSOperationQueue:
+    # there is no run loop, the blocks are run right away
+    @classmethod
+    def mainQueue(cls):
+        return cls()
+
+    def addOperationWithBlock_(self, block):
+        block()
+
+
+NSWindowDidBecomeKeyNotification = "NSWindowDidBecomeKeyNotification"
+NSWindowDidBecomeMainNotification = "NSWindowDidBecomeMainNotification"
+NSWindowWillCloseNotification = "NSWindowWillCloseNotification"
+
+
+class NSNotificationCenter:
+    # nothing is posted, the observers are only kept
+    _default = None
+
+    def __init__(self):
+        self.observers = []
+
+    @classmethod
+    def defaultCenter(cls):
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def addObserverForName_object_queue_usingBlock_(self, name, obj, queue, block):
+        token = (name, block)
+        self.observers.append(token)
+        return token
+
+    def removeObserver_(self, token):
+        self.observers.remove(token)
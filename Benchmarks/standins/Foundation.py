@@ -0,0 +1,25 @@
+class _Timer:
+    def __init__(self):
+        self._valid = True
+
+    def isValid(self):
+        return self._valid
+
+    def invalidate(self):
+        self._valid = False
+
+    def setFireDate_(self, date):
+        pass
+
+
+class NSDate:
+    @classmethod
+    def dateWithTimeIntervalSinceNow_(cls, interval):
+        return cls()
+
+
+class NSTimer:
+    # there is no run loop, the timers never fire
+    @classmethod
+    def scheduledTimerWithTimeInterval_repeats_block_(cls, interval, repeats, block):
+        return _Timer()
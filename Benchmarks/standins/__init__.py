@@ -0,0 +1,15 @@
+"""
+Minimal stand-ins for the RoboFont and PyObjC modules (`mojo`, `AppKit`,
+`Foundation` and `vanilla`), so the startup script and the subscribers can be
+imported and measured headless, e.g. on Linux. Only what the extension uses
+is provided. Put this folder at the front of `sys.path` with `install()`.
+"""
+import os
+import sys
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+def install():
+    if FOLDER not in sys.path:
+        sys.path.insert(0, FOLDER)
@@ -0,0 +1,290 @@
+"""
+fontParts-like fonts for the headless benchmarks. The glyphs act as their own
+naked objects (iterating a glyph returns its contours as lists of points),
+and the font counts the change notifications and undo steps, so the
+benchmarks can also report how much work a subscriber caused.
+"""
+import random
+
+from fontTools.misc.transform import Transform
+from fontParts.base.base import TransformationMixin
+
+
+class Point:
+    __slots__ = ("x", "y", "segmentType")
+
+    def __init__(self, x, y, segmentType=None):
+        self.x = x
+        self.y = y
+        self.segmentType = segmentType
+
+
+class Component:
+    __slots__ = ("baseGlyph", "transformation", "glyph")
+
+    def __init__(self, baseGlyph, offset=(0, 0), scale=(1, 1), glyph=None):
+        self.baseGlyph = baseGlyph
+        self.transformation = (scale[0], 0, 0, scale[1], offset[0], offset[1])
+        self.glyph = glyph
+
+    @property
+    def offset(self):
+        return self.transformation[4:]
+
+    def moveBy(self, offset):
+        xx, xy, yx, yy, dx, dy = self.transformation
+        self.transformation = (xx, xy, yx, yy, dx + offset[0], dy + offset[1])
+        if self.glyph is not None:
+            self.glyph.changed()
+
+
+class Dispatcher:
+    """
+    Counts the posted notifications, held notifications are posted once
+    per glyph when they are released.
+    """
+
+    def __init__(self):
+        self.posted = 0
+        self._holding = 0
+        self._held = set()
+
+    def post(self, glyphName):
+        if self._holding:
+            self._held.add(glyphName)
+        else:
+            self.posted += 1
+
+    def holdNotifications(self, notification=None):
+        self._holding += 1
+
+    def releaseHeldNotifications(self, notification=None):
+        self._holding -= 1
+        if not self._holding:
+            self.posted += len(self._held)
+            self._held = set()
+
+
+class Glyph(TransformationMixin):
+
+    def __init__(self, name, font=None, contours=None, components=None, width=500):
+        self.name = name
+        self.font = font
+        self.contours = contours or []
+        self.components = components or []
+        for component in self.components:
+            component.glyph = self
+        self.width = width
+        self.tempLib = {}
+
+    def __repr__(self):
+        return f"<Glyph {self.name}>"
+
+    def naked(self):
+        return self
+
+    def __iter__(self):
+        return iter(self.contours)
+
+    def __len__(self):
+        return len(self.contours)
+
+    @property
+    def bounds(self):
+        points = [p for contour in self.contours for p in contour]
+        if not points:
+            return None
+        xs = [p.x for p in points]
+        ys = [p.y for p in points]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def appendComponent(self, baseGlyph, offset=(0, 0), scale=(1, 1)):
+        component = Component(baseGlyph, offset, scale, self)
+        self.components.append(component)
+        self.changed()
+        return component
+
+    def _transformBy(self, matrix, **kwargs):
+        # `moveBy`, `scaleBy`, etc. come from the fontParts mixin, like in
+        # RoboFont
+        transform = Transform(*matrix)
+        for contour in self.contours:
+            for point in contour:
+                point.x, point.y = transform.transformPoint((point.x, point.y))
+        for component in self.components:
+            component.transformation = tuple(transform.transform(component.transformation))
+        self.changed()
+
+    def raiseNotImplementedError(self):
+        raise NotImplementedError(self.__class__.__name__)
+
+    def changed(self):
+        if self.font is not None:
+            self.font._dispatcher.post(self.name)
+
+    def prepareUndo(self, title=""):
+        if self.font is not None:
+            self.font.undoCount += 1
+
+    def performUndo(self):
+        pass
+
+
+class Font:
+    """
+    A fontParts-like font with `tempLib`, `glyphOrder`, `undo` and a naked
+    font with a dispatcher.
+    """
+
+    def __init__(self, name="Font", path=None):
+        self.name = name
+        self.path = path
+        self.tempLib = {}
+        self.lib = {}
+        self.undoCount = 0
+        self._glyphs = {}
+        self._dispatcher = Dispatcher()
+
+    def __repr__(self):
+        return f"<Font {self.name}>"
+
+    def __iter__(self):
+        return iter(list(self._glyphs.values()))
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    def __contains__(self, name):
+        return name in self._glyphs
+
+    def __getitem__(self, name):
+        return self._glyphs[name]
+
+    def keys(self):
+        return list(self._glyphs.keys())
+
+    @property
+    def glyphOrder(self):
+        return list(self._glyphs)
+
+    @property
+    def dispatcher(self):
+        return self._dispatcher
+
+    def naked(self):
+        return self
+
+    def insertGlyph(self, glyph, name=None):
+        name = name or glyph.name
+        glyph.name = name
+        glyph.font = self
+        self._glyphs[name] = glyph
+        return glyph
+
+    def newGlyph(self, name):
+        return self.insertGlyph(Glyph(name))
+
+    def removeGlyph(self, name):
+        glyph = self._glyphs.pop(name)
+        glyph.font = None
+
+    def renameGlyph(self, oldName, newName, renameComponents=True):
+        # the glyph object keeps its identity, like in RoboFont
+        glyphs = {}
+        for name, glyph in self._glyphs.items():
+            if name == oldName:
+                name = glyph.name = newName
+            glyphs[name] = glyph
+        self._glyphs = glyphs
+        if renameComponents:
+            for glyph in glyphs.values():
+                for component in glyph.components:
+                    if component.baseGlyph == oldName:
+                        component.baseGlyph = newName
+
+    def undo(self, title=""):
+        font = self
+
+        class UndoGroup:
+            def __enter__(self):
+                font.undoCount += 1
+                return self
+
+            def __exit__(self, *exc):
+                pass
+
+        return UndoGroup()
+
+
+def makeContour(x, y, size, pointCount):
+    """
+    Returns a closed contour of curve segments with about `pointCount` points.
+    """
+    contour = []
+    segments = max(pointCount // 3, 1)
+    for i in range(segments * 3):
+        segmentType = "curve" if i % 3 == 2 else None
+        contour.append(Point(x + (i * 7) % size, y + (i * 13) % size, segmentType))
+    return contour
+
+
+def makeSyntheticFont(
+    glyphCount=500,
+    compositeCount=300,
+    componentsPerComposite=2,
+    contoursPerGlyph=2,
+    pointsPerContour=24,
+    nestedRatio=0.1,
+    name="Synthetic",
+    seed=0,
+    widthOffset=0,
+):
+    """
+    Returns a font with `glyphCount` base glyphs made of contours, and
+    `compositeCount` composites that refer to random base glyphs. A part of
+    the composites (`nestedRatio`) also refer to other composites.
+
+    The same seed gives the same glyph structure, so fonts made with the same
+    arguments and different `widthOffset` behave like masters of a family.
+    """
+    rng = random.Random(seed)
+    font = Font(name)
+    baseNames = []
+    for i in range(glyphCount):
+        glyphName = f"base{i:05d}"
+        contours = [
+            makeContour(rng.randint(0, 400), rng.randint(0, 600), 300, pointsPerContour)
+            for _ in range(contoursPerGlyph)
+        ]
+        font.insertGlyph(
+            Glyph(glyphName, contours=contours, width=300 + i % 400 + widthOffset)
+        )
+        baseNames.append(glyphName)
+    compositeNames = []
+    for i in range(compositeCount):
+        glyphName = f"composite{i:05d}"
+        components = []
+        for j in range(componentsPerComposite):
+            if compositeNames and j == 0 and rng.random() < nestedRatio:
+                baseGlyph = rng.choice(compositeNames)
+            else:
+                baseGlyph = rng.choice(baseNames)
+            components.append(
+                Component(baseGlyph, (rng.randint(-100, 400), rng.randint(-50, 700)))
+            )
+        font.insertGlyph(
+            Glyph(glyphName, components=components, width=500 + widthOffset)
+        )
+        compositeNames.append(glyphName)
+    return font
+
+
+def makeSyntheticFamily(masterCount=4, **kwargs):
+    """
+    Returns masters with the same glyphs and components and different
+    widths, like the masters of a family.
+    """
+    return [
+        makeSyntheticFont(name=f"Master{i}", widthOffset=i * 20, **kwargs)
+        for i in range(masterCount)
+    ]
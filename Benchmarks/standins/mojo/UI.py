@@ -0,0 +1,10 @@
+class _Window:
+    doodleWindowName = None
+
+
+def CurrentWindow():
+    return _Window()
+
+
+def CurrentSpaceCenter():
+    return None
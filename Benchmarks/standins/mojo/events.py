@@ -0,0 +1,15 @@
+_observers = []
+
+
+def addObserver(observer, methodName, event):
+    _observers.append((observer, methodName, event))
+
+
+def removeObserver(observer, event):
+    _observers[:] = [o for o in _observers if o[0] is not observer or o[2] != event]
+
+
+def postEvent(event, **kwargs):
+    for observer, methodName, name in list(_observers):
+        if name == event:
+            getattr(observer, methodName)(kwargs)
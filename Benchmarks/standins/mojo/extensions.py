@@ -0,0 +1,14 @@
+# extension defaults are kept in memory
+_defaults = {}
+
+
+def getExtensionDefault(key, fallback=None):
+    return _defaults.get(key, fallback)
+
+
+def setExtensionDefault(key, value, validate=False):
+    _defaults[key] = value
+
+
+def removeExtensionDefault(key):
+    _defaults.pop(key, None)
@@ -0,0 +1,23 @@
+# the open fonts and the current glyph are set by the benchmarks
+_fonts = []
+_current = {"glyph": None}
+
+
+def AllFonts():
+    return list(_fonts)
+
+
+def CurrentFont():
+    return _fonts[0] if _fonts else None
+
+
+def CurrentGlyph():
+    return _current["glyph"]
+
+
+def setOpenFonts(fonts):
+    _fonts[:] = fonts
+
+
+def setCurrentGlyph(glyph):
+    _current["glyph"] = glyph
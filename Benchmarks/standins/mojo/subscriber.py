@@ -0,0 +1,39 @@
+class Subscriber:
+    """
+    Keeps the adjunct objects like the RoboFont subscriber does, but events
+    are only delivered by calling the callbacks directly.
+    """
+
+    debug = False
+
+    def __init__(self, *args, **kwargs):
+        self._adjunctObjects = {}
+        self.build()
+
+    def build(self):
+        pass
+
+    def destroy(self):
+        pass
+
+    def terminate(self):
+        pass
+
+    def setAdjunctObjectsToObserve(self, objects):
+        self._adjunctObjects = {id(obj): obj for obj in objects}
+
+    def addAdjunctObjectToObserve(self, obj):
+        self._adjunctObjects[id(obj)] = obj
+
+    def removeObservedAdjunctObject(self, obj):
+        self._adjunctObjects.pop(id(obj), None)
+
+    def clearObservedAdjunctObjects(self):
+        self._adjunctObjects = {}
+
+    def getObservedAdjunctObjects(self):
+        return list(self._adjunctObjects.values())
+
+
+def registerSubscriberEvent(*args, **kwargs):
+    pass
@@ -0,0 +1,15 @@
+class _View:
+    def __init__(self, *args, **kwargs):
+        self._value = None
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+
+    def open(self):
+        pass
+
+
+Window = CheckBox = Button = List = HorizontalLine = TextBox = _View
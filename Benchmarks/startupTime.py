@@ -0,0 +1,139 @@
+"""
+Runs the startup script of the extension headless against the stand-in
+`mojo`/`AppKit` modules and prints where the time goes. Each run is a fresh
+process, so the imports are cold. The imported modules are traced with
+`FONTGADGETS_TRACE_STARTUP`, pass `--untraced` to time the startup as it
+runs by default. It first checks that a subscriber with `requiredPackages`
+that are not installed is only activated after they are.
+
+    python Benchmarks/startupTime.py [runs] [--untraced]
+"""
+import os
+import sys
+import json
+import runpy
+import statistics
+import subprocess
+import tempfile
+from benchTools import LIB_PATH, printTable
+
+PACKAGES = ["GitPython:git", "gitdb", "fontGit", "python_bidi:bidi", "uharfbuzz", "fontgadgets"]
+SUBSCRIBERS_KEY = "design.bahman.fontgadgets.subscribers"
+# a package that is installed halfway through the deferred activation check
+DEFERRED_PACKAGE = "fontgadgetsDeferredCheck"
+DEFERRED_SOURCE = f"""
+from base import BaseSubscriber
+
+
+class DeferredSubscriber(BaseSubscriber):
+    requiredPackages = ("{DEFERRED_PACKAGE}",)
+"""
+
+
+def makeAppSupport(root):
+    # all the packages look installed, so the startup doesn't run pip
+    version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    target = os.path.join(root, "RoboFont", f"Python{version}")
+    for entry in PACKAGES:
+        distName, _, importName = entry.partition(":")
+        distInfo = os.path.join(target, f"{distName}-1.0.dist-info")
+        os.makedirs(distInfo)
+        with open(os.path.join(distInfo, "top_level.txt"), "w") as f:
+            f.write(f"{importName or distName}\n")
+    return target
+
+
+def runOnce():
+    import standins
+
+    standins.install()
+    sys.path.insert(0, LIB_PATH)
+    # RoboFont has imported fontParts before it runs the startup scripts
+    import fontParts.base  # noqa: F401
+    from mojo.extensions import setExtensionDefault
+
+    setExtensionDefault(SUBSCRIBERS_KEY, {"AutoOffsetComponents": 1})
+    namespace = runpy.run_path(os.path.join(LIB_PATH, "installFontGadgets.py"))
+    trace = namespace["startupTrace"]
+    result = {
+        "total": trace.total,
+        "phases": trace.phases,
+        "modules": trace.topModules(10),
+        "moduleCount": len(trace.modules),
+        "summary": trace.summary(10),
+    }
+    print(json.dumps(result))
+
+
+def checkDeferredActivation():
+    import standins
+
+    standins.install()
+    if LIB_PATH not in sys.path:
+        sys.path.insert(0, LIB_PATH)
+    from mojo.extensions import setExtensionDefault
+    from RFGadgets.observers import startup
+    from RFGadgets.observers.manifest import SubscriberEntry, readSubscriberManifests
+
+    manifest, = readSubscriberManifests(DEFERRED_SOURCE, "deferredCheck")
+    entry = SubscriberEntry(manifest)
+    discover = startup.getRoboFontGadgetsSubscribers
+    startup.getRoboFontGadgetsSubscribers = lambda: discover() + [entry]
+    setExtensionDefault(SUBSCRIBERS_KEY, {"DeferredSubscriber": 1})
+    with tempfile.TemporaryDirectory() as root:
+        with open(os.path.join(root, "deferredCheck.py"), "w") as f:
+            f.write(DEFERRED_SOURCE)
+        sys.path.insert(0, root)
+        try:
+            log = "".join(startup.startActivatedObservers())
+            assert f"waiting for {DEFERRED_PACKAGE}" in log, log
+            assert not entry.isLoaded()
+            startup.startDeferredObservers()
+            assert not entry.isLoaded()
+            # the package is installed
+            os.makedirs(os.path.join(root, DEFERRED_PACKAGE))
+            open(os.path.join(root, DEFERRED_PACKAGE, "__init__.py"), "w").close()
+            startup.startDeferredObservers()
+            assert entry.isActive() and not startup._deferredSubscribers
+            entry.deactivate()
+        finally:
+            startup.getRoboFontGadgetsSubscribers = discover
+            sys.path.remove(root)
+
+
+def main():
+    checkDeferredActivation()
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    runs = int(args[0]) if args else 5
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        makeAppSupport(root)
+        env = dict(os.environ, FONTGADGETS_APP_SUPPORT=root)
+        if "--untraced" not in sys.argv:
+            env["FONTGADGETS_TRACE_STARTUP"] = "1"
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run"],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+    print(results[-1]["summary"])
+    print()
+    phaseNames = [name for name, _ in results[0]["phases"]]
+    rows = []
+    for i, name in enumerate(phaseNames):
+        values = [r["phases"][i][1] / 1e6 for r in results]
+        rows.append((name, f"{statistics.median(values):.2f}", f"{max(values):.2f}"))
+    totals = [r["total"] / 1e6 for r in results]
+    rows.append(("total", f"{statistics.median(totals):.2f}", f"{max(totals):.2f}"))
+    printTable((f"phase ({runs} runs)", "median ms", "max ms"), rows)
+
+
+if __name__ == "__main__":
+    if "--run" in sys.argv:
+        runOnce()
+    else:
+        main()
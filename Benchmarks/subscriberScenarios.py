@@ -0,0 +1,241 @@
+"""
+Replays typical editing sessions through `AutoOffsetComponents` on synthetic
+fonts and reports the latency of the callbacks, the delayed work and the
+peak memory of each scenario.
+
+    python Benchmarks/subscriberScenarios.py
+"""
+from collections import Counter
+from harness import Event, RESULT_HEADER, loadSubscriberClass, measure
+from benchTools import printTable, timeCall
+from standins.fonts import makeSyntheticFamily, makeSyntheticFont
+
+FRAME = 1 / 60
+
+
+def mostUsedBase(font):
+    counts = Counter(
+        c.baseGlyph for g in font for c in g.components if c.baseGlyph.startswith("base")
+    )
+    return counts.most_common(1)[0][0]
+
+
+def compositeOf(font, baseName):
+    for glyph in font:
+        if any(c.baseGlyph == baseName for c in glyph.components):
+            return glyph.name
+
+
+def dragBaseGlyph(fonts):
+    # the outline of a base glyph is dragged in the glyph editor for two
+    # seconds, then one of its composites is opened and the font is saved
+    font = fonts[0]
+    base = mostUsedBase(font)
+    events = [Event(0.0, "roboFontDidSwitchCurrentGlyph", 0, base)]
+    t = 0.0
+    for _ in range(120):
+        t += FRAME
+        events.append(Event(t, "adjunctGlyphDidChangeOutline", 0, base, ("moveBy", (2, 0))))
+    events.append(Event(t + 1.0, "roboFontDidSwitchCurrentGlyph", 0, compositeOf(font, base)))
+    events.append(Event(t + 5.0, "fontDocumentWillSave", 0))
+    return events
+
+
+def scriptMovesAllMasters(fonts):
+    # a script nudges 200 base glyphs twice in all the masters, then the app
+    # becomes active again and the fonts are saved. The baselines are taken
+    # right before the script moves each glyph, so both nudges are
+    # compensated.
+    events = []
+    for t in (0.0, 0.05):
+        for i, font in enumerate(fonts):
+            for glyphName in font.glyphOrder[:200]:
+                events.append(
+                    Event(t, "adjunctGlyphDidChangeOutline", i, glyphName, ("moveBy", (0, 15)))
+                )
+    events.append(Event(0.1, "roboFontDidBecomeActive"))
+    for i in range(len(fonts)):
+        events.append(Event(2.0, "fontDocumentWillSave", i))
+    return events
+
+
+def scaleBaseGlyphs(fonts):
+    # base glyphs are scaled, which shouldn't move any component
+    events = []
+    for glyphName in fonts[0].glyphOrder[:100]:
+        events.append(Event(0.0, "adjunctGlyphDidChangeOutline", 0, glyphName, ("scaleBy", 1.05)))
+    events.append(Event(0.5, "fontDocumentWillSave", 0))
+    return events
+
+
+def browseGlyphs(fonts):
+    # the user steps through 500 glyphs in the glyph editor
+    order = fonts[0].glyphOrder
+    return [
+        Event(i * 0.03, "roboFontDidSwitchCurrentGlyph", 0, order[(i * 7) % len(order)])
+        for i in range(500)
+    ]
+
+
+def openAndCloseMasters(fonts):
+    events = [Event(0.0, "fontDocumentDidOpen", i, None, ("open",)) for i in range(len(fonts))]
+    events += [Event(1.0, "fontDocumentWillClose", i, None, ("close",)) for i in range(len(fonts))]
+    return events
+
+
+SCENARIOS = [
+    # title, make fonts, make events, fonts open when activated
+    ("drag base glyph", lambda: [makeSyntheticFont(2000, 1500)], dragBaseGlyph, None),
+    ("script moves 4 masters", lambda: makeSyntheticFamily(4, glyphCount=1000, compositeCount=800), scriptMovesAllMasters, None),
+    ("scale base glyphs", lambda: [makeSyntheticFont(1000, 800)], scaleBaseGlyphs, None),
+    ("browse glyphs", lambda: [makeSyntheticFont(2000, 1500)], browseGlyphs, None),
+    ("open/close 4 masters", lambda: makeSyntheticFamily(4, glyphCount=2000, compositeCount=1500), openAndCloseMasters, []),
+]
+
+
+def checkCompensation():
+    # the components keep their position after dragging the base glyph
+    font = makeSyntheticFont(200, 150)
+    base = mostUsedBase(font)
+    before = {
+        g.name: [c.offset for c in g.components if c.baseGlyph == base] for g in font
+    }
+    AutoOffsetComponents = loadSubscriberClass("compositeFixature", "AutoOffsetComponents")
+    from harness import replay
+
+    replay(AutoOffsetComponents, [font], dragBaseGlyph([font]))
+    for glyphName, offsets in before.items():
+        after = [c.offset for c in font[glyphName].components if c.baseGlyph == base]
+        expected = [(x - 240, y) for x, y in offsets]
+        assert after == expected, (glyphName, after, expected)
+
+
+def checkScriptedCompensation():
+    # base glyphs that were never current are compensated from their first
+    # change
+    fonts = makeSyntheticFamily(2, glyphCount=200, compositeCount=150)
+    moved = set(fonts[0].glyphOrder[:200])
+    before = [
+        {g.name: [c.offset for c in g.components] for g in font} for font in fonts
+    ]
+    AutoOffsetComponents = loadSubscriberClass("compositeFixature", "AutoOffsetComponents")
+    from harness import replay
+
+    replay(AutoOffsetComponents, fonts, scriptMovesAllMasters(fonts))
+    for font, offsets in zip(fonts, before):
+        for glyph in font:
+            if glyph.name in moved:
+                continue
+            expected = [
+                (x, y - 30) if c.baseGlyph in moved else (x, y)
+                for c, (x, y) in zip(glyph.components, offsets[glyph.name])
+            ]
+            after = [c.offset for c in glyph.components]
+            assert after == expected, (glyph.name, after, expected)
+
+
+def checkLazyBaselines():
+    # opening the fonts doesn't fingerprint the base glyphs and browsing
+    # only keeps the baseline of the current glyph
+    fonts = [makeSyntheticFont(2000, 1500)]
+    AutoOffsetComponents = loadSubscriberClass("compositeFixature", "AutoOffsetComponents")
+    from harness import replay
+    from compositeFixature import GLYPH_STATE_KEY
+
+    replay(AutoOffsetComponents, fonts, [])
+    assert len(fonts[0].tempLib[GLYPH_STATE_KEY]) == 0
+    replay(AutoOffsetComponents, fonts, browseGlyphs(fonts))
+    assert len(fonts[0].tempLib[GLYPH_STATE_KEY]) <= 1
+
+
+def checkReactivation():
+    # enabling profiling reactivates the subscriber, the pending change of a
+    # moved base glyph is compensated before its state is dropped
+    from mojo import roboFont
+    from RFGadgets.observers.scheduler import ManualClock
+
+    font = makeSyntheticFont(200, 150)
+    base = mostUsedBase(font)
+    composites = [g.name for g in font if any(c.baseGlyph == base for c in g.components)]
+    before = {name: [c.offset for c in font[name].components] for name in composites}
+    AutoOffsetComponents = loadSubscriberClass("compositeFixature", "AutoOffsetComponents")
+    cls = type(
+        "AutoOffsetComponents", (AutoOffsetComponents,), {"makeClock": lambda self: ManualClock()}
+    )
+    roboFont.setOpenFonts([font])
+    roboFont.setCurrentGlyph(None)
+    subscriber = cls.activate()
+    try:
+        font[base].moveBy((0, 15))
+        subscriber.adjunctGlyphDidChangeOutline({"glyph": font[base]})
+        cls.enableProfiling()
+        cls.reactivate()
+    finally:
+        cls.disableProfiling()
+        cls.deactivate()
+    for name in composites:
+        expected = [
+            (x, y - 15) if c.baseGlyph == base else (x, y)
+            for c, (x, y) in zip(font[name].components, before[name])
+        ]
+        after = [c.offset for c in font[name].components]
+        assert after == expected, (name, after, expected)
+
+
+def checkRenamedCompensation():
+    # a moved base glyph is renamed before its change is processed, the
+    # baseline and the pending change move to the new name
+    font = makeSyntheticFont(200, 150)
+    base = mostUsedBase(font)
+    newName = f"{base}.renamed"
+    composites = [g.name for g in font if any(c.baseGlyph == base for c in g.components)]
+    before = {name: [c.offset for c in font[name].components] for name in composites}
+    events = [
+        Event(0.0, "adjunctGlyphDidChangeOutline", 0, base, ("moveBy", (0, 15))),
+        Event(0.0, "adjunctFontDidChangeGlyphOrder", 0, None, ("renameGlyph", base, newName)),
+    ]
+    events += [Event(0.0, "adjunctGlyphDidChangeComponents", 0, name) for name in composites]
+    events.append(Event(0.1, "roboFontDidBecomeActive"))
+    AutoOffsetComponents = loadSubscriberClass("compositeFixature", "AutoOffsetComponents")
+    from harness import replay
+
+    replay(AutoOffsetComponents, [font], events)
+    for name in composites:
+        expected = [
+            (x, y - 15) if c.baseGlyph == newName else (x, y)
+            for c, (x, y) in zip(font[name].components, before[name])
+        ]
+        after = [c.offset for c in font[name].components]
+        assert after == expected, (name, after, expected)
+
+
+def getSortedFontsRow():
+    try:
+        from RFGadgets.font import getSortedFonts
+    except ImportError as e:
+        return (f"getSortedFonts skipped ({e})",) + ("-",) * (len(RESULT_HEADER) - 1)
+    fonts = makeSyntheticFamily(8, glyphCount=2000, compositeCount=0)
+    elapsed = timeCall(getSortedFonts, fonts)
+    return ("getSortedFonts 8 masters", 1, f"{elapsed:.2f}") + ("-",) * (len(RESULT_HEADER) - 3)
+
+
+def main():
+    checkCompensation()
+    checkScriptedCompensation()
+    checkLazyBaselines()
+    checkReactivation()
+    checkRenamedCompensation()
+    AutoOffsetComponents = loadSubscriberClass("compositeFixature", "AutoOffsetComponents")
+    rows = []
+    for title, makeFonts, makeEvents, openFonts in SCENARIOS:
+        if openFonts is not None:
+            result = measure(AutoOffsetComponents, makeFonts, makeEvents, openFonts=openFonts)
+        else:
+            result = measure(AutoOffsetComponents, makeFonts, makeEvents)
+        rows.append(result.row(title))
+    rows.append(getSortedFontsRow())
+    printTable(RESULT_HEADER, rows)
+
+
+if __name__ == "__main__":
+    main()
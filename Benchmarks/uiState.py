@@ -0,0 +1,190 @@
+"""
+Compares polling the `RFGadgets.UI` helpers on every redraw with and without
+the cached `RFGadgets.uiState.UIStateRegistry`, on stand-ins of the app
+windows and the glyph collection.
+
+    python Benchmarks/uiState.py
+"""
+from benchTools import loadModule, timeCall, printTable
+
+uiState = loadModule("RFGadgets/uiState.py")
+
+WINDOW_COUNT = 60
+VANILLA_WINDOW_COUNT = 8
+GLYPH_COUNT = 5000
+SELECTED_COUNT = 300
+# redraws between two events (clicks or key presses) and the number of
+# helper calls per redraw, e.g. a few tools drawing in the font overview
+FRAMES = 60
+CALLS_PER_FRAME = 5
+EVENTS = 20
+
+
+class VanillaWindow:
+    pass
+
+
+class Delegate:
+
+    def __init__(self, wrapper):
+        self._wrapper = wrapper
+
+    def vanillaWrapper(self):
+        return self._wrapper
+
+
+class PlainDelegate:
+    pass
+
+
+class Window:
+
+    def __init__(self, delegate):
+        self._delegate = delegate
+
+    def delegate(self):
+        return self._delegate
+
+
+class App:
+
+    def __init__(self):
+        self.wrappers = []
+        self.windows_ = []
+        for i in range(WINDOW_COUNT):
+            if i < VANILLA_WINDOW_COUNT:
+                wrapper = VanillaWindow()
+                wrapper.__name__ = f"Tool{i % 3}"
+                self.wrappers.append(wrapper)
+                self.windows_.append(Window(Delegate(wrapper)))
+            else:
+                self.windows_.append(Window(PlainDelegate()))
+        self.glyphs = [type("Glyph", (), {"name": f"glyph{i:05d}"})() for i in range(GLYPH_COUNT)]
+        self.selection = [g.name for g in self.glyphs[:SELECTED_COUNT]]
+        self.eventTimestamp = 0.0
+
+    def windows(self):
+        return self.windows_
+
+
+app = App()
+
+
+def scanVanillaWindows():
+    # the previous `getVanillaWindows`
+    result = {}
+    for w in app.windows():
+        delegate = w.delegate()
+        if delegate:
+            if not hasattr(delegate, "vanillaWrapper"):
+                continue
+            vanillaWrapper = delegate.vanillaWrapper()
+            if hasattr(vanillaWrapper, "__name__"):
+                result.setdefault(vanillaWrapper.__name__, []).append(vanillaWrapper)
+    return result
+
+
+def scanSelection():
+    selection = []
+    for gn in app.selection:
+        selection.append(gn)
+    return selection
+
+
+def scanVisibleGlyphNames():
+    return [g.name for g in app.glyphs]
+
+
+def session(getWindows, getSelection, getVisible):
+    for event in range(EVENTS):
+        app.eventTimestamp = float(event)
+        if event % 5 == 4:
+            app.selection = app.selection[1:]
+        for _ in range(FRAMES):
+            for _ in range(CALLS_PER_FRAME):
+                getWindows()
+                getSelection()
+                getVisible()
+
+
+def checkReload():
+    # reloading RFGadgets.UI replaces its observers and selection patches
+    # instead of adding another set
+    import sys
+    import importlib
+    import standins
+
+    standins.install()
+    from benchTools import LIB_PATH
+
+    if LIB_PATH not in sys.path:
+        sys.path.insert(0, LIB_PATH)
+    import AppKit
+    import mojo.events
+    from fontParts.base.base import SelectionMixin
+
+    from RFGadgets import UI
+
+    center = AppKit.NSNotificationCenter.defaultCenter()
+    counts = (len(center.observers), len(mojo.events._observers))
+    for _ in range(3):
+        importlib.reload(UI)
+    assert (len(center.observers), len(mojo.events._observers)) == counts
+    setter = SelectionMixin._set_base_selected
+    assert not hasattr(setter._selectionSetter, "_selectionSetter")
+    UI.removeUIStateObservers()
+    assert not center.observers and not mojo.events._observers
+    assert SelectionMixin._set_base_selected is setter._selectionSetter
+
+
+def main():
+    checkReload()
+    registry = uiState.UIStateRegistry(
+        scanVanillaWindows,
+        scanSelection,
+        scanVisibleGlyphNames,
+        tokens={
+            uiState.WINDOWS: lambda: len(app.windows()),
+            uiState.SELECTION: lambda: app.eventTimestamp,
+            uiState.VISIBILITY: lambda: app.eventTimestamp,
+        },
+    )
+    # the cached values are the same as the scanned ones
+    assert list(registry.selectedGlyphNames()) == scanSelection()
+    assert list(registry.visibleGlyphNames()) == scanVisibleGlyphNames()
+    assert registry.vanillaWindows() == scanVanillaWindows()
+    version = registry.version
+    assert not registry.changedSince(version)
+    app.selection = app.selection[1:]
+    app.eventTimestamp += 1
+    assert registry.changedSince(version, uiState.SELECTION)
+    assert not registry.changedSince(version, uiState.VISIBILITY)
+
+    calls = EVENTS * FRAMES * CALLS_PER_FRAME
+    app.selection = [g.name for g in app.glyphs[:SELECTED_COUNT]]
+    scanned = timeCall(session, scanVanillaWindows, scanSelection, scanVisibleGlyphNames, repeat=3)
+    app.selection = [g.name for g in app.glyphs[:SELECTED_COUNT]]
+    cached = timeCall(
+        session,
+        registry.vanillaWindows,
+        registry.selectedGlyphNames,
+        registry.visibleGlyphNames,
+        repeat=3,
+    )
+    version = registry.version
+    changed = timeCall(lambda: [registry.changedSince(version) for _ in range(calls)], repeat=3)
+    rows = [
+        ("scan on every call", f"{scanned:.1f}", f"{scanned * 1000 / calls:.2f}"),
+        ("UIStateRegistry", f"{cached:.1f}", f"{cached * 1000 / calls:.2f}"),
+        ("changedSince", f"{changed:.1f}", f"{changed * 1000 / calls:.2f}"),
+    ]
+    print(
+        f"{EVENTS} events x {FRAMES} redraws x {CALLS_PER_FRAME} calls of the 3 helpers, "
+        f"{WINDOW_COUNT} windows, {GLYPH_COUNT} visible glyphs"
+    )
+    printTable(("helpers", "total ms", "us per redraw call"), rows)
+    print(f"registry hits {registry.hits}, misses {registry.misses}")
+
+
+if __name__ == "__main__":
+    main()
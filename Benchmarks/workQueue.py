@@ -0,0 +1,118 @@
+"""
+Compares the longest time the app is blocked when the pending changes of a
+big scripted edit are processed in one block, or in slices by the idle time
+`WorkQueue` of `LazyGlyphSubscriber`.
+
+The second table replays a script that moves base glyphs in 4 masters
+through `AutoOffsetComponents`, with the work done in one block
+(`idleBudget = None`) or in slices, including moving the components.
+
+    python Benchmarks/workQueue.py
+"""
+import time
+from benchTools import loadModule, printTable
+from harness import Event, loadSubscriberClass, replay
+from standins.fonts import makeSyntheticFamily
+
+workQueue = loadModule("RFGadgets/observers/workQueue.py")
+
+ITEM_COUNTS = (100, 1000, 3000)
+ITEM_COST = 0.0002  # seconds of work per glyph
+BUDGET = 0.008
+MOVED_COUNTS = (100, 1000, 2000)
+MASTER_COUNT = 4
+
+
+def work():
+    end = time.perf_counter() + ITEM_COST
+    while time.perf_counter() < end:
+        pass
+
+
+def scriptMovesMasters(fonts, movedCount):
+    events = []
+    for i, font in enumerate(fonts):
+        for glyphName in font.glyphOrder[:movedCount]:
+            events.append(
+                Event(0.0, "adjunctGlyphDidChangeOutline", i, glyphName, ("moveBy", (0, 15)))
+            )
+    events.append(Event(0.1, "roboFontDidBecomeActive"))
+    return events
+
+
+def replaySlices(subscriberClass, movedCount, idleBudget):
+    durations = []
+
+    def _drainWork(self):
+        start = time.perf_counter()
+        subscriberClass._drainWork(self)
+        durations.append((time.perf_counter() - start) * 1000)
+
+    cls = type(
+        subscriberClass.__name__,
+        (subscriberClass,),
+        {"idleBudget": idleBudget, "_drainWork": _drainWork, "__module__": subscriberClass.__module__},
+    )
+    fonts = makeSyntheticFamily(MASTER_COUNT, glyphCount=2000, compositeCount=3000)
+    result = replay(cls, fonts, scriptMovesMasters(fonts, movedCount))
+    return result, durations
+
+
+def subscriberRows():
+    AutoOffsetComponents = loadSubscriberClass("compositeFixature", "AutoOffsetComponents")
+    rows = []
+    for movedCount in MOVED_COUNTS:
+        blocking, _ = replaySlices(AutoOffsetComponents, movedCount, None)
+        sliced, durations = replaySlices(AutoOffsetComponents, movedCount, BUDGET)
+        rows.append((
+            movedCount,
+            f"{blocking.deferred * 1000:.1f}",
+            len(durations),
+            f"{max(durations):.1f}",
+            blocking.undoSteps,
+            sliced.undoSteps,
+        ))
+    return rows
+
+
+def main():
+    rows = []
+    for itemCount in ITEM_COUNTS:
+        start = time.perf_counter()
+        for _ in range(itemCount):
+            work()
+        blocking = (time.perf_counter() - start) * 1000
+
+        queue = workQueue.WorkQueue(budget=BUDGET)
+        for i in range(itemCount):
+            queue.push(i, work)
+        longestSlice = 0
+        remaining = True
+        while remaining:
+            start = time.perf_counter()
+            remaining = queue.drain()
+            longestSlice = max(longestSlice, (time.perf_counter() - start) * 1000)
+        rows.append((
+            itemCount,
+            f"{blocking:.1f}",
+            queue.sliceCount,
+            f"{longestSlice:.1f}",
+        ))
+    printTable(("glyphs", "one block ms", "slices", "longest slice ms"), rows)
+    print()
+    print(f"AutoOffsetComponents, base glyphs moved by a script in {MASTER_COUNT} masters")
+    printTable(
+        (
+            "moved glyphs",
+            "one block ms",
+            "slices",
+            "longest slice ms",
+            "one block undo",
+            "sliced undo",
+        ),
+        subscriberRows(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+import os
 import vanilla
+from vanilla.dialogs import getFolder
 from mojo.extensions import getExtensionDefault, setExtensionDefault
 from RFGadgets.observers.startup import getRoboFontGadgetsSubscribers, EXTENSION_ID
 
@@ -7,7 +9,7 @@ class SettingsWindow:
     def __init__(self):
         self.availableSubscribers = getRoboFontGadgetsSubscribers()
         height = len(self.availableSubscribers) * 30 + 20
-        self.w = vanilla.Window((300, height), "Subscribers Settings")
+        self.w = vanilla.Window((300, height + 100), "Subscribers Settings")
         self.extensionSettings = getExtensionDefault(f"{EXTENSION_ID}.subscribers", {})
         for i, subClass in enumerate(self.availableSubscribers):
             isActive = subClass.isActive()
@@ -18,6 +20,26 @@ class SettingsWindow:
             checkbox.set(isActive)
             checkbox.subClass = subClass
             setattr(self.w, f"checkbox_{i}", checkbox)
+        self.w.line = vanilla.HorizontalLine((20, height, -20, 1))
+        self.w.profiling = vanilla.CheckBox(
+            (20, height + 10, -10, 22),
+            "Collect callback timings",
+            callback=self.profilingCallback,
+        )
+        self.w.profiling.set(
+            any(subClass.isProfiling() for subClass in self.availableSubscribers)
+        )
+        self.w.showTimings = vanilla.Button(
+            (20, height + 40, -20, 20), "Show Timings", callback=self.showTimingsCallback
+        )
+        self.w.recording = vanilla.CheckBox(
+            (20, height + 70, -10, 22),
+            "Record events",
+            callback=self.recordingCallback,
+        )
+        self.w.recording.set(
+            any(subClass.isRecording() for subClass in self.availableSubscribers)
+        )
         self.w.open()
 
     def checkboxCallback(self, sender):
@@ -33,6 +55,91 @@ class SettingsWindow:
                 subClass.deactivate()
         setExtensionDefault(f"{EXTENSION_ID}.subscribers", self.extensionSettings)
 
+    def profilingCallback(self, sender):
+        # subscribers are reactivated, so the wrapped callbacks are observed
+        for subClass in self.availableSubscribers:
+            if sender.get():
+                subClass.enableProfiling()
+            else:
+                subClass.disableProfiling()
+            subClass.reactivate()
+
+    def recordingCallback(self, sender):
+        # the recordings are saved when recording is stopped, so they can be
+        # replayed with `Benchmarks/replayEvents.py`
+        folder = None
+        if not sender.get():
+            folders = getFolder(messageText="Save the recorded events to:")
+            folder = folders[0] if folders else None
+        for subClass in self.availableSubscribers:
+            if sender.get():
+                subClass.startRecording()
+            elif subClass.isRecording():
+                path = None
+                if folder is not None:
+                    path = os.path.join(folder, f"{subClass.__name__}.events.json.gz")
+                subClass.stopRecording(path)
+            subClass.reactivate()
+
+    def showTimingsCallback(self, sender):
+        TimingsWindow(self.availableSubscribers)
+
+
+class TimingsWindow:
+    """
+    Shows the callback timings collected by the profiling of the subscribers.
+    """
+
+    columns = [
+        {"title": "Subscriber", "key": "subscriber"},
+        {"title": "Callback", "key": "callback"},
+        {"title": "Calls", "key": "count", "width": 50},
+        {"title": "Total ms", "key": "total", "width": 70},
+        {"title": "p50 ms", "key": "p50", "width": 60},
+        {"title": "p99 ms", "key": "p99", "width": 60},
+        {"title": "Slowest Glyphs", "key": "slowestGlyphs"},
+    ]
+
+    def __init__(self, subscribers):
+        self.subscribers = subscribers
+        self.w = vanilla.Window(
+            (800, 400), "Subscriber Timings", minSize=(400, 200)
+        )
+        self.w.list = vanilla.List(
+            (0, 0, -0, -40), [], columnDescriptions=self.columns
+        )
+        self.w.refresh = vanilla.Button(
+            (-190, -30, 80, 20), "Refresh", callback=self.refreshCallback
+        )
+        self.w.reset = vanilla.Button(
+            (-100, -30, 80, 20), "Reset", callback=self.resetCallback
+        )
+        self.refreshCallback(None)
+        self.w.open()
+
+    def refreshCallback(self, sender):
+        items = []
+        for subClass in self.subscribers:
+            for callbackName, stats in subClass.profilingSnapshot().items():
+                items.append(
+                    {
+                        "subscriber": subClass.__name__,
+                        "callback": callbackName,
+                        "count": stats["count"],
+                        "total": f"{stats['total']:.1f}",
+                        "p50": f"{stats['p50']:.2f}",
+                        "p99": f"{stats['p99']:.2f}",
+                        "slowestGlyphs": ", ".join(stats["slowestGlyphs"]),
+                    }
+                )
+        items.sort(key=lambda item: float(item["total"]), reverse=True)
+        self.w.list.set(items)
+
+    def resetCallback(self, sender):
+        for subClass in self.subscribers:
+            subClass.resetProfiling()
+        self.refreshCallback(None)
+
+
 if __name__ == "__main__":
     SettingsWindow()
-
@@ -1,7 +1,42 @@
 import mojo.UI
+import mojo.events
 from AppKit import NSApp
 from mojo.roboFont import CurrentFont, CurrentGlyph
 import AppKit
+from fontParts.base.base import SelectionMixin
+from fontParts.base.layer import _BaseGlyphVendor
+from RFGadgets.uiState import UIStateRegistry, WINDOWS, SELECTION, VISIBILITY
+from RFGadgets.glyphSetFilter import GlyphSetFilters
+
+# notifications of the app and of RoboFont after which the cached values are
+# computed again
+WINDOW_NOTIFICATIONS = (
+    AppKit.NSWindowDidBecomeKeyNotification,
+    AppKit.NSWindowDidBecomeMainNotification,
+    AppKit.NSWindowWillCloseNotification,
+)
+SELECTION_EVENTS = (
+    "currentGlyphChanged",
+    "fontBecameCurrent",
+    "fontResignCurrent",
+    "fontDidOpen",
+    "newFontDidOpen",
+    "fontWillClose",
+    "spaceCenterSelectionChanged",
+)
+VISIBILITY_EVENTS = (
+    "fontBecameCurrent",
+    "fontDidOpen",
+    "newFontDidOpen",
+    "fontWillClose",
+)
+# setters of the fontParts selection that scripts use, the cached selection
+# is invalidated after each of them
+SELECTION_SETTERS = (
+    (SelectionMixin, "_set_base_selected"),
+    (_BaseGlyphVendor, "_set_base_selectedGlyphs"),
+    (_BaseGlyphVendor, "_set_base_selectedGlyphNames"),
+)
 
 
 def _getCurrentSelectedGlyphNames():
@@ -26,7 +61,11 @@ def _getCurrentSelectedGlyphNames():
     return selection
 
 
-mojo.UI.CurrentSelectedGlyphNames = _getCurrentSelectedGlyphNames
+def _getCachedCurrentSelectedGlyphNames():
+    return list(uiState.selectedGlyphNames())
+
+
+mojo.UI.CurrentSelectedGlyphNames = _getCachedCurrentSelectedGlyphNames
 
 
 def _enableDarkMode():
@@ -37,10 +76,20 @@ def _enableDarkMode():
 mojo.UI.enableDarkMode = _enableDarkMode
 
 
+def _makeGlyphSetPredicate(glyph_set):
+    # the names are an argument of the predicate, not a literal in the
+    # format, so they are not parsed and quotes in names don't break it
+    names = AppKit.NSSet.setWithArray_(list(glyph_set))
+    return AppKit.NSPredicate.predicateWithFormat_argumentArray_("Name IN %@", [names])
+
+
+glyphSetFilters = GlyphSetFilters(_makeGlyphSetPredicate)
+
+
 def _limitFontViewToGlyphSet(glyph_set):
-    queryText = 'Name in {"%s"}' % '", "'.join(glyph_set)
-    query = AppKit.NSPredicate.predicateWithFormat_(queryText)
+    query = glyphSetFilters.predicate(glyph_set)
     mojo.UI.CurrentFontWindow().getGlyphCollection().setQuery(query)
+    uiState.invalidateVisibility()
 
 
 mojo.UI.limitFontViewToGlyphSet = _limitFontViewToGlyphSet
@@ -63,7 +112,11 @@ def _getVanillaWindows():
     return result
 
 
-mojo.UI.getVanillaWindows = _getVanillaWindows
+def _getCachedVanillaWindows():
+    return uiState.vanillaWindows()
+
+
+mojo.UI.getVanillaWindows = _getCachedVanillaWindows
 
 
 def _getVisibleGlyphNames():
@@ -71,4 +124,125 @@ def _getVisibleGlyphNames():
     return [g.name for g in visibleGlyphs]
 
 
-mojo.UI.getVisibleGlyphNames = _getVisibleGlyphNames
+def _getCachedVisibleGlyphNames():
+    return list(uiState.visibleGlyphNames())
+
+
+mojo.UI.getVisibleGlyphNames = _getCachedVisibleGlyphNames
+
+
+def _currentEventToken():
+    # changes with every click and key press, which can change the selection
+    # or the visible glyphs without a notification. So the cached selection
+    # is only reused within one event, e.g. by the tools that draw or are
+    # called after the same click. Without an event (e.g. in some timer
+    # callbacks) nothing is cached.
+    event = NSApp().currentEvent()
+    return object() if event is None else event.timestamp()
+
+
+def _visibilityToken():
+    # the query can be set on the glyph collection by any code, not only by
+    # `limitFontViewToGlyphSet`
+    fontWindow = mojo.UI.CurrentFontWindow()
+    query = None if fontWindow is None else fontWindow.getGlyphCollection().getQuery()
+    return _currentEventToken(), query
+
+
+def _windowCount():
+    return NSApp().windows().count()
+
+
+uiState = UIStateRegistry(
+    _getVanillaWindows,
+    _getCurrentSelectedGlyphNames,
+    _getVisibleGlyphNames,
+    tokens={
+        WINDOWS: _windowCount,
+        SELECTION: _currentEventToken,
+        VISIBILITY: _visibilityToken,
+    },
+)
+mojo.UI.uiState = uiState
+
+
+class _UIStateObserver:
+
+    def invalidateSelection(self, info):
+        uiState.invalidateSelection()
+
+    def invalidateVisibility(self, info):
+        uiState.invalidateVisibility()
+
+
+def _windowNotification(notification):
+    uiState.invalidate()
+
+
+def _invalidatingSelection(setter):
+    # a selection set by a script is read back in the same event or timer
+    # callback, so it doesn't wait for the next event
+
+    def wrapper(self, value):
+        try:
+            return setter(self, value)
+        finally:
+            uiState.invalidateSelection()
+
+    wrapper.__name__ = setter.__name__
+    wrapper.__wrapped__ = setter
+    wrapper._selectionSetter = setter
+    return wrapper
+
+
+# the observers and patches of the last import of this module are kept on
+# `mojo.UI`, which isn't reloaded, so reloading this module replaces them
+# instead of adding another set
+_INSTALLED_KEY = "_rfGadgetsUIStateObservers"
+
+
+def removeUIStateObservers():
+    """
+    Removes the observers that invalidate the cached UI state and puts back
+    the original fontParts selection setters.
+    """
+    installed = getattr(mojo.UI, _INSTALLED_KEY, None)
+    if installed is None:
+        return
+    observer, events, tokens = installed
+    for event in events:
+        mojo.events.removeObserver(observer, event)
+    notificationCenter = AppKit.NSNotificationCenter.defaultCenter()
+    for token in tokens:
+        notificationCenter.removeObserver_(token)
+    for cls, name in SELECTION_SETTERS:
+        setter = cls.__dict__.get(name)
+        original = getattr(setter, "_selectionSetter", None)
+        if original is not None:
+            setattr(cls, name, original)
+    delattr(mojo.UI, _INSTALLED_KEY)
+
+
+def _addUIStateObservers():
+    removeUIStateObservers()
+    observer = _UIStateObserver()
+    for event in SELECTION_EVENTS:
+        mojo.events.addObserver(observer, "invalidateSelection", event)
+    for event in VISIBILITY_EVENTS:
+        mojo.events.addObserver(observer, "invalidateVisibility", event)
+    notificationCenter = AppKit.NSNotificationCenter.defaultCenter()
+    tokens = [
+        notificationCenter.addObserverForName_object_queue_usingBlock_(
+            name, None, None, _windowNotification
+        )
+        for name in WINDOW_NOTIFICATIONS
+    ]
+    for cls, name in SELECTION_SETTERS:
+        setter = getattr(cls, name)
+        setter = getattr(setter, "_selectionSetter", setter)
+        setattr(cls, name, _invalidatingSelection(setter))
+    events = set(SELECTION_EVENTS) | set(VISIBILITY_EVENTS)
+    setattr(mojo.UI, _INSTALLED_KEY, (observer, events, tokens))
+
+
+_addUIStateObservers()
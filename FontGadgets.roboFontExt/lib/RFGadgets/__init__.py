@@ -1 +1,8 @@
-from RFGadgets import UI
\ No newline at end of file
+import os
+
+# set in the worker processes of RFGadgets.masterExtraction, which import
+# the package outside of RoboFont and don't need the UI patches
+WORKER_ENVIRONMENT_KEY = "RFGADGETS_WORKER"
+
+if not os.environ.get(WORKER_ENVIRONMENT_KEY):
+    from RFGadgets import UI
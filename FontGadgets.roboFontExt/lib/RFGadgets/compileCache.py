@@ -0,0 +1,394 @@
+"""
+Content addressed on-disk cache for compiling fonts record by record.
+
+The records of `font.iterSerializedDataForCompile()` (one per section and
+one per glyph of the default layer) are hashed, and the output of compiling
+a record is stored under its hash. When a font is compiled again after a
+few edits, only the records with a new hash are compiled, the rest comes
+from the cache:
+
+    from RFGadgets.compileCache import CompileCache, compileRecords
+
+    cache = CompileCache(cachePath, salt=compilerVersion)
+    outputs, delta = compileRecords(
+        font.iterSerializedDataForCompile(), compileRecord, cache, font.path
+    )
+    print(delta)
+
+`compileRecord` receives a record and returns any picklable object. The
+hash of a composite glyph also covers the hashes of its base glyphs, so it
+is compiled again when one of them changes. The `salt` should change when
+the compiler changes, otherwise the outputs of the old compiler are reused.
+The total size of the cached outputs is limited to `maxBytes`, the least
+recently used outputs are removed first.
+
+The outputs are stored in a single sqlite database and looked up and
+written in one query per compile, thousands of small files made the first
+compile slower than compiling without the cache.
+"""
+import os
+import json
+import pickle
+import sqlite3
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# protocol of the pickles of the values that json can't encode, fixed so the
+# hashes don't change with the python version
+HASH_PROTOCOL = 4
+
+
+def recordKey(record: Tuple) -> str:
+    """
+    Returns the key of a record, e.g. 'section:kerning' or 'glyph:a'.
+    """
+    if record[0] == "layer":
+        return "layer"
+    return f"{record[0]}:{record[1]}"
+
+
+def _jsonDefault(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return {"<set>": sorted(canonicalEncoding(item).hex() for item in value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {"<bytes>": bytes(value).hex()}
+    return {"<pickle>": pickle.dumps(value, protocol=HASH_PROTOCOL).hex()}
+
+
+_jsonEncoder = json.JSONEncoder(
+    sort_keys=True,
+    separators=(",", ":"),
+    ensure_ascii=False,
+    check_circular=False,
+    default=_jsonDefault,
+)
+
+
+def _encode(value: Any, parts: List[bytes]) -> None:
+    # for the values that json can't sort, e.g. dicts with tuple keys like
+    # the kerning
+    if isinstance(value, dict):
+        items = sorted((canonicalEncoding(k), v) for k, v in value.items())
+        parts.append(b"d%d:" % len(items))
+        for key, item in items:
+            parts.append(key)
+            _encode(item, parts)
+    elif isinstance(value, (list, tuple)):
+        parts.append(b"l%d:" % len(value))
+        for item in value:
+            _encode(item, parts)
+    else:
+        data = canonicalEncoding(value)
+        parts.append(b"v%d:" % len(data))
+        parts.append(data)
+
+
+def canonicalEncoding(value: Any) -> bytes:
+    """
+    Returns bytes that only depend on the content of the value: the items
+    of dicts and sets are sorted, unlike in a pickle where they follow the
+    insertion or hash order.
+    """
+    try:
+        return _jsonEncoder.encode(value).encode("utf-8")
+    except TypeError:
+        pass
+    # json output never starts with a null byte
+    parts = [b"\0"]
+    _encode(value, parts)
+    return b"".join(parts)
+
+
+def recordHash(record: Tuple, salt: str = "") -> str:
+    h = hashlib.blake2b(salt.encode("utf-8"), digest_size=20)
+    h.update(canonicalEncoding(record))
+    return h.hexdigest()
+
+
+def componentBaseGlyphs(record: Tuple) -> List[str]:
+    """
+    Returns the base glyph names of the components of a glyph record.
+    """
+    if record[0] != "glyph":
+        return []
+    components = record[2].get("components") or ()
+    return [c["baseGlyph"] for c in components if c.get("baseGlyph") is not None]
+
+
+def compositeHashes(
+    glyphHashes: Dict[str, str], baseGlyphs: Dict[str, List[str]], salt: str = ""
+) -> Dict[str, str]:
+    """
+    Returns the hashes of the composite glyphs combined with the hashes of
+    their base glyphs, nested composites included. Missing base glyphs are
+    hashed by name and a component cycle is cut where it closes.
+    """
+    result: Dict[str, str] = {}
+
+    def resolve(glyphName: str, visiting: set) -> str:
+        digest = result.get(glyphName)
+        if digest is not None:
+            return digest
+        own = glyphHashes.get(glyphName)
+        bases = baseGlyphs.get(glyphName)
+        if own is None or not bases or glyphName in visiting:
+            return own or f"missing:{glyphName}"
+        visiting.add(glyphName)
+        h = hashlib.blake2b(salt.encode("utf-8"), digest_size=20)
+        h.update(own.encode("ascii"))
+        for baseGlyph in bases:
+            h.update(b";")
+            h.update(resolve(baseGlyph, visiting).encode("utf-8"))
+        visiting.discard(glyphName)
+        digest = result[glyphName] = h.hexdigest()
+        return digest
+
+    for glyphName in baseGlyphs:
+        resolve(glyphName, set())
+    return result
+
+
+class CompileDelta(NamedTuple):
+    """
+    The keys of the records that were added, changed, removed or unchanged
+    since the previous compile of the same font, and how many of the
+    compiled records were found in the cache.
+    """
+
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+    unchanged: List[str]
+    hits: int
+    misses: int
+
+    @property
+    def compiled(self) -> int:
+        return self.misses
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed, {len(self.unchanged)} unchanged, "
+            f"{self.hits} from cache, {self.misses} compiled"
+        )
+
+
+class CompileCache:
+    """
+    Stores the pickled outputs by the hash of their record in the sqlite
+    database `path/compileCache.sqlite`, together with the hashes of the
+    records of the last compile of each font to report the delta.
+
+    Args:
+        path (str): Folder of the cache, created if needed.
+        maxBytes (int): The least recently used outputs are removed when the
+            cached outputs are larger than this.
+        salt (str): Added to every hash, e.g. the version of the compiler.
+    """
+
+    def __init__(self, path: str, maxBytes: int = DEFAULT_MAX_BYTES, salt: str = "") -> None:
+        self.path = path
+        self.maxBytes = maxBytes
+        self.salt = salt
+        os.makedirs(path, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(path, "compileCache.sqlite"))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._createTables()
+        row = self._db.execute("SELECT MAX(used) FROM outputs").fetchone()
+        # incremented on each compile, outputs with the lowest value are the
+        # least recently used
+        self._clock = (row[0] or 0) + 1
+
+    def _createTables(self) -> None:
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)"
+            )
+            settings = dict(self._db.execute("SELECT name, value FROM settings"))
+            if settings and (
+                settings.get("version") != str(SCHEMA_VERSION)
+                or settings.get("salt") != self.salt
+            ):
+                # outputs of another compiler are never looked up again
+                self._db.execute("DROP TABLE IF EXISTS outputs")
+                self._db.execute("DROP TABLE IF EXISTS manifests")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS outputs "
+                "(key TEXT PRIMARY KEY, data BLOB, size INTEGER, used INTEGER)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS outputsUsed ON outputs (used)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS manifests "
+                "(font TEXT, record TEXT, key TEXT, PRIMARY KEY (font, record))"
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO settings VALUES (?, ?)",
+                [("version", str(SCHEMA_VERSION)), ("salt", self.salt)],
+            )
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM outputs").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        return self._db.execute("SELECT 1 FROM outputs WHERE key = ?", (key,)).fetchone() is not None
+
+    @property
+    def totalBytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM outputs").fetchone()[0]
+
+    def hash(self, record: Tuple) -> str:
+        return recordHash(record, self.salt)
+
+    def getMany(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Returns the cached outputs of the given keys that are in the cache
+        and marks them as used.
+        """
+        keys = list(keys)
+        result = {}
+        with self._db:
+            self._db.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (key TEXT PRIMARY KEY)")
+            self._db.execute("DELETE FROM wanted")
+            self._db.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((k,) for k in keys))
+            for key, data in self._db.execute(
+                "SELECT key, data FROM outputs WHERE key IN (SELECT key FROM wanted)"
+            ):
+                try:
+                    result[key] = pickle.loads(data)
+                except Exception:
+                    logger.warning("Unreadable compile cache entry %s", key)
+            self._db.execute(
+                "UPDATE outputs SET used = ? WHERE key IN (SELECT key FROM wanted)",
+                (self._clock,),
+            )
+        return result
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.getMany([key]).get(key, default)
+
+    def putMany(self, items: Iterable[Tuple[str, Any]]) -> None:
+        rows = []
+        for key, value in items:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append((key, data, len(data), self._clock))
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?)", rows)
+        self.evict()
+
+    def put(self, key: str, value: Any) -> None:
+        self.putMany([(key, value)])
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used outputs until the cache is not
+        larger than `maxBytes`. Returns the number of removed outputs.
+        """
+        excess = self.totalBytes - self.maxBytes
+        if excess <= 0:
+            return 0
+        removed = []
+        for key, size in self._db.execute("SELECT key, size FROM outputs ORDER BY used"):
+            removed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        with self._db:
+            self._db.executemany("DELETE FROM outputs WHERE key = ?", removed)
+        return len(removed)
+
+    def manifest(self, name: str) -> Dict[str, str]:
+        """
+        Returns the record hashes of the last compile of the given font.
+        """
+        return dict(
+            self._db.execute("SELECT record, key FROM manifests WHERE font = ?", (name,))
+        )
+
+    def setManifest(self, name: str, manifest: Dict[str, str]) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM manifests WHERE font = ?", (name,))
+            self._db.executemany(
+                "INSERT INTO manifests VALUES (?, ?, ?)",
+                ((name, record, key) for record, key in manifest.items()),
+            )
+
+    def tick(self) -> None:
+        # outputs used after this are more recent than the ones used before
+        self._clock += 1
+
+    def clear(self) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM outputs")
+            self._db.execute("DELETE FROM manifests")
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def compileRecords(
+    records: Iterable[Tuple],
+    compileRecord: Callable[[Tuple], Any],
+    cache: CompileCache,
+    name: Optional[str] = None,
+) -> Tuple[Dict[str, Any], CompileDelta]:
+    """
+    Compiles the records that are not in the cache and returns the outputs
+    of all the records by their key, and the delta since the previous
+    compile of the font `name`.
+    """
+    previous = cache.manifest(name) if name is not None else {}
+    pending = []
+    glyphHashes = {}
+    baseGlyphs = {}
+    for record in records:
+        digest = cache.hash(record)
+        pending.append((recordKey(record), digest, record))
+        if record[0] == "glyph":
+            glyphHashes[record[1]] = digest
+            bases = componentBaseGlyphs(record)
+            if bases:
+                baseGlyphs[record[1]] = bases
+    if baseGlyphs:
+        composites = compositeHashes(glyphHashes, baseGlyphs, cache.salt)
+        pending = [
+            (key, composites.get(record[1], digest) if record[0] == "glyph" else digest, record)
+            for key, digest, record in pending
+        ]
+    manifest = {}
+    added, changed, unchanged = [], [], []
+    for key, digest, record in pending:
+        manifest[key] = digest
+        previousDigest = previous.get(key)
+        if previousDigest is None:
+            added.append(key)
+        elif previousDigest != digest:
+            changed.append(key)
+        else:
+            unchanged.append(key)
+    removed = [key for key in previous if key not in manifest]
+    cache.tick()
+    cached = cache.getMany(digest for _, digest, _ in pending)
+    outputs = {}
+    compiled = {}
+    for key, digest, record in pending:
+        if digest in cached:
+            outputs[key] = cached[digest]
+            continue
+        if digest not in compiled:
+            compiled[digest] = compileRecord(record)
+        outputs[key] = compiled[digest]
+    cache.putMany(compiled.items())
+    if name is not None:
+        cache.setManifest(name, manifest)
+    delta = CompileDelta(
+        added, changed, removed, unchanged, len(pending) - len(compiled), len(compiled)
+    )
+    logger.debug("compiled %s: %s", name, delta)
+    return outputs, delta
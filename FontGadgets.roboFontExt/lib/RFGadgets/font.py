@@ -1,48 +1,207 @@
 from fontgadgets.decorators import *
 
-@font_method
-def serializedDataForCompile(font):
-	keep = [
+import os
+import pickle
+import struct
+from RFGadgets.glifReader import readAdvanceWidths, readGlyphFileNames
+
+# sections of the font that are needed to compile it
+COMPILE_SECTIONS = (
 	'features',
 	'groups',
 	'kerning',
 	'layers',
-	]
+	)
 
-	defLayers = [
+DEFAULT_LAYER_NAMES = (
 	'public.default',
 	'foreground'
-	]
+	)
+
+STREAM_MAGIC = b'FGSC\x01'
+_FRAME_HEADER = struct.Struct('>I')
 
-	def _getDefLayer(layers):
-		for l in layers:
-			if l[0] in defLayers:
-				return l
+def _getDefLayer(font):
+	for name in font.layers.layerOrder:
+		if name in DEFAULT_LAYER_NAMES:
+			return font.layers[name]
 
-	data = font.getDataForSerialization()
+@font_method
+def iterSerializedDataForCompile(font, sections=COMPILE_SECTIONS):
+	"""
+	Yields the serialized data of the font for compiling, without
+	serializing the other sections and layers. The records are:
+
+	('section', key, data) for each of the sections except layers
+	('layer', name, data, isDefault) for the default layer without its glyphs
+	('glyph', name, data) for each glyph of the default layer
+	"""
+	simpleSections = [s for s in sections if s != 'layers']
+	if simpleSections:
+		data = font.getDataForSerialization(whitelist=simpleSections)
+		for k in simpleSections:
+			if k in data:
+				yield ('section', k, data[k])
+	if 'layers' in sections:
+		defLayer = _getDefLayer(font)
+		assert defLayer is not None
+		isDefault = defLayer == font.layers.defaultLayer
+		yield ('layer', defLayer.name, defLayer.getDataForSerialization(blacklist=['glyphs']), isDefault)
+		for gname in defLayer.keys():
+			yield ('glyph', gname, defLayer[gname].getDataForSerialization())
+
+def assembleSerializedDataForCompile(records):
+	"""
+	Builds the dict of `serializedDataForCompile` from the records of
+	`iterSerializedDataForCompile` or `readSerializedDataForCompile`.
+	"""
 	result = {}
-	for k, v in data.items():
-		if k in keep:
-			if k == 'layers':
-				defLayer = _getDefLayer(v['layers'])
-				assert defLayer is not None
-				v['layers'] = [defLayer]
-			result[k] = v
+	layerData = None
+	for record in records:
+		kind = record[0]
+		if kind == 'section':
+			result[record[1]] = record[2]
+		elif kind == 'layer':
+			_, name, layerData, isDefault = record
+			layerData = dict(layerData)
+			layerData['glyphs'] = {}
+			result['layers'] = {'layers': [(name, layerData, isDefault)]}
+		elif kind == 'glyph':
+			layerData['glyphs'][record[1]] = record[2]
 	return result
 
-def getSortedFonts(fonts=None):
+@font_method
+def serializedDataForCompile(font, sections=COMPILE_SECTIONS):
+	"""
+	Returns the serialized data of the given sections of the font, with only
+	the default layer in the layers.
+	"""
+	return assembleSerializedDataForCompile(iterSerializedDataForCompile(font, sections))
+
+@font_method
+def writeSerializedDataForCompile(font, stream, sections=COMPILE_SECTIONS):
+	"""
+	Writes the records of `iterSerializedDataForCompile` to a binary stream
+	(e.g. a pipe to a compile worker) as length prefixed pickles, one record
+	at a time, so the reader can start before all the glyphs are written.
+	Returns the number of written bytes.
+	"""
+	stream.write(STREAM_MAGIC)
+	written = len(STREAM_MAGIC)
+	for record in iterSerializedDataForCompile(font, sections):
+		frame = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+		stream.write(_FRAME_HEADER.pack(len(frame)))
+		stream.write(frame)
+		written += _FRAME_HEADER.size + len(frame)
+	stream.flush()
+	return written
+
+@font_method
+def compileWithCache(font, compileRecord, cache, sections=COMPILE_SECTIONS):
+	"""
+	Compiles the records of `iterSerializedDataForCompile` with
+	`compileRecord`, reusing the outputs of the unchanged records from the
+	given `RFGadgets.compileCache.CompileCache`. Returns the outputs by
+	record key and the delta since the previous compile of the font.
+	"""
+	from RFGadgets.compileCache import compileRecords
+	name = font.path or f"{font.info.familyName} {font.info.styleName}"
+	return compileRecords(iterSerializedDataForCompile(font, sections), compileRecord, cache, name)
+
+def readSerializedDataForCompile(stream):
+	"""
+	Yields the records written by `writeSerializedDataForCompile`.
+	"""
+	magic = stream.read(len(STREAM_MAGIC))
+	if magic != STREAM_MAGIC:
+		raise ValueError("Not a serialized font stream.")
+	while True:
+		header = stream.read(_FRAME_HEADER.size)
+		if not header:
+			return
+		size, = _FRAME_HEADER.unpack(header)
+		yield pickle.loads(stream.read(size))
+
+# number of glyphs the widths of the fonts are compared on
+SORT_SAMPLE_SIZE = 32
+
+def _isPath(font):
+	return isinstance(font, (str, os.PathLike))
+
+def _fontGlyphNames(font):
+	if _isPath(font):
+		return list(readGlyphFileNames(os.fspath(font)))
+	return list(font.glyphOrder) or list(font.keys())
+
+def _sampleGlyphNames(glyphNames, sampleSize):
+	if len(glyphNames) <= sampleSize:
+		return glyphNames
+	step = len(glyphNames) / sampleSize
+	return [glyphNames[int(i * step)] for i in range(sampleSize)]
+
+def getWidthMatrix(fonts, glyphNames):
+	"""
+	Returns a numpy array of the widths of the given glyphs (rows) in the
+	fonts (columns). The fonts can be open fonts or UFO paths, the widths of
+	the UFOs are read from their `.glif` files without loading the font.
+	Missing glyphs are NaN.
+	"""
+	import numpy as np
+	matrix = np.full((len(glyphNames), len(fonts)), np.nan)
+	fileNameHints = None
+	for col, font in enumerate(fonts):
+		if _isPath(font):
+			path = os.fspath(font)
+			if fileNameHints is None:
+				fileNameHints = readGlyphFileNames(path)
+			widths = readAdvanceWidths(path, glyphNames, fileNameHints)
+			matrix[:, col] = [widths.get(g, np.nan) for g in glyphNames]
+		else:
+			matrix[:, col] = [font[g].width if g in font else np.nan for g in glyphNames]
+	return matrix
+
+def getSortedFonts(fonts=None, sampleSize=SORT_SAMPLE_SIZE):
 	"""
 	Returns all the fonts based on their `glyph.width`. In most cases this will
 	result in fonts being sorted by weight. If the argument is not provided then
 	the all the open fonts will be returned.
+
+	The fonts can be open fonts or paths of UFOs, mixed. The widths of up to
+	`sampleSize` glyphs that are in all the fonts are compared: each width is
+	divided by the median width of its glyph in all the fonts, and the fonts
+	are sorted by the median of these ratios, so a few glyphs that are wider
+	in a lighter master don't change the order.
 	"""
+	import numpy as np
 	if fonts is None:
 		fonts = AllFonts()
-	numFonts = len(fonts)
-	for gname in fonts[0].glyphOrder:
-		try:
-			widths = {f[gname].width: f for f in fonts}
-		except KeyError:
-			continue
-		if len(widths) == numFonts:
-			return [widths[w] for w in sorted(widths)]
+	fonts = list(fonts)
+	if len(fonts) < 2:
+		return fonts
+	glyphNames = _fontGlyphNames(fonts[0])
+	matrix = getWidthMatrix(fonts, _sampleGlyphNames(glyphNames, sampleSize))
+	matrix = matrix[~np.isnan(matrix).any(axis=1)]
+	if not len(matrix):
+		# none of the sampled glyphs are in all the fonts, sample the ones
+		# that are
+		common = set(glyphNames)
+		for font in fonts[1:]:
+			common.intersection_update(_fontGlyphNames(font))
+		glyphNames = [g for g in glyphNames if g in common]
+		if not glyphNames:
+			raise ValueError("The fonts have no glyphs in common to sort them by width.")
+		matrix = getWidthMatrix(fonts, _sampleGlyphNames(glyphNames, sampleSize))
+	# glyphs with the same width in all the fonts (e.g. zero width marks or
+	# tabular figures) don't tell anything about the order
+	spread = matrix.max(axis=1) - matrix.min(axis=1)
+	matrix = matrix[spread > 0]
+	if not len(matrix):
+		return fonts
+	medians = np.median(matrix, axis=1, keepdims=True)
+	medians[medians == 0] = 1
+	ratios = matrix / medians
+	scores = np.median(ratios, axis=0)
+	# the mean breaks the ties of the median
+	tieBreaks = ratios.mean(axis=0)
+	order = np.lexsort((tieBreaks, scores))
+	return [fonts[i] for i in order]
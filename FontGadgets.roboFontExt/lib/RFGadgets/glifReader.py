@@ -0,0 +1,116 @@
+"""
+Reads single values from the files of a UFO without loading the font.
+
+The `.glif` files are fed to expat in small chunks and the parsing stops at
+the `advance` element, which comes before the outline in the files written
+by fontTools.ufoLib, so usually only the first chunk of a glyph is read.
+
+The masters of a family usually have the same glyph file names, the file
+names of one UFO can be given as hints to `readAdvanceWidths` for the
+others, which then don't need to read their `contents.plist`. The name in
+the `.glif` file tells if the hint was right.
+"""
+import os
+import plistlib
+from xml.parsers import expat
+from typing import Dict, Iterable, Optional, Tuple
+
+DEFAULT_LAYER_NAME = "public.default"
+DEFAULT_GLYPHS_DIR = "glyphs"
+CHUNK_SIZE = 1024
+
+
+class _Found(Exception):
+    pass
+
+
+def readGlifAdvance(path: str) -> Tuple[Optional[str], float]:
+    """
+    Returns the glyph name and the advance width of a `.glif` file. The
+    width is 0 if it has no `advance` element (the default of the glif
+    format).
+    """
+    result = [None, 0.0]
+
+    def startElement(name, attrs):
+        if name == "glyph":
+            result[0] = attrs.get("name")
+        elif name == "advance":
+            result[1] = float(attrs.get("width", 0))
+            raise _Found
+
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = startElement
+    with open(path, "rb") as f:
+        try:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                parser.Parse(chunk, not chunk)
+                if not chunk:
+                    break
+        except _Found:
+            pass
+    return result[0], result[1]
+
+
+def readAdvanceWidth(path: str) -> float:
+    return readGlifAdvance(path)[1]
+
+
+def defaultLayerPath(ufoPath: str) -> str:
+    """
+    Returns the folder of the default layer of a UFO.
+    """
+    layerContentsPath = os.path.join(ufoPath, "layercontents.plist")
+    if os.path.exists(layerContentsPath):
+        with open(layerContentsPath, "rb") as f:
+            for layerName, directory in plistlib.load(f):
+                if layerName == DEFAULT_LAYER_NAME or directory == DEFAULT_GLYPHS_DIR:
+                    return os.path.join(ufoPath, directory)
+    return os.path.join(ufoPath, DEFAULT_GLYPHS_DIR)
+
+
+def readGlyphFileNames(ufoPath: str) -> Dict[str, str]:
+    """
+    Returns the `.glif` file names of the default layer by glyph name, in
+    the order of `contents.plist`.
+    """
+    with open(os.path.join(defaultLayerPath(ufoPath), "contents.plist"), "rb") as f:
+        return plistlib.load(f)
+
+
+def readAdvanceWidths(
+    ufoPath: str,
+    glyphNames: Iterable[str],
+    fileNameHints: Optional[Dict[str, str]] = None,
+) -> Dict[str, float]:
+    """
+    Returns the advance widths of the given glyphs of the default layer of a
+    UFO. Glyphs that are not in the UFO are left out.
+
+    Args:
+        fileNameHints: The `.glif` file names of the glyphs in another UFO,
+            the `contents.plist` of this UFO is only read if one of them
+            is wrong.
+    """
+    layerPath = defaultLayerPath(ufoPath)
+    fileNames = None
+    widths = {}
+    for name in glyphNames:
+        if fileNames is None and fileNameHints is not None:
+            fileName = fileNameHints.get(name)
+            if fileName is not None:
+                try:
+                    glifName, width = readGlifAdvance(os.path.join(layerPath, fileName))
+                except OSError:
+                    glifName = None
+                if glifName == name:
+                    widths[name] = width
+                    continue
+        # a wrong hint, the rest is read with the file names of this UFO
+        if fileNames is None:
+            fileNames = readGlyphFileNames(ufoPath)
+        fileName = fileNames.get(name)
+        if fileName is not None:
+            widths[name] = readAdvanceWidth(os.path.join(layerPath, fileName))
+    return widths
@@ -0,0 +1,55 @@
+"""
+Keeps the predicates that limit the font overview to a set of glyphs, so
+switching between a few saved glyph sets doesn't build them again.
+
+The predicate is made by `makePredicate` from a frozenset of the glyph
+names, in RoboFont `Name IN %@` with an `NSSet` as argument: the names are
+not formatted into the predicate and the membership test of each cell is a
+hash lookup.
+
+The sets are looked up by their names. A saved glyph set that is kept as a
+frozenset is its own key, passing the same frozenset again is found in
+constant time, other iterables are copied into a frozenset first.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, FrozenSet, Iterable
+
+DEFAULT_MAX_SIZE = 8
+
+
+class GlyphSetFilters:
+    """
+    Least recently used cache of the predicates of glyph sets.
+
+    Args:
+        makePredicate: Returns the predicate of a frozenset of glyph names.
+        maxSize (int): Number of predicates that are kept.
+    """
+
+    def __init__(
+        self, makePredicate: Callable[[FrozenSet[str]], Any], maxSize: int = DEFAULT_MAX_SIZE
+    ) -> None:
+        self.makePredicate = makePredicate
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self._predicates: "OrderedDict[FrozenSet[str], Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._predicates)
+
+    def predicate(self, glyphNames: Iterable[str]) -> Any:
+        key = glyphNames if isinstance(glyphNames, frozenset) else frozenset(glyphNames)
+        predicate = self._predicates.get(key)
+        if predicate is not None:
+            self._predicates.move_to_end(key)
+            self.hits += 1
+            return predicate
+        self.misses += 1
+        predicate = self._predicates[key] = self.makePredicate(key)
+        while len(self._predicates) > self.maxSize:
+            self._predicates.popitem(last=False)
+        return predicate
+
+    def clear(self) -> None:
+        self._predicates.clear()
@@ -0,0 +1,206 @@
+"""
+Extracts the compile data (`serializedDataForCompile`) of all the masters of
+a family in a pool of processes:
+
+    from RFGadgets.masterExtraction import extractCompileData
+
+    data = extractCompileData(["Light.ufo", "Regular.ufo", "Bold.ufo"])
+
+The results are in the order of the given fonts. UFO paths are read and
+serialized in the worker processes, open fonts are serialized in the calling
+process, since sending a font object to a worker costs more than serializing
+it.
+
+The workers write the records of `writeSerializedDataForCompile` into a
+shared memory block (or a memory mapped temporary file) and only send its
+name back, so the glyph data isn't pickled a second time to go through the
+pipe of the pool.
+"""
+import io
+import os
+import sys
+import mmap
+import logging
+import tempfile
+import multiprocessing
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from RFGadgets import WORKER_ENVIRONMENT_KEY
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("sharedMemory", "mmap", "pipe")
+
+
+def _pythonExecutable() -> str:
+    # inside RoboFont `sys.executable` is the app, the workers need the
+    # python binary of the embedded framework
+    if os.path.basename(sys.executable).startswith("python"):
+        return sys.executable
+    for name in ("python3", "python"):
+        path = os.path.join(sys.prefix, "bin", name)
+        if os.path.exists(path):
+            return path
+    return sys.executable
+
+
+@contextmanager
+def _workerEnvironment() -> Iterator[None]:
+    # the spawned workers inherit the environment of the calling process
+    # when they are started, it's restored once they are
+    previous = os.environ.get(WORKER_ENVIRONMENT_KEY)
+    os.environ[WORKER_ENVIRONMENT_KEY] = "1"
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ[WORKER_ENVIRONMENT_KEY]
+        else:
+            os.environ[WORKER_ENVIRONMENT_KEY] = previous
+
+
+def _openUFO(path: str) -> Any:
+    import defcon
+    # registers the font methods
+    import RFGadgets.font  # noqa: F401
+
+    return defcon.Font(path)
+
+
+def _serializeUFO(path: str, sections: Sequence[str]) -> memoryview:
+    stream = io.BytesIO()
+    _openUFO(path).writeSerializedDataForCompile(stream, sections)
+    return stream.getbuffer()
+
+
+def _extractWorker(path: str, sections: Sequence[str], transport: str) -> Tuple[str, Any, int]:
+    data = _serializeUFO(path, sections)
+    size = len(data)
+    if transport == "sharedMemory":
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        block.buf[:size] = data
+        name = block.name
+        block.close()
+        # the calling process unlinks the block after reading it
+        _unregisterSharedMemory(name)
+        return transport, name, size
+    if transport == "mmap":
+        fd, tempPath = tempfile.mkstemp(prefix="fontgadgets-", suffix=".compileData")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return transport, tempPath, size
+    return transport, bytes(data), size
+
+
+def _unregisterSharedMemory(name: str) -> None:
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(f"/{name}" if os.name == "posix" else name, "shared_memory")
+    except Exception:
+        pass
+
+
+def _readPayload(transport: str, payload: Any, size: int) -> Dict[str, Any]:
+    from RFGadgets.font import assembleSerializedDataForCompile, readSerializedDataForCompile
+
+    def assemble(buffer):
+        return assembleSerializedDataForCompile(readSerializedDataForCompile(io.BytesIO(buffer)))
+
+    if transport == "sharedMemory":
+        block = shared_memory.SharedMemory(name=payload)
+        try:
+            return assemble(block.buf[:size])
+        finally:
+            block.close()
+            block.unlink()
+    if transport == "mmap":
+        try:
+            with open(payload, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return assemble(m)
+        finally:
+            os.remove(payload)
+    return assemble(payload)
+
+
+def _discardPayload(transport: str, payload: Any, size: int) -> None:
+    try:
+        if transport == "sharedMemory":
+            block = shared_memory.SharedMemory(name=payload)
+            block.close()
+            block.unlink()
+        elif transport == "mmap":
+            os.remove(payload)
+    except OSError:
+        pass
+
+
+def extractCompileData(
+    fonts: Sequence[Any],
+    processes: Optional[int] = None,
+    transport: str = "sharedMemory",
+    sections: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Returns the `serializedDataForCompile` of each font, in the order of the
+    given fonts.
+
+    Args:
+        fonts: Open fonts or paths of UFOs.
+        processes (int): Number of worker processes, defaults to the number
+            of CPUs but not more than the number of UFO paths. With 1 the
+            paths are read in the calling process.
+        transport (str): How the workers send back the data:
+            'sharedMemory', 'mmap' (a temporary file) or 'pipe' (the pipe
+            of the pool).
+        sections: The sections to extract, defaults to
+            `RFGadgets.font.COMPILE_SECTIONS`.
+    """
+    from RFGadgets.font import COMPILE_SECTIONS, assembleSerializedDataForCompile
+
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {transport!r}, use one of {TRANSPORTS}")
+    sections = tuple(COMPILE_SECTIONS if sections is None else sections)
+    paths = [i for i, font in enumerate(fonts) if isinstance(font, (str, os.PathLike))]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(paths)))
+    results: List[Optional[Dict[str, Any]]] = [None] * len(fonts)
+    if processes == 1:
+        for i in paths:
+            results[i] = assembleSerializedDataForCompile(
+                _openUFO(os.fspath(fonts[i])).iterSerializedDataForCompile(sections)
+            )
+        paths = []
+    executor = None
+    futures = {}
+    if paths:
+        context = multiprocessing.get_context("spawn")
+        context.set_executable(_pythonExecutable())
+        executor = ProcessPoolExecutor(max_workers=processes, mp_context=context)
+        # the workers are started by `submit`
+        with _workerEnvironment():
+            futures = {
+                i: executor.submit(_extractWorker, os.fspath(fonts[i]), sections, transport)
+                for i in paths
+            }
+    read = set()
+    try:
+        # the open fonts are serialized while the workers read the UFOs
+        for i, font in enumerate(fonts):
+            if i not in futures and results[i] is None:
+                results[i] = assembleSerializedDataForCompile(
+                    font.iterSerializedDataForCompile(sections)
+                )
+        for i, future in futures.items():
+            payload = future.result()
+            read.add(i)
+            results[i] = _readPayload(*payload)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for i, future in futures.items():
+                if i not in read and not future.cancelled() and future.exception() is None:
+                    _discardPayload(*future.result())
+    return results
@@ -0,0 +1,362 @@
+"""
+Reloads only the modules of a package whose files changed and the modules
+that import them, in the order of their imports:
+
+    from RFGadgets.moduleReloader import ModuleReloader
+
+    reloader = ModuleReloader(["fontgadgets"])
+    ...  # edit some files
+    report = reloader.reload()
+    print(report)
+
+A file changed if its size or mtime changed and its content hash is
+different, saving a file without changes doesn't reload it. The modules
+that were imported before the reloader was made are compared with the
+source mtime and size stored in their cached bytecode, which tells if the
+file changed after it was imported. The ones without cached bytecode (e.g.
+with `sys.dont_write_bytecode` or a read-only install) can't be compared,
+they are all reloaded by the first reload.
+
+The imports of each module are read from its source with `ast` (and only
+parsed again when the file changed), a module depends on the modules of the
+tracked packages that it imports. The changed modules and all the modules
+that depend on them are reloaded, the dependencies first, so a
+`from .core import name` picks up the new `name`.
+"""
+import os
+import ast
+import sys
+import time
+import hashlib
+import logging
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FileState(NamedTuple):
+    mtime: int
+    size: int
+    digest: Optional[str]
+
+
+class ReloadReport(NamedTuple):
+    """
+    The reloaded modules in order with their reload time in nanoseconds,
+    the modules that changed and the errors by module name.
+    """
+
+    timings: List[Tuple[str, int]]
+    changed: List[str]
+    errors: Dict[str, str]
+
+    @property
+    def total(self) -> int:
+        return sum(duration for _, duration in self.timings)
+
+    def __str__(self) -> str:
+        if not self.timings:
+            return "Nothing changed."
+        lines = [
+            f"Reloaded {len(self.timings)} modules ({len(self.changed)} changed) "
+            f"in {self.total / 1e6:.1f} ms:"
+        ]
+        for name, duration in self.timings:
+            mark = "*" if name in self.changed else " "
+            error = f"  {self.errors[name]}" if name in self.errors else ""
+            lines.append(f"{mark} {duration / 1e6:8.2f} ms  {name}{error}")
+        return "\n".join(lines)
+
+
+def _fileDigest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _bytecodeStamp(path: str) -> Optional[Tuple[int, int]]:
+    # the source mtime (in seconds, 32 bits) and size in the header of a
+    # timestamp based pyc, see PEP 552
+    try:
+        cachePath = importlib.util.cache_from_source(path)
+        with open(cachePath, "rb") as f:
+            header = f.read(16)
+    except (OSError, NotImplementedError, ValueError):
+        return None
+    if len(header) < 16 or int.from_bytes(header[4:8], "little") != 0:
+        return None
+    return int.from_bytes(header[8:12], "little"), int.from_bytes(header[12:16], "little")
+
+
+def _resolveImport(moduleName: str, isPackage: bool, node: ast.ImportFrom) -> str:
+    if not node.level:
+        return node.module or ""
+    package = moduleName if isPackage else moduleName.rpartition(".")[0]
+    parts = package.split(".")
+    if node.level > 1:
+        parts = parts[: len(parts) - node.level + 1]
+    base = ".".join(parts)
+    if node.module:
+        base = f"{base}.{node.module}" if base else node.module
+    return base
+
+
+def _importStatements(source: str) -> Iterable[str]:
+    # the import statements of the source without their indentation, only
+    # they are parsed, which is much faster than parsing the whole module
+    lines = source.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        i += 1
+        if not (line.startswith("import ") or line.startswith("from ")):
+            continue
+        statement = [line]
+        while (
+            statement[-1].endswith("\\")
+            or "".join(statement).count("(") > "".join(statement).count(")")
+        ) and i < len(lines):
+            statement.append(lines[i].strip())
+            i += 1
+        yield "\n".join(statement)
+
+
+def importedModuleNames(
+    source: str, moduleName: str, isPackage: bool = False
+) -> Set[Tuple[str, ...]]:
+    """
+    Returns the modules imported by the source of a module. Each import is
+    a tuple of the names it can refer to, the first one that is a module is
+    imported: `from package import name` is `package.name` if it's a
+    submodule, otherwise `package`.
+    """
+    imports = set()
+    for statement in _importStatements(source):
+        try:
+            nodes = ast.parse(statement).body
+        except SyntaxError:
+            continue
+        for node in nodes:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    parts = alias.name.split(".")
+                    imports.add(
+                        tuple(".".join(parts[:i]) for i in range(len(parts), 0, -1))
+                    )
+            elif isinstance(node, ast.ImportFrom):
+                base = _resolveImport(moduleName, isPackage, node)
+                if not base:
+                    continue
+                for alias in node.names:
+                    if alias.name == "*":
+                        imports.add((base,))
+                    else:
+                        imports.add((f"{base}.{alias.name}", base))
+    return imports
+
+
+class ModuleReloader:
+    """
+    Tracks the imported modules of the given packages and reloads the
+    changed ones with their dependents.
+
+    Args:
+        packages: Names of the top level packages to track, e.g.
+            `["fontgadgets"]`.
+        modules: The modules to look in, defaults to `sys.modules`.
+    """
+
+    def __init__(self, packages: Iterable[str], modules: Optional[Dict] = None) -> None:
+        self.packages = tuple(packages)
+        self.modules = sys.modules if modules is None else modules
+        self._states: Dict[str, FileState] = {}
+        # module name: names it imports, tracked or not
+        self._imports: Dict[str, Set[Tuple[str, ...]]] = {}
+        self._importsState: Dict[str, FileState] = {}
+        self._pending: Set[str] = set()
+        self._track(initial=True)
+
+    def _isTracked(self, name: str) -> bool:
+        return any(name == p or name.startswith(p + ".") for p in self.packages)
+
+    def trackedModules(self) -> Dict[str, str]:
+        """
+        Returns the file paths of the imported modules of the packages by
+        module name.
+        """
+        result = {}
+        for name, module in list(self.modules.items()):
+            if module is None or not self._isTracked(name):
+                continue
+            path = getattr(module, "__file__", None)
+            if path and path.endswith(".py"):
+                result[name] = path
+        return result
+
+    def _stat(self, path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _track(self, initial: bool = False) -> None:
+        for name, path in self.trackedModules().items():
+            if name in self._states:
+                continue
+            stat = self._stat(path)
+            if stat is None:
+                continue
+            self._states[name] = FileState(stat[0], stat[1], _fileDigest(path))
+            if initial:
+                stamp = _bytecodeStamp(path)
+                current = ((stat[0] // 1_000_000_000) & 0xFFFFFFFF, stat[1] & 0xFFFFFFFF)
+                if stamp != current:
+                    # changed after it was imported, or unknown without the
+                    # bytecode
+                    self._pending.add(name)
+
+    def changedModules(self) -> List[str]:
+        """
+        Returns the names of the tracked modules whose files changed.
+        """
+        self._track()
+        modules = self.trackedModules()
+        changed = set(self._pending)
+        for name, path in modules.items():
+            state = self._states[name]
+            stat = self._stat(path)
+            if stat is None or stat == (state.mtime, state.size):
+                continue
+            digest = _fileDigest(path)
+            if digest != state.digest:
+                changed.add(name)
+            else:
+                # saved without changes
+                self._states[name] = FileState(stat[0], stat[1], digest)
+        return sorted(changed)
+
+    def dependencies(self, name: str, tracked: Optional[Iterable[str]] = None) -> Set[str]:
+        """
+        Returns the tracked modules imported by the given module.
+        """
+        if tracked is None:
+            tracked = self.trackedModules()
+        module = self.modules.get(name)
+        path = getattr(module, "__file__", None)
+        if not path:
+            return set()
+        state = self._states.get(name)
+        names = self._imports.get(name)
+        if names is None or self._importsState.get(name) != state:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    source = f.read()
+                isPackage = os.path.basename(path) == "__init__.py"
+                names = importedModuleNames(source, name, isPackage)
+            except (OSError, SyntaxError, UnicodeDecodeError) as e:
+                logger.debug("Could not read the imports of %s: %s", name, e)
+                names = set()
+            self._imports[name] = names
+            self._importsState[name] = state
+        result = set()
+        for alternatives in names:
+            for alternative in alternatives:
+                if alternative in tracked:
+                    if alternative != name:
+                        result.add(alternative)
+                    break
+        return result
+
+    def dependents(self, names: Iterable[str]) -> Set[str]:
+        """
+        Returns the given modules and all the tracked modules that import
+        them, directly or through other modules.
+        """
+        tracked = self.trackedModules()
+        reverse: Dict[str, Set[str]] = {}
+        for name in tracked:
+            for dependency in self.dependencies(name, tracked):
+                reverse.setdefault(dependency, set()).add(name)
+        result = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in result:
+                continue
+            result.add(name)
+            stack.extend(reverse.get(name, ()))
+        return result
+
+    def reloadOrder(self, names: Iterable[str]) -> List[str]:
+        """
+        Returns the given modules sorted so each module comes after the
+        modules it imports. Modules in an import cycle are sorted by name.
+        """
+        names = set(names)
+        tracked = self.trackedModules()
+        remaining = {name: self.dependencies(name, tracked) & names for name in names}
+        order = []
+        ready = sorted(name for name, deps in remaining.items() if not deps)
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            del remaining[name]
+            newlyReady = []
+            for other, deps in remaining.items():
+                if name in deps:
+                    deps.discard(name)
+                    if not deps:
+                        newlyReady.append(other)
+            ready = sorted(ready + newlyReady)
+        if remaining:
+            logger.debug("Import cycle between %s", ", ".join(sorted(remaining)))
+            order.extend(sorted(remaining))
+        return order
+
+    def reload(
+        self,
+        names: Optional[Iterable[str]] = None,
+        afterReload: Optional[Callable[[str, ModuleType], None]] = None,
+    ) -> ReloadReport:
+        """
+        Reloads the changed modules (or the given ones) and their
+        dependents and returns the report. `afterReload` is called with the
+        name and the module after each reload, before its dependents are
+        reloaded.
+        """
+        changed = self.changedModules() if names is None else sorted(names)
+        self._pending.clear()
+        timings = []
+        errors = {}
+        if not changed:
+            return ReloadReport(timings, changed, errors)
+        for name in self.reloadOrder(self.dependents(changed)):
+            module = self.modules.get(name)
+            if module is None:
+                continue
+            start = time.perf_counter_ns()
+            try:
+                importlib.reload(module)
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+                logger.error("Reloading %s failed: %s", name, e)
+                # tried again on the next reload
+                self._pending.add(name)
+                timings.append((name, time.perf_counter_ns() - start))
+                continue
+            timings.append((name, time.perf_counter_ns() - start))
+            if afterReload is not None:
+                afterReload(name, module)
+            path = getattr(module, "__file__", None)
+            stat = self._stat(path) if path else None
+            if stat is not None:
+                self._states[name] = FileState(stat[0], stat[1], _fileDigest(path))
+        # modules imported for the first time by the reloaded ones
+        self._track()
+        return ReloadReport(timings, changed, errors)
@@ -0,0 +1,84 @@
+from typing import Any, List, Set
+
+GLYPH_CHANGED = "Glyph.Changed"
+
+
+class GlyphChangeBatch:
+    """
+    Groups changes to many glyphs of one font into a single undo step and a
+    single round of change notifications.
+
+    While the batch is open the notifications of the font objects are held,
+    so moving components in 100 composites doesn't redraw 100 times. When
+    the batch ends `changed()` is called on each glyph of the batch and the
+    held notifications are released once, which posts each distinct
+    notification a single time. If the font supports grouping undo
+    (`font.undo`), undoing reverts all the glyphs of the batch at once.
+
+    `Glyph.Changed` is held until the other notifications are released, as
+    the released contour and component notifications post it again, so each
+    glyph of the batch posts it once. The other notifications are distinct
+    per glyph, or per contour and component, and are posted once each.
+
+    Without `font.undo` the batch falls back to `prepareUndo`/`performUndo`
+    of each glyph: the notifications are still batched, but each glyph gets
+    its own undo step. Glyphs without them (e.g. a plain fontParts font)
+    are changed without undo.
+
+    Example:
+        with GlyphChangeBatch(font, "Compensate position of component.") as batch:
+            for glyph in composites:
+                batch.add(glyph)
+                glyph.components[0].moveBy((10, 0))
+
+    Args:
+        font: The fontParts font that contains the glyphs.
+        undoTitle (str): The title of the undo step.
+    """
+
+    def __init__(self, font: Any, undoTitle: str) -> None:
+        self.font = font
+        self.undoTitle = undoTitle
+        self.glyphs: List[Any] = []
+        self._names: Set[str] = set()
+        self._undo = None
+        self._dispatcher = None
+
+    def __enter__(self) -> "GlyphChangeBatch":
+        if hasattr(self.font, "undo"):
+            self._undo = self.font.undo(self.undoTitle)
+            self._undo.__enter__()
+        self._dispatcher = self.font.naked().dispatcher
+        self._dispatcher.holdNotifications(notification=GLYPH_CHANGED)
+        self._dispatcher.holdNotifications()
+        return self
+
+    def add(self, glyph: Any) -> None:
+        """
+        Adds the glyph to the batch, call it before changing the glyph.
+        """
+        if glyph.name in self._names:
+            return
+        if self._undo is None and hasattr(glyph, "prepareUndo"):
+            # fallback, one undo step per glyph
+            glyph.prepareUndo(self.undoTitle)
+        self._names.add(glyph.name)
+        self.glyphs.append(glyph)
+
+    def __exit__(self, *exc: Any) -> None:
+        # notify the observers and the UI, the notifications are held so
+        # they are coalesced with the ones posted by the changes
+        for glyph in self.glyphs:
+            glyph.changed()
+        self._dispatcher.releaseHeldNotifications()
+        # the released contour and component notifications mark their glyph
+        # as changed again, those are held until everything else is posted
+        self._dispatcher.releaseHeldNotifications(notification=GLYPH_CHANGED)
+        self._dispatcher = None
+        if self._undo is not None:
+            self._undo.__exit__(*exc)
+            self._undo = None
+        else:
+            for glyph in self.glyphs:
+                if hasattr(glyph, "performUndo"):
+                    glyph.performUndo()
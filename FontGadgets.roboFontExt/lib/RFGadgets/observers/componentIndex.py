@@ -0,0 +1,109 @@
+from typing import Any, Dict, Iterable, Set, Tuple
+
+
+class ComponentIndex:
+    """
+    Reverse index of the component references inside a font.
+
+    The index maps each base glyph name to the names of the composites that
+    use it and each composite to its base glyph names. It's built once for a
+    font and then kept in sync by passing the glyphs that their components
+    have changed to `updateGlyph`. Transitive queries (nested composites)
+    only visit the glyphs that are part of the result.
+
+    Example:
+        index = ComponentIndex.fromFont(font)
+        index.composites("a")  # {"aacute", "agrave", ...}
+        index.allComposites("acutecomb")  # includes composites of "aacute"
+    """
+
+    def __init__(self) -> None:
+        self._composites: Dict[str, Set[str]] = {}
+        self._bases: Dict[str, Tuple[str, ...]] = {}
+
+    @classmethod
+    def fromFont(cls, font: Any) -> "ComponentIndex":
+        index = cls()
+        for glyph in font:
+            index.updateGlyph(glyph)
+        return index
+
+    def updateGlyph(self, glyph: Any) -> None:
+        """
+        Updates the index using the current components of the glyph.
+        """
+        self.setBases(glyph.name, [c.baseGlyph for c in glyph.components])
+
+    def setBases(self, name: str, baseGlyphs: Iterable[str]) -> None:
+        bases = tuple(dict.fromkeys(b for b in baseGlyphs if b is not None))
+        previous = self._bases.get(name, ())
+        if bases == previous:
+            return
+        for base in previous:
+            if base not in bases:
+                composites = self._composites.get(base)
+                if composites is not None:
+                    composites.discard(name)
+                    if not composites:
+                        del self._composites[base]
+        for base in bases:
+            self._composites.setdefault(base, set()).add(name)
+        if bases:
+            self._bases[name] = bases
+        else:
+            self._bases.pop(name, None)
+
+    def removeGlyph(self, name: str) -> None:
+        """
+        Removes the glyph as a composite. Composites that still reference the
+        glyph name as their base are kept, since they can refer to missing
+        glyphs.
+        """
+        self.setBases(name, ())
+
+    def baseGlyphs(self) -> Set[str]:
+        """
+        Returns the names of all the glyphs that are used as components.
+        """
+        return set(self._composites)
+
+    def hasComposites(self, name: str) -> bool:
+        return name in self._composites
+
+    def composites(self, name: str) -> Set[str]:
+        """
+        Returns the names of the glyphs that directly use the glyph as a
+        component.
+        """
+        return set(self._composites.get(name, ()))
+
+    def bases(self, name: str) -> Tuple[str, ...]:
+        """
+        Returns the base glyph names of the components inside the glyph.
+        """
+        return self._bases.get(name, ())
+
+    def allComposites(self, name: str) -> Set[str]:
+        """
+        Returns the names of the glyphs that use the glyph as a component,
+        including nested composites.
+        """
+        return self._walk(name, self._composites)
+
+    def allBases(self, name: str) -> Set[str]:
+        """
+        Returns the base glyph names of the glyph, including the bases of
+        nested components.
+        """
+        return self._walk(name, self._bases)
+
+    def _walk(self, name, graph):
+        result = set()
+        stack = [name]
+        while stack:
+            for related in graph.get(stack.pop(), ()):
+                if related not in result:
+                    result.add(related)
+                    stack.append(related)
+        result.discard(name)
+        return result
@@ -0,0 +1,126 @@
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class OutlineFingerprint(NamedTuple):
+    """
+    A compact description of a glyph outline that can tell a pure translation
+    apart from any other edit without calculating the bounds.
+
+    Attributes:
+        pointCount (int): Number of contour points and components.
+        shapeHash (int): Hash of the outline relative to the anchor point,
+            which doesn't change if the whole outline is moved.
+        anchorX (float): x of the first point (or component offset).
+        anchorY (float): y of the first point (or component offset).
+    """
+
+    pointCount: int
+    shapeHash: int
+    anchorX: float
+    anchorY: float
+
+
+EMPTY_FINGERPRINT = OutlineFingerprint(0, hash(()), 0.0, 0.0)
+
+# fields of a fingerprint in a `GlyphStateStore`
+FINGERPRINT_FIELDS = (
+    ("pointCount", "q"),
+    ("shapeHash", "q"),
+    ("anchorX", "d"),
+    ("anchorY", "d"),
+)
+
+
+def outlineFingerprint(glyph: Any) -> OutlineFingerprint:
+    """
+    Returns the `OutlineFingerprint` of the glyph. The points are read from
+    the naked glyph, so no pen or bounds calculation is involved.
+    """
+    naked = glyph.naked()
+    anchor = None
+    shape: List[Any] = []
+    pointCount = 0
+    for contour in naked:
+        if not len(contour):
+            continue
+        if anchor is None:
+            first = contour[0]
+            anchor = (first.x, first.y)
+            ax, ay = anchor
+        shape.append(len(contour))
+        shape.extend(
+            [(round(p.x - ax, 3), round(p.y - ay, 3), p.segmentType) for p in contour]
+        )
+        pointCount += len(contour)
+    for component in naked.components:
+        xx, xy, yx, yy, dx, dy = component.transformation
+        if anchor is None:
+            anchor = (dx, dy)
+        shape.append(
+            (
+                component.baseGlyph,
+                xx,
+                xy,
+                yx,
+                yy,
+                round(dx - anchor[0], 3),
+                round(dy - anchor[1], 3),
+            )
+        )
+        pointCount += 1
+    if anchor is None:
+        return EMPTY_FINGERPRINT
+    return OutlineFingerprint(pointCount, hash(tuple(shape)), anchor[0], anchor[1])
+
+
+def translationOffset(
+    previous: OutlineFingerprint, current: OutlineFingerprint
+) -> Optional[Tuple[float, float]]:
+    """
+    Returns the (dx, dy) that moves the previous outline to the current one,
+    or None if the outline has been edited in any other way.
+    """
+    if previous.pointCount != current.pointCount:
+        return None
+    if previous.shapeHash != current.shapeHash:
+        return None
+    return (current.anchorX - previous.anchorX, current.anchorY - previous.anchorY)
+
+
+def translationOffsets(
+    previous: Sequence[Optional[OutlineFingerprint]],
+    current: Sequence[OutlineFingerprint],
+    epsilon: float = 0.1,
+) -> List[Optional[Tuple[float, float]]]:
+    """
+    Version of `translationOffset` for many glyphs at once (e.g. the same
+    glyph in all the masters of a family).
+
+    Args:
+        previous (list): Previous fingerprints, items can be None if there
+            is no previous fingerprint.
+        current (list): Current fingerprints in the same order.
+        epsilon (float): Offsets smaller than this are ignored.
+
+    Returns:
+        A list with a (dx, dy) tuple for each glyph that has been moved, or
+        None for glyphs that are not moved or their shape has been edited.
+    """
+    # a plain loop, converting the fingerprints to arrays costs more than
+    # comparing them
+    result: List[Optional[Tuple[float, float]]] = []
+    for prev, curr in zip(previous, current):
+        if (
+            prev is None
+            or prev.pointCount != curr.pointCount
+            or prev.shapeHash != curr.shapeHash
+        ):
+            result.append(None)
+            continue
+        offsetX = curr.anchorX - prev.anchorX
+        offsetY = curr.anchorY - prev.anchorY
+        if abs(offsetX) > epsilon or abs(offsetY) > epsilon:
+            result.append((offsetX, offsetY))
+        else:
+            result.append(None)
+    return result
@@ -0,0 +1,251 @@
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# compact the rows when more than this part of them are removed glyphs
+COMPACT_RATIO = 0.5
+
+
+def _setBit(bits: bytearray, i: int) -> None:
+    bits[i >> 3] |= 1 << (i & 7)
+
+
+def _clearBit(bits: bytearray, i: int) -> None:
+    bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+
+def _testBit(bits: bytearray, i: int) -> bool:
+    return bool(bits[i >> 3] & (1 << (i & 7)))
+
+
+def _setBits(bits: bytearray) -> List[int]:
+    result = []
+    for i, byte in enumerate(bits):
+        if byte:
+            row = i << 3
+            while byte:
+                low = byte & -byte
+                result.append(row + low.bit_length() - 1)
+                byte ^= low
+    return result
+
+
+class GlyphStateStore:
+    """
+    Keeps the state of the glyphs of a font in rows, instead of one dict
+    item and one tuple per glyph.
+
+    Each field is a typed array (`"d"` for floats, `"q"` for integers) with
+    one item per row, and two bitsets tell which glyphs have values and
+    which are dirty. Glyph names are only used to find the row, so a store
+    with tens of thousands of glyphs costs a few bytes per glyph.
+
+    Rows are made for the glyphs that get values or are marked dirty, in
+    that order. A renamed glyph keeps its row. Removed glyphs leave an empty
+    row, the rows are compacted when more than half of them are empty.
+
+    Example:
+        store = GlyphStateStore((("xMin", "d"), ("xMax", "d")))
+        store.set("a", (10.0, 480.0))
+        store.markDirty("a")
+        for name in store.dirtyGlyphNames():
+            ...
+
+    Args:
+        fields: Pairs of field name and `array` typecode.
+    """
+
+    def __init__(self, fields: Sequence[Tuple[str, str]]) -> None:
+        self.fields = tuple(name for name, _ in fields)
+        self._typecodes = tuple(typecode for _, typecode in fields)
+        self.clear()
+
+    def __contains__(self, glyphName: str) -> bool:
+        return glyphName in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the arrays and bitsets, without the names.
+        """
+        size = len(self._hasValues) + len(self._dirty)
+        for column in self._columns:
+            size += column.itemsize * len(column)
+        return size
+
+    def glyphNames(self) -> List[str]:
+        return [name for name in self._names if name is not None]
+
+    def index(self, glyphName: str) -> int:
+        return self._rows[glyphName]
+
+    def _row(self, glyphName: str) -> int:
+        row = self._rows.get(glyphName)
+        if row is None:
+            row = self.insert(glyphName)
+        return row
+
+    # values
+
+    def hasValues(self, glyphName: str) -> bool:
+        row = self._rows.get(glyphName)
+        return row is not None and _testBit(self._hasValues, row)
+
+    def get(self, glyphName: str) -> Optional[Tuple]:
+        """
+        Returns the values of the fields of the glyph, or None if they are
+        not set.
+        """
+        row = self._rows.get(glyphName)
+        if row is None or not _testBit(self._hasValues, row):
+            return None
+        return tuple(column[row] for column in self._columns)
+
+    def set(self, glyphName: str, values: Sequence) -> None:
+        row = self._row(glyphName)
+        for column, value in zip(self._columns, values):
+            column[row] = value
+        _setBit(self._hasValues, row)
+
+    def discard(self, glyphName: str) -> None:
+        """
+        Removes the values of the glyph, the glyph keeps its row.
+        """
+        row = self._rows.get(glyphName)
+        if row is not None:
+            _clearBit(self._hasValues, row)
+
+    # dirty flags
+
+    def markDirty(self, glyphName: str) -> None:
+        row = self._rows.get(glyphName)
+        if row is None:
+            row = self.insert(glyphName)
+        bit = 1 << (row & 7)
+        dirty = self._dirty
+        if not dirty[row >> 3] & bit:
+            dirty[row >> 3] |= bit
+            self._dirtyCount += 1
+
+    def clearDirty(self, glyphName: str) -> None:
+        row = self._rows.get(glyphName)
+        if row is not None:
+            self._clearDirtyRow(row)
+
+    def _clearDirtyRow(self, row: int) -> None:
+        if _testBit(self._dirty, row):
+            _clearBit(self._dirty, row)
+            self._dirtyCount -= 1
+
+    def isDirty(self, glyphName: str) -> bool:
+        row = self._rows.get(glyphName)
+        return row is not None and _testBit(self._dirty, row)
+
+    @property
+    def dirtyCount(self) -> int:
+        return self._dirtyCount
+
+    def dirtyGlyphNames(self) -> List[str]:
+        """
+        Returns the names of the dirty glyphs in the order of the rows.
+        """
+        if not self._dirtyCount:
+            return []
+        names = self._names
+        return [names[i] for i in _setBits(self._dirty)]
+
+    def popDirty(self, shouldPop: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """
+        Clears the dirty flags of the glyphs that `shouldPop` accepts (or of
+        all the glyphs) and returns their names in the order of the rows.
+        """
+        if not self._dirtyCount:
+            return []
+        names = self._names
+        rows = _setBits(self._dirty)
+        if shouldPop is None:
+            self.resetDirty()
+            return [names[i] for i in rows]
+        popped = [i for i in rows if shouldPop(names[i])]
+        dirty = self._dirty
+        for i in popped:
+            _clearBit(dirty, i)
+        self._dirtyCount -= len(popped)
+        return [names[i] for i in popped]
+
+    def resetDirty(self) -> None:
+        self._dirty = bytearray(len(self._dirty))
+        self._dirtyCount = 0
+
+    # rows
+
+    def insert(self, glyphName: str) -> int:
+        """
+        Adds a row for a new glyph at the end and returns its index.
+        """
+        row = self._rows.get(glyphName)
+        if row is not None:
+            return row
+        row = len(self._names)
+        self._names.append(glyphName)
+        self._rows[glyphName] = row
+        for column in self._columns:
+            column.append(0)
+        if row >> 3 >= len(self._dirty):
+            self._hasValues.append(0)
+            self._dirty.append(0)
+        return row
+
+    def remove(self, glyphName: str) -> None:
+        row = self._rows.pop(glyphName, None)
+        if row is None:
+            return
+        self._clearDirtyRow(row)
+        _clearBit(self._hasValues, row)
+        self._names[row] = None
+        if len(self._rows) < len(self._names) * COMPACT_RATIO:
+            self._compact()
+
+    def rename(self, oldName: str, newName: str) -> None:
+        """
+        Moves the state of a glyph to its new name. The row and values of a
+        glyph that had the new name before are dropped.
+        """
+        if oldName == newName:
+            return
+        self.remove(newName)
+        row = self._rows.pop(oldName, None)
+        if row is None:
+            return
+        self._names[row] = newName
+        self._rows[newName] = row
+
+    def _compact(self) -> None:
+        # drops the empty rows of the removed glyphs, keeping the order
+        rows = [row for row, name in enumerate(self._names) if name is not None]
+        names = [self._names[row] for row in rows]
+        count = len(rows)
+        hasValues = bytearray((count + 7) // 8)
+        dirty = bytearray((count + 7) // 8)
+        for newRow, row in enumerate(rows):
+            if _testBit(self._hasValues, row):
+                _setBit(hasValues, newRow)
+            if _testBit(self._dirty, row):
+                _setBit(dirty, newRow)
+        self._columns = [
+            array(column.typecode, [column[row] for row in rows]) for column in self._columns
+        ]
+        self._names = names
+        self._rows = dict(zip(names, range(count)))
+        self._hasValues = hasValues
+        self._dirty = dirty
+
+    def clear(self) -> None:
+        self._rows: Dict[str, int] = {}
+        self._names: List[Optional[str]] = []
+        self._columns = [array(typecode) for typecode in self._typecodes]
+        self._hasValues = bytearray()
+        self._dirty = bytearray()
+        self._dirtyCount = 0
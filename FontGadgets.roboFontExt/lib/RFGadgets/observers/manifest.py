@@ -0,0 +1,187 @@
+import ast
+import importlib
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# base classes that make a class in the subscribers folder a subscriber
+SUBSCRIBER_BASE_NAMES = {"Subscriber", "BaseSubscriber", "LazyGlyphSubscriber"}
+# class attributes that are read into the manifest
+MANIFEST_ATTRIBUTES = ("checkbox", "description", "requiredPackages")
+
+
+class SubscriberManifest(NamedTuple):
+    """
+    What the settings and the startup need to know about a subscriber,
+    read from the source of its module without importing it.
+    """
+
+    moduleName: str
+    className: str
+    checkbox: str
+    description: str
+    requiredPackages: Tuple[str, ...]
+
+
+def _literal(node: ast.AST, constants: Dict[str, Any]) -> Any:
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+def _assignments(body: List[ast.stmt]):
+    for node in body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    yield target.id, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            if isinstance(node.target, ast.Name):
+                yield node.target.id, node.value
+
+
+def readSubscriberManifests(source: str, moduleName: str) -> List[SubscriberManifest]:
+    """
+    Returns the manifests of the subscriber classes defined in the source of
+    a module. The manifest attributes have to be literals or names of module
+    level literals, anything else is ignored.
+    """
+    tree = ast.parse(source)
+    constants = {}
+    for name, value in _assignments(tree.body):
+        constants[name] = _literal(value, constants)
+    manifests = []
+    classAttributes: Dict[str, Dict[str, Any]] = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        baseNames = [
+            b.id if isinstance(b, ast.Name) else getattr(b, "attr", None)
+            for b in node.bases
+        ]
+        parents = [classAttributes[b] for b in baseNames if b in classAttributes]
+        if not parents and not SUBSCRIBER_BASE_NAMES.intersection(baseNames):
+            continue
+        attributes = {}
+        for parent in reversed(parents):
+            attributes.update(parent)
+        for name, value in _assignments(node.body):
+            if name in MANIFEST_ATTRIBUTES:
+                attributes[name] = _literal(value, constants)
+        classAttributes[node.name] = attributes
+        manifests.append(
+            SubscriberManifest(
+                moduleName=moduleName,
+                className=node.name,
+                checkbox=attributes.get("checkbox") or node.name,
+                description=attributes.get("description") or "",
+                requiredPackages=tuple(attributes.get("requiredPackages") or ()),
+            )
+        )
+    return manifests
+
+
+class SubscriberEntry:
+    """
+    Stands in for a subscriber class until it's needed. The class methods
+    used by the startup and the settings window are available, but the
+    module of the subscriber is only imported once it is activated or its
+    class is accessed. A subscriber that is never activated costs no import
+    time.
+    """
+
+    def __init__(self, manifest: SubscriberManifest) -> None:
+        self.setManifest(manifest)
+        self._class = None
+        self._profiling = False
+        self._recording = False
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.isLoaded() else "not loaded"
+        return f"<SubscriberEntry {self.manifest.moduleName}.{self.__name__} ({state})>"
+
+    def __getattr__(self, name: str) -> Any:
+        # anything else is looked up on the class
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def setManifest(self, manifest: SubscriberManifest) -> None:
+        """
+        Updates the entry after the module of the subscriber changed. A
+        loaded class and its active state are kept, so it can still be
+        deactivated.
+        """
+        self.manifest = manifest
+        self.__name__ = manifest.className
+        self.checkbox = manifest.checkbox
+        self.description = manifest.description
+        self.requiredPackages = manifest.requiredPackages
+
+    def isLoaded(self) -> bool:
+        return self._class is not None
+
+    def load(self) -> type:
+        """
+        Imports the module of the subscriber and returns its class.
+        """
+        if self._class is None:
+            module = importlib.import_module(self.manifest.moduleName)
+            cls = getattr(module, self.manifest.className)
+            if self._profiling:
+                cls.enableProfiling()
+            if self._recording:
+                cls.startRecording()
+            self._class = cls
+        return self._class
+
+    def activate(self) -> Any:
+        return self.load().activate()
+
+    def deactivate(self) -> None:
+        if self._class is not None:
+            self._class.deactivate()
+
+    def isActive(self) -> bool:
+        return self._class is not None and self._class.isActive()
+
+    def enableProfiling(self) -> None:
+        self._profiling = True
+        if self._class is not None:
+            self._class.enableProfiling()
+
+    def disableProfiling(self) -> None:
+        self._profiling = False
+        if self._class is not None:
+            self._class.disableProfiling()
+
+    def isProfiling(self) -> bool:
+        if self._class is None:
+            return self._profiling
+        return self._class.isProfiling()
+
+    def resetProfiling(self) -> None:
+        if self._class is not None:
+            self._class.resetProfiling()
+
+    def profilingSnapshot(self) -> dict:
+        if self._class is None:
+            return {}
+        return self._class.profilingSnapshot()
+
+    def startRecording(self) -> None:
+        self._recording = True
+        if self._class is not None:
+            self._class.startRecording()
+
+    def stopRecording(self, path: Optional[str] = None) -> Any:
+        self._recording = False
+        if self._class is None:
+            return None
+        return self._class.stopRecording(path)
+
+    def isRecording(self) -> bool:
+        if self._class is None:
+            return self._recording
+        return self._class.isRecording()
@@ -0,0 +1,55 @@
+from typing import Any, Callable, List
+from fontParts.base.base import TransformationMixin
+
+# the callbacks are called with the glyph before it's transformed
+_callbacks: List[Callable[[Any], None]] = []
+
+
+def _notifyingTransform(transformBy):
+
+    def wrapper(self, *args, **kwargs):
+        # contours, points, components, etc. report the glyph they belong to
+        glyph = getattr(self, "glyph", self)
+        if glyph is not None:
+            for callback in list(_callbacks):
+                callback(glyph)
+        return transformBy(self, *args, **kwargs)
+
+    wrapper.__name__ = transformBy.__name__
+    wrapper.__wrapped__ = transformBy
+    wrapper._preChangeOriginal = transformBy
+    return wrapper
+
+
+def addGlyphWillChangeCallback(callback: Callable[[Any], None]) -> None:
+    """
+    Calls the callback with the fontParts glyph before the glyph, or one of
+    its contours, points or components, is moved, scaled or transformed in
+    any other way (e.g. by a script). It's the only point where the outline
+    can be read before the change, the subscriber notifications come after
+    it.
+
+    `TransformationMixin.transformBy` is wrapped while there are callbacks,
+    changes made directly to the naked objects (e.g. dragging points in the
+    glyph editor) don't call them.
+    """
+    if callback in _callbacks:
+        return
+    _callbacks.append(callback)
+    transformBy = TransformationMixin.transformBy
+    # wrapped again from the original, the wrapper of a reloaded module
+    # would call the callbacks of the previous module
+    original = getattr(transformBy, "_preChangeOriginal", transformBy)
+    TransformationMixin.transformBy = _notifyingTransform(original)
+
+
+def removeGlyphWillChangeCallback(callback: Callable[[Any], None]) -> None:
+    """
+    Removes the callback, the original `transformBy` is put back after the
+    last callback is removed.
+    """
+    if callback in _callbacks:
+        _callbacks.remove(callback)
+    transformBy = TransformationMixin.transformBy
+    if not _callbacks and hasattr(transformBy, "_preChangeOriginal"):
+        TransformationMixin.transformBy = transformBy._preChangeOriginal
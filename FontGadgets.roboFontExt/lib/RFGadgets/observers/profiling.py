@@ -0,0 +1,96 @@
+import json
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+from RFGadgets.profiler import TimingStats
+
+# subscriber callbacks are named like `glyphEditorDidSetGlyph`
+EVENT_CALLBACK_RE = re.compile(r"^[a-z][A-Za-z0-9]*(Did|Will)[A-Z][A-Za-z0-9]*$")
+SAMPLE_SIZE = 1000
+SLOWEST_SIZE = 5
+
+
+class SubscriberProfile:
+    """
+    Collects the `TimingStats` of the callbacks of a subscriber class. The
+    percentiles are calculated from the last `SAMPLE_SIZE` calls.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.callbacks: Dict[str, TimingStats] = {}
+
+    def record(
+        self, callbackName: str, durationNs: int, glyphName: Optional[str] = None
+    ) -> None:
+        stats = self.callbacks.get(callbackName)
+        if stats is None:
+            stats = self.callbacks[callbackName] = TimingStats(SAMPLE_SIZE, SLOWEST_SIZE)
+        stats.add(durationNs, key=glyphName)
+
+    def reset(self) -> None:
+        self.callbacks = {}
+
+    def asDict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the statistics by callback, durations are in milliseconds.
+        """
+        result = {}
+        for name, stats in sorted(self.callbacks.items()):
+            result[name] = info = stats.asDict()
+            info["slowestGlyphs"] = info.pop("slowest")
+        return result
+
+    def toJSON(self, **kwargs: Any) -> str:
+        return json.dumps({self.name: self.asDict()}, **kwargs)
+
+
+def glyphNameFromInfo(info: Any) -> Optional[str]:
+    if not isinstance(info, dict):
+        return None
+    glyph = info.get("glyph")
+    if glyph is None:
+        return None
+    return getattr(glyph, "name", None)
+
+
+def profiledCallback(
+    func: Callable, callbackName: str, profile: SubscriberProfile
+) -> Callable:
+    """
+    Wraps a subscriber callback to record its wall time into the profile.
+    """
+
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            duration = time.perf_counter_ns() - start
+            glyphName = glyphNameFromInfo(args[0]) if args else None
+            profile.record(callbackName, duration, glyphName)
+
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def eventCallbackNames(
+    cls: type, extraNames=(), stopAt: Optional[type] = None
+) -> List[str]:
+    """
+    Returns the names of the methods of the class that are subscriber event
+    callbacks, plus the given extra method names. Only the methods defined
+    in the classes before `stopAt` in the MRO are considered.
+    """
+    names = set()
+    for klass in cls.__mro__:
+        if klass is stopAt or klass is object:
+            break
+        for name, value in vars(klass).items():
+            if name.startswith("_") or not callable(value):
+                continue
+            if EVENT_CALLBACK_RE.match(name) or name in extraNames:
+                names.add(name)
+    return sorted(names)
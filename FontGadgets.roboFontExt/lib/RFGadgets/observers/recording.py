@@ -0,0 +1,169 @@
+import gzip
+import json
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+FORMAT = "fontgadgets-events"
+VERSION = 1
+# recording stops after this many events, so a forgotten recorder doesn't
+# grow forever
+MAX_EVENTS = 500_000
+
+
+class RecordedEvent(NamedTuple):
+    """
+    An event received by a subscriber. `time` is in seconds since the
+    recording started and `font` is the index of the font in the fonts of
+    the recording, or None.
+    """
+
+    time: float
+    name: str
+    font: Optional[int]
+    glyph: Optional[str]
+
+
+class Recording(NamedTuple):
+    subscriber: str
+    fonts: List[str]
+    events: List[RecordedEvent]
+
+
+class EventRecorder:
+    """
+    Records the names, times and glyphs of the events received by a
+    subscriber. Fonts are stored once with their path (or family and style
+    name) and the events refer to them by index.
+
+    The recording is saved as gzipped JSON. The times are stored as
+    microsecond deltas from the previous event and the event names as
+    indexes into a table of names, which keeps a long editing session small.
+
+    Args:
+        subscriberName (str): Name of the recorded subscriber.
+        timer: Function that returns the current time in seconds.
+        maxEvents (int): Events after this many are dropped.
+    """
+
+    def __init__(
+        self,
+        subscriberName: str = "",
+        timer: Callable[[], float] = time.perf_counter,
+        maxEvents: int = MAX_EVENTS,
+    ) -> None:
+        self.subscriberName = subscriberName
+        self.timer = timer
+        self.maxEvents = maxEvents
+        self.droppedCount = 0
+        self._start = timer()
+        self._fonts: Dict[int, int] = {}
+        self._fontNames: List[str] = []
+        # keep the recorded fonts alive, so their ids are not reused
+        self._fontObjects: List[Any] = []
+        self._events: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _fontIndex(self, font: Any) -> Optional[int]:
+        if font is None:
+            return None
+        index = self._fonts.get(id(font))
+        if index is None:
+            index = self._fonts[id(font)] = len(self._fontNames)
+            self._fontNames.append(_fontIdentifier(font))
+            self._fontObjects.append(font)
+        return index
+
+    def record(self, eventName: str, info: Any) -> None:
+        if len(self._events) >= self.maxEvents:
+            self.droppedCount += 1
+            return
+        font = glyphName = None
+        if isinstance(info, dict):
+            glyph = info.get("glyph")
+            font = info.get("font")
+            if glyph is not None:
+                glyphName = getattr(glyph, "name", None)
+                if font is None:
+                    font = getattr(glyph, "font", None)
+        self._events.append(
+            (self.timer() - self._start, eventName, self._fontIndex(font), glyphName)
+        )
+
+    def recording(self) -> Recording:
+        return Recording(
+            self.subscriberName,
+            list(self._fontNames),
+            [RecordedEvent(*event) for event in self._events],
+        )
+
+    def toDict(self) -> Dict[str, Any]:
+        names: Dict[str, int] = {}
+        events = []
+        previous = 0
+        for t, name, font, glyph in self._events:
+            micro = int(round(t * 1e6))
+            nameIndex = names.setdefault(name, len(names))
+            events.append([micro - previous, nameIndex, -1 if font is None else font, glyph])
+            previous = micro
+        return {
+            "format": FORMAT,
+            "version": VERSION,
+            "subscriber": self.subscriberName,
+            "fonts": self._fontNames,
+            "names": list(names),
+            "events": events,
+        }
+
+    def save(self, path: str) -> None:
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(self.toDict(), f, separators=(",", ":"))
+
+
+def loadRecording(path: str) -> Recording:
+    """
+    Reads a recording saved by `EventRecorder.save`.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("format") != FORMAT:
+        raise ValueError(f"Not a FontGadgets event recording: {path}")
+    if data.get("version", 0) > VERSION:
+        raise ValueError(f"Unsupported event recording version: {data['version']}")
+    names = data["names"]
+    events = []
+    micro = 0
+    for delta, nameIndex, font, glyph in data["events"]:
+        micro += delta
+        events.append(
+            RecordedEvent(micro / 1e6, names[nameIndex], None if font < 0 else font, glyph)
+        )
+    return Recording(data.get("subscriber", ""), data["fonts"], events)
+
+
+def _fontIdentifier(font: Any) -> str:
+    path = getattr(font, "path", None)
+    if path:
+        return path
+    info = getattr(font, "info", None)
+    if info is not None:
+        return f"{info.familyName} {info.styleName}"
+    return getattr(font, "name", repr(font))
+
+
+def recordedCallback(
+    func: Callable, callbackName: str, recorder: EventRecorder
+) -> Callable:
+    """
+    Wraps a subscriber callback to record each call before it runs.
+    """
+
+    def wrapper(self, *args, **kwargs):
+        recorder.record(callbackName, args[0] if args else None)
+        return func(self, *args, **kwargs)
+
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    wrapper.__wrapped__ = func
+    return wrapper
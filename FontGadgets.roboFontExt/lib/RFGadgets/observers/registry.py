@@ -0,0 +1,137 @@
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class AdjunctObjectsRegistry:
+    """
+    Keeps track of the fonts and glyphs a subscriber observes as adjunct
+    objects.
+
+    Instead of handing the full list of glyphs of every open font to
+    `setAdjunctObjectsToObserve` each time a font opens or closes, the
+    registry remembers which glyphs belong to which font. Opening a font
+    registers only its own glyphs, closing it unregisters only its own glyphs
+    and glyph order changes are synced by comparing the glyph names of that
+    single font. The cost of each operation scales with the size of the font
+    that changed and not with the number of fonts in the session.
+
+    Args:
+        subscriber: The `mojo.subscriber.Subscriber` instance that observes
+        the adjunct objects.
+    """
+
+    def __init__(self, subscriber: Any) -> None:
+        self._subscriber = subscriber
+        self._fonts: Dict[Any, Dict[str, Any]] = {}
+
+    def __contains__(self, font: Any) -> bool:
+        return font in self._fonts
+
+    def __len__(self) -> int:
+        return sum(len(glyphs) for glyphs in self._fonts.values())
+
+    def fonts(self) -> List[Any]:
+        return list(self._fonts)
+
+    def glyphNames(self, font: Any) -> List[str]:
+        return list(self._fonts.get(font, ()))
+
+    def reset(self, fonts: Iterable[Any]) -> None:
+        """
+        Replaces all the observed objects with the given fonts and their
+        glyphs. This is the only operation that touches every glyph of the
+        session, use it when the subscriber starts.
+        """
+        self._fonts = {}
+        objects = []
+        for font in fonts:
+            glyphs = {glyph.name: glyph for glyph in font}
+            self._fonts[font] = glyphs
+            objects.append(font)
+            objects.extend(glyphs.values())
+        self._subscriber.setAdjunctObjectsToObserve(objects)
+
+    def addFont(self, font: Any) -> Tuple[List[str], List[str]]:
+        """
+        Starts observing the font and its glyphs. If the font is already
+        observed, its glyphs are synced instead.
+
+        Returns:
+            A tuple of added and removed glyph names.
+        """
+        if font in self._fonts:
+            return self.updateFont(font)
+        glyphs = {glyph.name: glyph for glyph in font}
+        self._fonts[font] = glyphs
+        add = self._subscriber.addAdjunctObjectToObserve
+        add(font)
+        for glyph in glyphs.values():
+            add(glyph)
+        return list(glyphs), []
+
+    def removeFont(self, font: Any) -> List[str]:
+        """
+        Stops observing the font and its glyphs.
+
+        Returns:
+            The list of glyph names that were removed.
+        """
+        glyphs = self._fonts.pop(font, None)
+        if glyphs is None:
+            return []
+        remove = self._subscriber.removeObservedAdjunctObject
+        for glyph in glyphs.values():
+            remove(glyph)
+        remove(font)
+        return list(glyphs)
+
+    def updateFont(self, font: Any) -> Tuple[List[str], List[str]]:
+        """
+        Syncs the observed glyphs of the font with its current glyphs. A
+        renamed glyph is reported as removed under the old name and added
+        under the new name.
+
+        Returns:
+            A tuple of added and removed glyph names.
+        """
+        added, removed, renamed = self.syncFont(font)
+        return added + list(renamed.values()), removed + list(renamed)
+
+    def syncFont(self, font: Any) -> Tuple[List[str], List[str], Dict[str, str]]:
+        """
+        Syncs the observed glyphs of the font with its current glyphs like
+        `updateFont`, but a glyph object that is now in the font under
+        another name is reported as renamed and stays observed.
+
+        Returns:
+            A tuple of added and removed glyph names and a dict of the new
+            names of the renamed glyphs by their old name.
+        """
+        glyphs = self._fonts.get(font)
+        if glyphs is None:
+            added, removed = self.addFont(font)
+            return added, removed, {}
+        current = set(font.keys())
+        removed = [name for name in glyphs if name not in current]
+        added = {name for name in current if name not in glyphs}
+        renamed = {}
+        for name in removed:
+            newName = glyphs[name].name
+            if newName in added:
+                renamed[name] = newName
+                added.discard(newName)
+        remove = self._subscriber.removeObservedAdjunctObject
+        for name in removed:
+            glyph = glyphs.pop(name)
+            if name in renamed:
+                glyphs[renamed[name]] = glyph
+            else:
+                remove(glyph)
+        add = self._subscriber.addAdjunctObjectToObserve
+        for name in added:
+            glyph = font[name]
+            glyphs[name] = glyph
+            add(glyph)
+        return list(added), [name for name in removed if name not in renamed], renamed
+
+    def clear(self) -> None:
+        self._fonts = {}
@@ -0,0 +1,175 @@
+import heapq
+import itertools
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class ManualClock:
+    """
+    A pure-Python clock backend for the `Debouncer`. Time only moves forward
+    when `advance` is called, which makes it possible to test the scheduling
+    without a run loop (e.g. on Linux).
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = start
+        # (deadline, order, handle), entries of moved or cancelled timers
+        # are skipped
+        self._timers: List[Tuple[float, int, int]] = []
+        self._callbacks: Dict[int, Tuple[float, Callable[[], None]]] = {}
+        self._counter = itertools.count()
+
+    def now(self) -> float:
+        return self._now
+
+    def callLater(self, delay: float, callback: Callable[[], None]) -> int:
+        handle = next(self._counter)
+        self._push(handle, delay, callback)
+        return handle
+
+    def reschedule(self, handle: int, delay: float) -> bool:
+        """
+        Moves the deadline of an armed timer.
+
+        Returns:
+            False if the timer has already fired or was cancelled.
+        """
+        entry = self._callbacks.get(handle)
+        if entry is None:
+            return False
+        self._push(handle, delay, entry[1])
+        return True
+
+    def _push(self, handle: int, delay: float, callback: Callable[[], None]) -> None:
+        deadline = self._now + max(delay, 0)
+        self._callbacks[handle] = (deadline, callback)
+        heapq.heappush(self._timers, (deadline, next(self._counter), handle))
+
+    def cancel(self, handle: int) -> None:
+        self._callbacks.pop(handle, None)
+
+    def advance(self, seconds: float = 0.0) -> None:
+        """
+        Moves the time forward and calls the callbacks that are due, in
+        order of their deadline.
+        """
+        target = self._now + seconds
+        while self._timers and self._timers[0][0] <= target:
+            deadline, _, handle = heapq.heappop(self._timers)
+            entry = self._callbacks.get(handle)
+            if entry is None or entry[0] != deadline:
+                continue
+            del self._callbacks[handle]
+            self._now = max(self._now, deadline)
+            entry[1]()
+        self._now = target
+
+    @property
+    def pendingCount(self) -> int:
+        return len(self._callbacks)
+
+
+class Debouncer:
+    """
+    Coalesces bursts of events into a single call of the callback.
+
+    Each event is scheduled with a kind and a payload; only the latest
+    payload of each kind is kept. The callback is called with a dict of the
+    kept payloads (in order of arrival) once no event has arrived for
+    `delay` seconds, or at the latest `maxWait` seconds after the first event
+    of the burst, so a continuous stream of events can't postpone it forever.
+
+    The timing is delegated to a clock backend which provides `now()`,
+    `callLater(delay, callback)` and `cancel(handle)`. Only one callback is
+    armed at a time and new events move its deadline forward with
+    `reschedule(handle, delay)`, so a burst of events arms a single timer.
+    With a backend that can't move a timer, the armed callback re-arms
+    itself for the remaining time if it fires too early.
+
+    Example:
+        debouncer = Debouncer(print, ManualClock(), delay=0.05, maxWait=0.5)
+        debouncer.schedule("glyph", {"glyph": "a"})
+        debouncer.schedule("glyph", {"glyph": "b"})
+        debouncer.clock.advance(0.05)  # {'glyph': {'glyph': 'b'}}
+
+    Args:
+        callback: Called with the dict of coalesced payloads.
+        clock: The clock backend.
+        delay (float): Trailing delay in seconds.
+        maxWait (float): Longest time in seconds between the first event of a
+            burst and the callback, or None for no limit.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Dict[str, Any]], None],
+        clock: Any,
+        delay: float = 0.0,
+        maxWait: Optional[float] = None,
+    ) -> None:
+        self.callback = callback
+        self.clock = clock
+        self.delay = delay
+        self.maxWait = maxWait
+        self._payloads: Dict[str, Any] = {}
+        self._burstStart: Optional[float] = None
+        self._deadline: Optional[float] = None
+        self._handle = None
+        self._reschedule = getattr(clock, "reschedule", None)
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._payloads)
+
+    def schedule(self, kind: str, payload: Any) -> None:
+        now = self.clock.now()
+        self._payloads.pop(kind, None)
+        self._payloads[kind] = payload
+        if self._burstStart is None:
+            self._burstStart = now
+        deadline = now + self.delay
+        if self.maxWait is not None:
+            deadline = min(deadline, self._burstStart + self.maxWait)
+        moved = deadline != self._deadline
+        self._deadline = deadline
+        if self._handle is None:
+            self._handle = self.clock.callLater(deadline - now, self._fire)
+        elif moved and self._reschedule is not None:
+            self._reschedule(self._handle, deadline - now)
+
+    def cancel(self) -> None:
+        """
+        Drops the pending payloads without calling the callback.
+        """
+        if self._handle is not None:
+            self.clock.cancel(self._handle)
+        self._reset()
+
+    def flush(self) -> None:
+        """
+        Calls the callback right away if there are pending payloads.
+        """
+        if self._handle is not None:
+            self.clock.cancel(self._handle)
+        self._call()
+
+    def _fire(self) -> None:
+        self._handle = None
+        if self._deadline is None:
+            return
+        remaining = self._deadline - self.clock.now()
+        if remaining > 1e-6:
+            self._handle = self.clock.callLater(remaining, self._fire)
+            return
+        self._call()
+
+    def _call(self) -> None:
+        payloads = self._payloads
+        self._reset()
+        if payloads:
+            self.callback(payloads)
+
+    def _reset(self) -> None:
+        self._payloads = {}
+        self._burstStart = None
+        self._deadline = None
+        self._handle = None
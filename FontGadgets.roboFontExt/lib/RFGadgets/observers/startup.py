@@ -1,14 +1,38 @@
 import os
 import sys
 import importlib
-import inspect
-from mojo.subscriber import Subscriber
+import importlib.util
 from mojo.extensions import getExtensionDefault
+from RFGadgets.observers.manifest import SubscriberEntry, readSubscriberManifests
 
 EXTENSION_ID = "design.bahman.fontgadgets"
 SUBSCRIBERS_KEY = f"{EXTENSION_ID}.subscribers"
 
+# path -> (mtime, manifests) of the parsed subscriber modules
+_discoveryCache = {}
+# (module name, class name) -> SubscriberEntry, so each subscriber keeps the
+# same entry between the calls
+_entries = {}
+
+
+def _readManifests(path, moduleName):
+    mtime = os.stat(path).st_mtime_ns
+    cached = _discoveryCache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, encoding="utf-8") as f:
+        manifests = readSubscriberManifests(f.read(), moduleName)
+    _discoveryCache[path] = (mtime, manifests)
+    return manifests
+
+
 def getRoboFontGadgetsSubscribers():
+    """
+    Returns a `SubscriberEntry` for each subscriber class in the subscribers
+    folder. The modules are parsed, not imported, and the result is cached
+    until a module changes on disk. A module is only imported once its
+    subscriber is activated.
+    """
     subscribers = []
     basePath = os.path.dirname(__file__)
     subscribersPath = os.path.join(basePath, "subscribers")
@@ -16,44 +40,98 @@ def getRoboFontGadgetsSubscribers():
         sys.path.append(subscribersPath)
     if not os.path.exists(subscribersPath):
         raise ModuleNotFoundError(subscribersPath)
-    for f in os.listdir(subscribersPath):
+    for f in sorted(os.listdir(subscribersPath)):
         if f.endswith(".py") and (not f.startswith("_")):
             moduleName = f[:-3]
             if moduleName == 'base':
                 continue
             try:
-                module = importlib.import_module(moduleName)
-                for name, obj in inspect.getmembers(module):
-                    if (
-                        inspect.isclass(obj)
-                        and issubclass(obj, Subscriber)
-                        and (obj is not Subscriber)
-                    ):
-                        if obj.__module__ == module.__name__:
-                            subscribers.append(obj)
+                manifests = _readManifests(os.path.join(subscribersPath, f), moduleName)
             except Exception as e:
                 print(f"Error loading module {moduleName}: {e}")
+                continue
+            for manifest in manifests:
+                key = (moduleName, manifest.className)
+                entry = _entries.get(key)
+                if entry is None:
+                    entry = _entries[key] = SubscriberEntry(manifest)
+                elif entry.manifest != manifest:
+                    entry.setManifest(manifest)
+                subscribers.append(entry)
     return subscribers
 
 
+# subscribers waiting for their required packages to be installed
+_deferredSubscribers = []
+
+
+def missingRequiredPackages(subscriber):
+    missing = []
+    for importName in getattr(subscriber, "requiredPackages", ()):
+        try:
+            if importlib.util.find_spec(importName) is None:
+                missing.append(importName)
+        except (ImportError, ValueError):
+            missing.append(importName)
+    return missing
+
+
+def _activate(sub, message):
+    try:
+        sub.activate()
+    except Exception as e:
+        print(f"Error loading module {sub.manifest.moduleName}: {e}")
+    if sub.isActive():
+        message += "subscriber is activated."
+    else:
+        message += "subscriber didn't get activated."
+    return message
+
+
 def startActivatedObservers():
+    """
+    Activates the enabled subscribers. The ones with required packages that
+    are not importable yet are deferred until `startDeferredObservers` is
+    called after the packages are installed.
+    """
     subs = getRoboFontGadgetsSubscribers()
     extensionSettings = getExtensionDefault(SUBSCRIBERS_KEY, {})
     log = ['List of FontGadgets subscribers:']
+    _deferredSubscribers.clear()
     for sub in subs:
         subName = sub.__name__
         message = f"\t'{subName}': "
         toActive = extensionSettings.get(sub.__name__, False)
         if toActive:
-            sub.activate()
-            if sub.isActive():
-                message += "subscriber is activated."
+            missing = missingRequiredPackages(sub)
+            if missing:
+                _deferredSubscribers.append(sub)
+                message += f"subscriber is waiting for {', '.join(missing)}."
             else:
-                message += "subscriber didn't get activated."
+                message = _activate(sub, message)
         else:
             message += "subscriber is disabled."
         log.append(message + "\n")
     return log
 
+
+def startDeferredObservers():
+    """
+    Activates the deferred subscribers whose required packages can be
+    imported now.
+    """
+    importlib.invalidate_caches()
+    log = []
+    for sub in list(_deferredSubscribers):
+        message = f"\t'{sub.__name__}': "
+        missing = missingRequiredPackages(sub)
+        if missing:
+            message += f"subscriber is disabled, missing {', '.join(missing)}."
+        else:
+            _deferredSubscribers.remove(sub)
+            message = _activate(sub, message)
+        log.append(message + "\n")
+    return log
+
 if __name__ == '__main__':
     startActivatedObservers()
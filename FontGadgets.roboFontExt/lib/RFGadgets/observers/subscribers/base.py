@@ -1,8 +1,18 @@
 from re import S
 from mojo.subscriber import Subscriber
 from mojo.roboFont import AllFonts
-from typing import Any, Optional
-from Foundation import NSTimer
+from typing import Any, Dict, List, Optional
+from Foundation import NSDate, NSTimer
+from RFGadgets.observers.registry import AdjunctObjectsRegistry
+from RFGadgets.observers.profiling import (
+    SubscriberProfile,
+    eventCallbackNames,
+    profiledCallback,
+)
+from RFGadgets.observers.recording import EventRecorder, recordedCallback
+from RFGadgets.observers.scheduler import Debouncer
+from RFGadgets.observers.workQueue import WorkQueue
+import time
 
 class BaseSubscriber(Subscriber):
     """
@@ -15,12 +25,23 @@ class BaseSubscriber(Subscriber):
 
     Attributes:
         checkbox (str): Default text for settings window checkbox.
+        profiledMethods (tuple): Names of the methods that are timed when
+            profiling is enabled, in addition to the event callbacks.
+        requiredPackages (tuple): Import names of the pip packages the
+            subscriber needs (e.g. 'fontgadgets'). At launch the subscriber
+            is only activated once they are importable.
     """
 
     debug: bool = False
     checkbox: str = "Used in settings window, keep it short."
     description: str = "Subclass long description goes here."
+    profiledMethods: tuple = ()
+    requiredPackages: tuple = ()
     _instances: dict = {}  # store the singleton instance for each subclass
+    _profiles: dict = {}  # store the SubscriberProfile of each subclass
+    _profiledClasses: set = set()  # subclasses that are being profiled
+    _recorders: dict = {}  # store the EventRecorder of recording subclasses
+    _wrappedOriginals: dict = {}  # methods replaced by profiling/recording wrappers
 
     def __new__(cls, *args: Any, **kwargs: Any):
         if cls not in cls._instances:
@@ -90,6 +111,21 @@ class BaseSubscriber(Subscriber):
             if hasattr(instance, "_initialized"):
                 del instance._initialized
 
+    @classmethod
+    def reactivate(cls) -> None:
+        """
+        Deactivates and activates the subscriber again if it's active, e.g.
+        so RoboFont observes the callbacks that are wrapped for profiling or
+        recording. The collected changes are applied first, since they are
+        dropped with the state of the subscriber.
+        """
+        instance = cls._instances.get(cls)
+        if instance is None:
+            return
+        instance.applyChanges()
+        cls.deactivate()
+        cls.activate()
+
     @classmethod
     def isActive(cls) -> bool:
         """
@@ -110,6 +146,148 @@ class BaseSubscriber(Subscriber):
         """
         return cls._instances.get(cls)
 
+    @classmethod
+    def enableProfiling(cls) -> None:
+        """
+        Starts collecting the wall time of the event callbacks (methods named
+        like `glyphEditorDidSetGlyph`) and `profiledMethods` of the class.
+
+        The callbacks are wrapped only while profiling is enabled, so a
+        subscriber that is not profiled runs its methods without any
+        overhead. Enable it before activating the subscriber, or call
+        `reactivate` after it, since RoboFont might keep references to the
+        callbacks of an active subscriber.
+        """
+        if cls in cls._profiledClasses:
+            return
+        if cls not in cls._profiles:
+            cls._profiles[cls] = SubscriberProfile(cls.__name__)
+        cls._profiledClasses.add(cls)
+        cls._wrapCallbacks()
+
+    @classmethod
+    def disableProfiling(cls) -> None:
+        """
+        Stops collecting timings and restores the original callbacks. The
+        collected timings are kept until `resetProfiling` is called.
+        """
+        if cls not in cls._profiledClasses:
+            return
+        cls._profiledClasses.discard(cls)
+        cls._wrapCallbacks()
+
+    @classmethod
+    def isProfiling(cls) -> bool:
+        return cls in cls._profiledClasses
+
+    @classmethod
+    def resetProfiling(cls) -> None:
+        profile = cls._profiles.get(cls)
+        if profile is not None:
+            profile.reset()
+
+    @classmethod
+    def profilingSnapshot(cls) -> dict:
+        """
+        Returns the collected timings of each callback. Durations are in
+        milliseconds.
+
+        Returns:
+            A dict of callback names to dicts with `count`, `total`, `mean`,
+            `p50`, `p99`, `max` and `slowestGlyphs` keys.
+        """
+        profile = cls._profiles.get(cls)
+        if profile is None:
+            return {}
+        return profile.asDict()
+
+    @classmethod
+    def startRecording(cls) -> EventRecorder:
+        """
+        Starts recording the name, time and glyph of each event the
+        subscriber receives, e.g. to replay a slow editing session with
+        `Benchmarks/replayEvents.py`. Like profiling, start it before
+        activating the subscriber or call `reactivate` after it.
+
+        Returns:
+            The `EventRecorder`.
+        """
+        recorder = cls._recorders.get(cls)
+        if recorder is None:
+            recorder = cls._recorders[cls] = EventRecorder(cls.__name__)
+            cls._wrapCallbacks()
+        return recorder
+
+    @classmethod
+    def stopRecording(cls, path: Optional[str] = None) -> Optional[EventRecorder]:
+        """
+        Stops recording and restores the original callbacks.
+
+        Args:
+            path (str): If given, the recording is saved to this path as
+            gzipped JSON (e.g. `session.events.json.gz`).
+
+        Returns:
+            The `EventRecorder`, or None if the subscriber was not recording.
+        """
+        recorder = cls._recorders.pop(cls, None)
+        if recorder is None:
+            return None
+        cls._wrapCallbacks()
+        if path is not None:
+            recorder.save(path)
+        return recorder
+
+    @classmethod
+    def isRecording(cls) -> bool:
+        return cls in cls._recorders
+
+    @classmethod
+    def _wrapCallbacks(cls) -> None:
+        # puts back the original callbacks, then wraps them for profiling
+        # and recording, whichever is enabled. Recording wraps the profiling
+        # so the time of recording isn't profiled.
+        originals = cls._wrappedOriginals.pop(cls, None)
+        if originals is not None:
+            for name, original in originals.items():
+                if original is None:
+                    delattr(cls, name)
+                else:
+                    setattr(cls, name, original)
+        profile = cls._profiles.get(cls) if cls in cls._profiledClasses else None
+        recorder = cls._recorders.get(cls)
+        if profile is None and recorder is None:
+            return
+        extraNames = cls.profiledMethods if profile is not None else ()
+        originals = {}
+        for name in eventCallbackNames(cls, extraNames, stopAt=Subscriber):
+            originals[name] = cls.__dict__.get(name)
+            callback = getattr(cls, name)
+            if profile is not None:
+                callback = profiledCallback(callback, name, profile)
+            if recorder is not None and name not in cls.profiledMethods:
+                callback = recordedCallback(callback, name, recorder)
+            setattr(cls, name, callback)
+        cls._wrappedOriginals[cls] = originals
+
+    def applyChanges(self) -> None:
+        """
+        Applies the changes the subscriber has collected but not applied
+        yet. Subclasses that delay their work override it.
+        """
+        pass
+
+    @classmethod
+    def profilingJSON(cls, **kwargs: Any) -> str:
+        """
+        Returns the collected timings as a JSON string, keyed by the class
+        name. Keyword arguments are passed to `json.dumps`.
+        """
+        profile = cls._profiles.get(cls)
+        if profile is None:
+            profile = SubscriberProfile(cls.__name__)
+        return profile.toJSON(**kwargs)
+
 
 class LazyGlyphSubscriber(BaseSubscriber):
     """
@@ -143,12 +321,24 @@ class LazyGlyphSubscriber(BaseSubscriber):
 
     """
 
-    updateDelay: float = 0.000
+    profiledMethods: tuple = ("updateChanges",)
+    # seconds to wait after the last event before calling `updateChanges`
+    updateDelay: float = 0.05
+    # longest wait in seconds after the first event of a burst of events
+    updateMaxWait: Optional[float] = 0.5
+    # time budget in seconds of each slice of the work queued by
+    # `enqueueWork`, or None to do the work right away
+    idleBudget: Optional[float] = 0.008
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        self._clock = None
+        self._scheduler = None
+        self._workQueue = WorkQueue(self.idleBudget or 0)
+        self._drainHandle = None
+        self._observedObjects = AdjunctObjectsRegistry(self)
         super().__init__(*args, **kwargs)
-        self._timer = None
-        self._pendingInfo = None
         self._refreshObjectsToObserve()
 
     def updateChanges(self, info: dict) -> None:
@@ -166,49 +356,218 @@ class LazyGlyphSubscriber(BaseSubscriber):
         """
         raise NotImplementedError()
 
+    def applyChanges(self) -> None:
+        """
+        Calls `updateChanges` for all the collected changes and does the
+        queued work right away, instead of waiting for the next event.
+        """
+        self._stop()
+        # an info without a glyph updates everything
+        self.updateChanges({})
+        self.flushWork()
+
+    def observedGlyphsDidChange(
+        self, font: Any, added: List[str], removed: List[str]
+    ) -> None:
+        """
+        Called after glyphs of a font have been added to or removed from the
+        observed adjunct objects (e.g. opening/closing a font, adding,
+        removing or renaming glyphs). Subclasses can override it to keep their
+        own bookkeeping in sync.
+
+        Args:
+            font: The font that its observed glyphs have changed.
+            added (list): Names of the glyphs that are now observed.
+            removed (list): Names of the glyphs that are no longer observed.
+        """
+        pass
+
+    def observedGlyphsWereRenamed(self, font: Any, renamed: Dict[str, str]) -> None:
+        """
+        Called when glyphs of a font were renamed, before
+        `observedGlyphsDidChange` is called with the other glyph changes.
+        By default the renamed glyphs are reported as removed under their
+        old names and added under their new names. Subclasses can override
+        it to move their state to the new names.
+
+        Args:
+            font: The font of the renamed glyphs.
+            renamed (dict): The new glyph names by their old names.
+        """
+        self.observedGlyphsDidChange(font, list(renamed.values()), list(renamed))
+
     def destroy(self):
         self._stop()
+        self.flushWork()
         self.clearObservedAdjunctObjects()
+        self._observedObjects.clear()
 
     def _refreshObjectsToObserve(self) -> None:
-        objectsToObserver = []
-        for f in AllFonts():
-            objectsToObserver.extend([g for g in f])
-        self.setAdjunctObjectsToObserve(objectsToObserver)
+        self._observedObjects.reset(AllFonts())
 
-    def fontDocumentDidClose(self, info: dict) -> None:
-        self._refreshObjectsToObserve()
+    def fontDocumentWillClose(self, info: dict) -> None:
+        font = info["font"]
+        removed = self._observedObjects.removeFont(font)
+        self.observedGlyphsDidChange(font, [], removed)
 
     def fontDocumentDidOpen(self, info: dict) -> None:
-        self._refreshObjectsToObserve()
+        font = info["font"]
+        added, removed = self._observedObjects.addFont(font)
+        self.observedGlyphsDidChange(font, added, removed)
 
-    # --- NSTimer Delay Logic ---
+    def adjunctFontDidChangeGlyphOrder(self, info: dict) -> None:
+        font = info["font"]
+        if font not in self._observedObjects:
+            return
+        added, removed, renamed = self._observedObjects.syncFont(font)
+        if renamed:
+            self.observedGlyphsWereRenamed(font, renamed)
+        if added or removed:
+            self.observedGlyphsDidChange(font, added, removed)
+
+    adjunctFontDidReloadGlyphs = adjunctFontDidChangeGlyphOrder
+
+    # --- Delay Logic ---
+
+    def makeClock(self) -> Any:
+        """
+        Returns the clock backend of the scheduler that delays
+        `updateChanges`. Override it to use another backend, e.g.
+        `RFGadgets.observers.scheduler.ManualClock` outside RoboFont.
+        """
+        return NSTimerClock()
+
+    def _getClock(self) -> Any:
+        if self._clock is None:
+            self._clock = self.makeClock()
+        return self._clock
 
     def trigger(self, info: dict) -> None:
-        self._pendingInfo = info
-        if self._timer is not None:
-            self._stop()
-        self._makeTimer()
+        if self._scheduler is None:
+            self._makeTimer()
+        if info.get("subscriberEventName") in APPLICATION_EVENTS:
+            kind = "application"
+        else:
+            kind = "glyph"
+        self._scheduler.schedule(kind, info)
 
     def _stop(self) -> None:
-        if self._timer is None:
+        if self._scheduler is None:
             return
-        if self._timer.isValid():
-            self._timer.invalidate()
-            self._timer = None
+        self._scheduler.cancel()
 
     def _makeTimer(self) -> None:
-        self._timer = (
-            NSTimer.scheduledTimerWithTimeInterval_target_selector_userInfo_repeats_(
-                self.updateDelay, self, "timerCallback:", None, False
-            )
+        self._scheduler = Debouncer(
+            self._scheduledUpdate,
+            self._getClock(),
+            delay=self.updateDelay,
+            maxWait=self.updateMaxWait,
         )
 
-    def timerCallback_(self, timer: Any) -> None:
-        self._stop()
-        if self._pendingInfo is not None:
-            self.updateChanges(self._pendingInfo)
-            self._pendingInfo = None
+    def _scheduledUpdate(self, payloads: dict) -> None:
+        # application events update everything, so the info of the last glyph
+        # event is only needed if there was no application event
+        info = payloads.get("application")
+        if info is None:
+            info = payloads["glyph"]
+        self.updateChanges(info)
+
+    # --- Idle Time Work ---
+
+    @property
+    def workQueueDepth(self) -> int:
+        """
+        Number of work items waiting to be processed.
+        """
+        return self._workQueue.depth
+
+    @property
+    def workQueueProgress(self) -> float:
+        """
+        Ratio of the processed work items since the queue was last empty.
+        """
+        return self._workQueue.progress
+
+    def enqueueWork(self, key: Any, work: Any, moveToEnd: bool = False) -> None:
+        """
+        Queues a small piece of work (a callable without arguments) to be done
+        in slices of `idleBudget` seconds when the run loop is idle, instead
+        of blocking the app for the whole update. Work pushed with a key that
+        is already queued replaces the queued work. Save events flush the
+        queue synchronously after calling `updateChanges`.
+
+        Args:
+            key: A hashable identifier of the work (e.g. a glyph name).
+            work: The callable that does the work.
+            moveToEnd (bool): Move the work after the queued work, even if
+                the key is already queued.
+        """
+        if self.idleBudget is None:
+            work()
+            return
+        self._workQueue.push(key, work, moveToEnd)
+        self._scheduleDrain()
+
+    def flushWork(self) -> None:
+        """
+        Does all the queued work right away.
+        """
+        if self._drainHandle is not None:
+            self._getClock().cancel(self._drainHandle)
+            self._drainHandle = None
+        if self._workQueue.depth:
+            self._workQueue.flush()
+            self.workQueueDidProgress(self._workQueue.processedCount, 0)
+
+    def workQueueDidProgress(self, processed: int, remaining: int) -> None:
+        """
+        Called after each slice of the queued work. Subclasses can override
+        it to report the progress.
+
+        Args:
+            processed (int): Number of items processed since the queue was
+            last empty.
+            remaining (int): Number of items left in the queue.
+        """
+        pass
+
+    def _scheduleDrain(self) -> None:
+        if self._drainHandle is None:
+            self._drainHandle = self._getClock().callLater(0, self._drainWork)
+
+    def _drainWork(self) -> None:
+        self._drainHandle = None
+        remaining = self._workQueue.drain()
+        self.workQueueDidProgress(
+            self._workQueue.processedCount, self._workQueue.depth
+        )
+        if remaining:
+            self._scheduleDrain()
+
+
+class NSTimerClock:
+    """
+    Clock backend for `RFGadgets.observers.scheduler.Debouncer` that calls
+    back on the main run loop using `NSTimer`.
+    """
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def callLater(self, delay: float, callback: Any) -> Any:
+        return NSTimer.scheduledTimerWithTimeInterval_repeats_block_(
+            delay, False, lambda timer: callback()
+        )
+
+    def reschedule(self, handle: Any, delay: float) -> bool:
+        if not handle.isValid():
+            return False
+        handle.setFireDate_(NSDate.dateWithTimeIntervalSinceNow_(delay))
+        return True
+
+    def cancel(self, handle: Any) -> None:
+        if handle.isValid():
+            handle.invalidate()
 
 
 GLYPH_EVENTS = {
@@ -245,8 +604,8 @@ for event in GLYPH_EVENTS | APPLICATION_EVENTS | SAVE_EVENTS:
 
         def method(self, info):
             self._stop()
-            self._pendingInfo = None
             self.updateChanges(info)
+            self.flushWork()
 
     else:
 
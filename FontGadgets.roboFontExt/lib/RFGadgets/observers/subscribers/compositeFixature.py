@@ -1,8 +1,23 @@
+import time
+from functools import partial
 from fontTools.misc.transform import Transform
 from base import SAVE_EVENTS, LazyGlyphSubscriber, GLYPH_EVENTS, APPLICATION_EVENTS
 from RFGadgets.observers.startup import EXTENSION_ID
-from mojo.roboFont import AllFonts
-import fontgadgets.extensions.glyph.composite
+from RFGadgets.observers.componentIndex import ComponentIndex
+from RFGadgets.observers.changeBatch import GlyphChangeBatch
+from RFGadgets.observers.glyphState import GlyphStateStore
+from RFGadgets.observers.preChange import (
+    addGlyphWillChangeCallback,
+    removeGlyphWillChangeCallback,
+)
+from RFGadgets.observers.fingerprint import (
+    FINGERPRINT_FIELDS,
+    OutlineFingerprint,
+    outlineFingerprint,
+    translationOffset,
+    translationOffsets,
+)
+from mojo.roboFont import AllFonts, CurrentGlyph
 
 info = """If you move outlines of a glyph that is used in other composites,
 their positions in the composites will also move. In most of the time I don't
@@ -12,41 +27,165 @@ outlines in any other way (scaling, modifying curves) it will not do any
 thing.
 """
 
-BOUNDS_KEY = f"{EXTENSION_ID}.previousBounds"
-CHANGES_KEY = f"{EXTENSION_ID}.changed"
+GLYPH_STATE_KEY = f"{EXTENSION_ID}.glyphState"
+COMPONENT_INDEX_KEY = f"{EXTENSION_ID}.componentIndex"
+# key of the queued work that moves the components of the processed glyphs
+MOVE_COMPONENTS_KEY = f"{EXTENSION_ID}.moveComponents"
+UNDO_TITLE = "Compensate position of component."
 
 
 class AutoOffsetComponents(LazyGlyphSubscriber):
     debug = False
     checkbox = "Revert Component on Base Glyph Shift"
     description = info
+    # move the components of all the composites of a base glyph in one undo
+    # step and post a single change notification
+    batchCompensation = True
+    # compare the pending changes of all the open fonts (masters) together
+    # and move their components in one batch per font
+    synchronizeMasters = True
 
     def build(self):
+        # moves of the glyphs processed in the idle time, by font
+        self._queuedMoves = {}
+        self._currentGlyph = None
         for f in AllFonts():
             self.addFont(f)
+        addGlyphWillChangeCallback(self.glyphWillChange)
+        self._setCurrentGlyph(CurrentGlyph())
+
+    def destroy(self):
+        removeGlyphWillChangeCallback(self.glyphWillChange)
+        self._currentGlyph = None
+        super().destroy()
 
     def addFont(self, font):
-        font.tempLib[CHANGES_KEY] = set()
-        # previous bounds doesn't stick in glyph.tempLib after undo, instead using
-        # font.tempLib
-        if BOUNDS_KEY not in font.tempLib:
-            font.tempLib[BOUNDS_KEY] = {}
-        for g in font.naked().componentReferences:
-            self.addPrevBounds(font[g])
+        # previous fingerprints don't stick in glyph.tempLib after undo,
+        # instead using font.tempLib. The baselines are taken on the first
+        # touch of a base glyph (see `captureBaselines`), so only the
+        # glyphs that are edited get a row.
+        font.tempLib[GLYPH_STATE_KEY] = GlyphStateStore(FINGERPRINT_FIELDS)
+        font.tempLib[COMPONENT_INDEX_KEY] = ComponentIndex.fromFont(font)
+
+    def componentIndex(self, font):
+        index = font.tempLib.get(COMPONENT_INDEX_KEY)
+        if index is None:
+            index = ComponentIndex.fromFont(font)
+            font.tempLib[COMPONENT_INDEX_KEY] = index
+        return index
+
+    def observedGlyphsDidChange(self, font, added, removed):
+        index = font.tempLib.get(COMPONENT_INDEX_KEY)
+        if index is None:
+            # `addFont` builds the index for new fonts
+            return
+        if font not in self._observedObjects:
+            del font.tempLib[COMPONENT_INDEX_KEY]
+            return
+        store = self.glyphState(font)
+        for gn in removed:
+            index.removeGlyph(gn)
+            store.remove(gn)
+        for gn in added:
+            index.updateGlyph(font[gn])
+
+    def observedGlyphsWereRenamed(self, font, renamed):
+        index = font.tempLib.get(COMPONENT_INDEX_KEY)
+        if index is None or font not in self._observedObjects:
+            super().observedGlyphsWereRenamed(font, renamed)
+            return
+        store = self.glyphState(font)
+        for oldName, newName in renamed.items():
+            # the baseline and the pending change move with the glyph, the
+            # composites that use the old name are updated by their
+            # components notification
+            store.rename(oldName, newName)
+            index.removeGlyph(oldName)
+            index.updateGlyph(font[newName])
+
+    def adjunctGlyphDidChangeComponents(self, info):
+        glyph = info["glyph"]
+        font = glyph.font
+        if font is None:
+            return
+        self.componentIndex(font).updateGlyph(glyph)
 
     def fontDocumentDidOpen(self, info):
         super().fontDocumentDidOpen(info)
         f = info["font"]
         self.addFont(f)
 
-    def addPrevBounds(self, glyph):
-        if glyph.font is None:
+    def glyphState(self, font):
+        # baseline fingerprints and pending changes by glyph
+        store = font.tempLib.get(GLYPH_STATE_KEY)
+        if store is None:
+            store = GlyphStateStore(FINGERPRINT_FIELDS)
+            font.tempLib[GLYPH_STATE_KEY] = store
+        return store
+
+    def fingerprint(self, font, glyphName):
+        values = self.glyphState(font).get(glyphName)
+        if values is None:
+            return None
+        return OutlineFingerprint(*values)
+
+    def captureBaselines(self, font, glyphNames):
+        """
+        Stores the fingerprints of the given base glyphs that don't have one
+        yet, which is the state their changes are compared with.
+
+        Instead of every base glyph when a font opens, this is done on the
+        first touch of a glyph: when it becomes current, which is before
+        the user can drag its outline, and right before a script transforms
+        it (`glyphWillChange`). A glyph changed in any other way without
+        being touched (e.g. a script setting its points) uses its first
+        changed state as the baseline.
+        """
+        index = self.componentIndex(font)
+        store = self.glyphState(font)
+        for name in glyphNames:
+            if index.hasComposites(name) and name in font and not store.hasValues(name):
+                store.set(name, outlineFingerprint(font[name]))
+
+    def glyphWillChange(self, glyph):
+        font = glyph.font
+        if font is None or COMPONENT_INDEX_KEY not in font.tempLib:
             return
-        boundsDict = glyph.font.tempLib.get(BOUNDS_KEY)
-        if boundsDict is None:
-            boundsDict = {}
-            glyph.font.tempLib[BOUNDS_KEY] = boundsDict
-        boundsDict[glyph.name] = glyph.bounds
+        self.captureBaselines(font, (glyph.name,))
+
+    def releaseBaseline(self, glyph):
+        # the baseline of a glyph that was only looked at is dropped, so
+        # browsing the font doesn't keep a row for each glyph
+        font = glyph.font
+        if font is None or glyph.name not in font:
+            return
+        store = font.tempLib.get(GLYPH_STATE_KEY)
+        if store is None or store.isDirty(glyph.name):
+            return
+        if self.fingerprint(font, glyph.name) == outlineFingerprint(glyph):
+            store.remove(glyph.name)
+
+    def _setCurrentGlyph(self, glyph):
+        previous = self._currentGlyph
+        self._currentGlyph = glyph
+        if previous is not None and (glyph is None or previous.naked() is not glyph.naked()):
+            self.releaseBaseline(previous)
+        if glyph is not None and glyph.font is not None:
+            self.captureBaselines(glyph.font, (glyph.name,))
+
+    def roboFontDidSwitchCurrentGlyph(self, info):
+        self._setCurrentGlyph(info.get("glyph"))
+        super().roboFontDidSwitchCurrentGlyph(info)
+
+    def glyphEditorWillSetGlyph(self, info):
+        self._setCurrentGlyph(info.get("glyph"))
+        super().glyphEditorWillSetGlyph(info)
+
+    def _updateFingerprint(self, base_glyph):
+        previous = self.fingerprint(base_glyph.font, base_glyph.name)
+        current = outlineFingerprint(base_glyph)
+        self.glyphState(base_glyph.font).set(base_glyph.name, current)
+        return previous, current
 
     def _checkIfBaseGlyphMoved(self, base_glyph):
         # check if base_glyph outline has been moved and not scaled or
@@ -54,87 +193,132 @@ class AutoOffsetComponents(LazyGlyphSubscriber):
         font = base_glyph.font
         if font is None:
             return
-        boundsDict = font.tempLib.get(BOUNDS_KEY)
-        if boundsDict is None:
-            boundsDict = {}
-            font.tempLib[BOUNDS_KEY] = boundsDict
-        currentBounds = base_glyph.bounds
-        previousBounds = boundsDict.get(base_glyph.name)
-        if previousBounds is None:
-            boundsDict[base_glyph.name] = currentBounds
-            return
-        if currentBounds is None:
-            boundsDict[base_glyph.name] = None
+        previous, current = self._updateFingerprint(base_glyph)
+        if previous is None:
             return
-        prev_xMin, prev_yMin, prev_xMax, prev_yMax = previousBounds
-        curr_xMin, curr_yMin, curr_xMax, curr_yMax = currentBounds
-        prev_width = prev_xMax - prev_xMin
-        prev_height = prev_yMax - prev_yMin
-        curr_width = curr_xMax - curr_xMin
-        curr_height = curr_yMax - curr_yMin
-        epsilon = 0.001
-        if (
-            abs(prev_width - curr_width) > epsilon
-            or abs(prev_height - curr_height) > epsilon
-        ):
-            boundsDict[base_glyph.name] = currentBounds
+        offset = translationOffset(previous, current)
+        if offset is None:
+            # shape is edited, even if the bounds might be the same
             return
         epsilon = 0.1  # offset needs higher tolerance
-        offsetX = curr_xMin - prev_xMin
-        offsetY = curr_yMin - prev_yMin
+        offsetX, offsetY = offset
         if abs(offsetX) > epsilon or abs(offsetY) > epsilon:
             offset = (-offsetX, -offsetY)
             self._fixRelatedCompositeComponentPositions(base_glyph, offset)
-        boundsDict[base_glyph.name] = currentBounds
 
-    def _fixRelatedCompositeComponentPositions(self, glyph, offset):
+    def _checkIfBaseGlyphsMoved(self, base_glyphs):
+        # same as `_checkIfBaseGlyphMoved` but the offsets of all the glyphs
+        # (e.g. same glyph in different masters) are calculated together and
+        # the components are moved in one batch per font
+        self._moveComponents(self._baseGlyphMoves(base_glyphs))
+
+    def _baseGlyphMoves(self, base_glyphs, moves=None):
+        # adds the (base glyph, compensation offset) of the moved glyphs to
+        # a dict by font
+        if moves is None:
+            moves = {}
+        glyphs = []
+        previousFingerprints = []
+        currentFingerprints = []
+        for base_glyph in base_glyphs:
+            if base_glyph.font is None:
+                continue
+            previous, current = self._updateFingerprint(base_glyph)
+            glyphs.append(base_glyph)
+            previousFingerprints.append(previous)
+            currentFingerprints.append(current)
+        offsets = translationOffsets(previousFingerprints, currentFingerprints)
+        for base_glyph, offset in zip(glyphs, offsets):
+            if offset is not None:
+                offset = (-offset[0], -offset[1])
+                moves.setdefault(base_glyph.font, []).append((base_glyph, offset))
+        return moves
+
+    def _moveComponents(self, moves):
+        for font, fontMoves in moves.items():
+            self._moveFontComponents(font, fontMoves)
+
+    def _moveFontComponents(self, font, fontMoves, end=None):
+        # moves the components of the composites of the base glyphs until
+        # the `time.perf_counter()` end, and returns the number of the moved
+        # base glyphs
+        count = 0
+        if self.batchCompensation:
+            with GlyphChangeBatch(font, UNDO_TITLE) as batch:
+                for base_glyph, offset in fontMoves:
+                    self._fixRelatedCompositeComponentPositions(base_glyph, offset, batch)
+                    count += 1
+                    if end is not None and time.perf_counter() >= end:
+                        break
+        else:
+            for base_glyph, offset in fontMoves:
+                self._fixRelatedCompositeComponentPositions(base_glyph, offset)
+                count += 1
+                if end is not None and time.perf_counter() >= end:
+                    break
+        return count
+
+    def _fixRelatedCompositeComponentPositions(self, glyph, offset, batch=None):
         font = glyph.font
         if not font:
             return
-        relatedComps = glyph.relatedComposites
+        relatedComps = self.componentIndex(font).composites(glyph.name)
+        composites = [
+            font[compGn]
+            for compGn in relatedComps
+            if compGn in font and compGn != glyph.name
+        ]
         fixed_glyphs = set()
-        for compGn in relatedComps:
-            if compGn not in font:
-                continue
-            compG = font[compGn]
-            if compG == glyph:
-                continue
-            compG.prepareUndo("Compensate position of component.")
-            didMove = False
-            for comp in compG.components:
-                if comp.baseGlyph == glyph.name:
-                    scaletransformation = list(comp.transformation[:4])
-                    newP = offset
-                    if scaletransformation != [1.0, 0.0, 0.0, 1.0]:
-                        scaletransformation.extend([0, 0])
-                        transformPoint = Transform(*scaletransformation).transformPoint
-                        newP = transformPoint(offset)
-                    comp.moveBy(newP)
-                    didMove = True
-            if didMove:
-                compG.changed()
-                compG.performUndo()
-                fixed_glyphs.add(compG.name)
+        if batch is not None:
+            for compG in composites:
+                if self._compensateComponents(compG, glyph.name, offset, batch):
+                    fixed_glyphs.add(compG.name)
+        elif self.batchCompensation:
+            with GlyphChangeBatch(font, UNDO_TITLE) as batch:
+                for compG in composites:
+                    if self._compensateComponents(compG, glyph.name, offset, batch):
+                        fixed_glyphs.add(compG.name)
+        else:
+            for compG in composites:
+                compG.prepareUndo(UNDO_TITLE)
+                if self._compensateComponents(compG, glyph.name, offset):
+                    compG.changed()
+                    compG.performUndo()
+                    fixed_glyphs.add(compG.name)
         if fixed_glyphs and self.debug:
             print(f"Updated components in: {', '.join(fixed_glyphs)}")
 
+    def _compensateComponents(self, compG, baseGlyphName, offset, batch=None):
+        didMove = False
+        for comp in compG.components:
+            if comp.baseGlyph == baseGlyphName:
+                if batch is not None and not didMove:
+                    batch.add(compG)
+                scaletransformation = list(comp.transformation[:4])
+                newP = offset
+                if scaletransformation != [1.0, 0.0, 0.0, 1.0]:
+                    scaletransformation.extend([0, 0])
+                    transformPoint = Transform(*scaletransformation).transformPoint
+                    newP = transformPoint(offset)
+                comp.moveBy(newP)
+                didMove = True
+        return didMove
+
     adjunctGlyphDidChangeOutlineDelay = 0.01
 
     def adjunctGlyphDidChangeOutline(self, info):
         # collect changes
         glyph = info["glyph"]
-        if glyph.relatedComposites:
-            glyph.font.tempLib[CHANGES_KEY].add(glyph.name)
-            font = glyph.font
-            if font is None:
-                return
-            boundsDict = font.tempLib.get(BOUNDS_KEY)
-            if boundsDict is None:
-                boundsDict = {}
-                font.tempLib[BOUNDS_KEY] = boundsDict
-            previousBounds = boundsDict.get(glyph.name)
-            if previousBounds is None:
-                boundsDict[glyph.name] = glyph.bounds
+        font = glyph.font
+        if font is None:
+            return
+        if self.componentIndex(font).hasComposites(glyph.name):
+            store = self.glyphState(font)
+            store.markDirty(glyph.name)
+            # a glyph that was changed without being touched uses its first
+            # changed state as the baseline
+            if not store.hasValues(glyph.name):
+                store.set(glyph.name, outlineFingerprint(glyph))
 
     def updateChanges(self, info):
         # apply changes on low feedback UI events
@@ -143,22 +327,83 @@ class AutoOffsetComponents(LazyGlyphSubscriber):
         if eventName in GLYPH_EVENTS:
             currentGlyph = info.get("glyph")
         if currentGlyph is None or eventName in APPLICATION_EVENTS | SAVE_EVENTS:
-            # apply changes on everything, user can wait longer
+            # apply changes on everything, user can wait longer. The glyphs
+            # are processed in slices on idle time and flushed on save.
+            pending = set()
             for f in AllFonts():
-                for gn in f.tempLib[CHANGES_KEY]:
-                    self._checkIfBaseGlyphMoved(f[gn])
-                f.tempLib[CHANGES_KEY] = set()
+                pending.update(self.glyphState(f).dirtyGlyphNames())
+            for gn in sorted(pending):
+                self.enqueueWork(gn, partial(self._processGlyphChanges, gn))
+            if pending:
+                # after all the queued glyphs, so the components of each
+                # font are moved in one batch per slice
+                self.enqueueWork(
+                    MOVE_COMPONENTS_KEY, self._moveQueuedComponents, moveToEnd=True
+                )
         else:
             # only update the currentglyph if it's inside one of the
             # relatedComposites of the glyphs from the changes
             cgn = currentGlyph.name
-            for f in AllFonts():
-                newChanges = set()
-                for gn in f.tempLib[CHANGES_KEY]:
-                    related = f[gn].relatedComposites
-                    if cgn in related:
-                        self._checkIfBaseGlyphMoved(f[gn])
-                    else:
-                        newChanges.add(gn)
-                f.tempLib[CHANGES_KEY] = newChanges
+            bases = {}
+
+            def isBaseOfCurrentGlyph(font, gn):
+                if font not in bases:
+                    bases[font] = self.componentIndex(font).allBases(cgn)
+                return gn in bases[font]
+
+            self._processChanges(isBaseOfCurrentGlyph)
 
+    def _processChanges(self, shouldProcess=None):
+        # group the pending changes by glyph name across the fonts, so the
+        # same glyph edited in all the masters is processed together
+        pending = {}
+        for f in AllFonts():
+            if shouldProcess is None:
+                names = self.glyphState(f).popDirty()
+            else:
+                names = self.glyphState(f).popDirty(partial(shouldProcess, f))
+            for gn in names:
+                pending.setdefault(gn, []).append(f[gn])
+        self._checkGlyphs([g for glyphs in pending.values() for g in glyphs])
+
+    def _processGlyphChanges(self, gn):
+        # process the pending changes of one glyph name in all the fonts, the
+        # moves are applied by `_moveQueuedComponents`
+        glyphs = []
+        for f in AllFonts():
+            store = f.tempLib.get(GLYPH_STATE_KEY)
+            if store is not None and store.isDirty(gn):
+                store.clearDirty(gn)
+                if gn in f:
+                    glyphs.append(f[gn])
+        if self.synchronizeMasters:
+            self._baseGlyphMoves(glyphs, self._queuedMoves)
+        else:
+            self._checkGlyphs(glyphs)
+
+    def _moveQueuedComponents(self):
+        # the components are moved for `idleBudget` seconds, in one undo
+        # step per font, and the rest is queued again for the next slice
+        end = None
+        if self.idleBudget is not None:
+            end = time.perf_counter() + self.idleBudget
+        moves = self._queuedMoves
+        while moves:
+            font = next(iter(moves))
+            fontMoves = moves.pop(font)
+            if font not in self._observedObjects:
+                continue
+            count = self._moveFontComponents(font, fontMoves, end)
+            if count < len(fontMoves):
+                self._queuedMoves = {font: fontMoves[count:], **moves}
+                self.enqueueWork(
+                    MOVE_COMPONENTS_KEY, self._moveQueuedComponents, moveToEnd=True
+                )
+                return
+
+    def _checkGlyphs(self, base_glyphs):
+        if self.synchronizeMasters:
+            self._checkIfBaseGlyphsMoved(base_glyphs)
+        else:
+            for g in base_glyphs:
+                self._checkIfBaseGlyphMoved(g)
@@ -0,0 +1,101 @@
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class WorkQueue:
+    """
+    A cooperative queue of small work items that is drained in slices with a
+    time budget, so long running updates can be spread over the idle time of
+    the run loop instead of freezing the app.
+
+    Work items are callables stored by a key. Pushing a key that is already
+    in the queue replaces its work without changing its position, which
+    coalesces repeated requests for the same object. With `moveToEnd` the
+    item is moved after the other items instead, e.g. for work that
+    finishes what the other items did.
+
+    Example:
+        queue = WorkQueue(budget=0.008)
+        for name in glyphNames:
+            queue.push(name, partial(process, name))
+        while queue.drain():
+            pass  # give back control to the run loop between the slices
+
+    Args:
+        budget (float): Time budget of each slice in seconds.
+        timer: Function that returns the current time in seconds.
+    """
+
+    def __init__(
+        self, budget: float = 0.008, timer: Callable[[], float] = time.perf_counter
+    ) -> None:
+        self.budget = budget
+        self.timer = timer
+        self._items: Dict[Hashable, Callable[[], Any]] = {}
+        self.processedCount = 0
+        self.sliceCount = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    @property
+    def depth(self) -> int:
+        """
+        Number of work items waiting in the queue.
+        """
+        return len(self._items)
+
+    @property
+    def progress(self) -> float:
+        """
+        Ratio of the processed items to all the items pushed since the queue
+        was last empty.
+        """
+        total = self.processedCount + len(self._items)
+        if not total:
+            return 1.0
+        return self.processedCount / total
+
+    def push(self, key: Hashable, work: Callable[[], Any], moveToEnd: bool = False) -> None:
+        if not self._items:
+            self.processedCount = 0
+        if moveToEnd:
+            self._items.pop(key, None)
+        self._items[key] = work
+
+    def drain(self, budget: Optional[float] = None) -> bool:
+        """
+        Runs the work items until the time budget of the slice is spent. At
+        least one item is processed on each call.
+
+        Returns:
+            True if there are items left in the queue.
+        """
+        if budget is None:
+            budget = self.budget
+        end = self.timer() + budget
+        self.sliceCount += 1
+        while self._items:
+            key = next(iter(self._items))
+            work = self._items.pop(key)
+            work()
+            self.processedCount += 1
+            if self.timer() >= end:
+                break
+        return bool(self._items)
+
+    def flush(self) -> None:
+        """
+        Runs all the work items synchronously.
+        """
+        while self._items:
+            key = next(iter(self._items))
+            work = self._items.pop(key)
+            work()
+            self.processedCount += 1
+
+    def clear(self) -> None:
+        self._items = {}
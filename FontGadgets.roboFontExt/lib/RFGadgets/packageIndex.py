@@ -0,0 +1,130 @@
+import os
+import re
+import sys
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+METADATA_EXTENSIONS = {".dist-info", ".egg-info"}
+
+
+def normalize_dist_name(name):
+    # PEP 503 normalization, 'python_bidi' and 'Python-Bidi' are the same
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class InstalledPackageIndex:
+    """
+    Index of the installed distribution names and their top level import
+    names, built in a single pass over the metadata folders of the
+    distributions on `sys.path` plus the target folder.
+
+    The index is saved to `cache_path` together with the mtime of the target
+    folder, the python version and `sys.path`. As long as they don't change,
+    loading the index only costs a stat of the target folder and reading the
+    cache file. Installing into the target folder with pip changes its mtime,
+    which invalidates the cache, but `invalidate` should still be called after
+    installing or uninstalling packages.
+    """
+
+    def __init__(self, target_path, cache_path):
+        self.target_path = target_path
+        self.cache_path = cache_path
+        self._dist_names = None
+        self._import_names = None
+
+    def __contains__(self, package_name):
+        return self.is_installed(package_name)
+
+    def is_installed(self, package_name):
+        """
+        Returns True if the given distribution name (e.g. 'GitPython') or
+        import name (e.g. 'git') is installed.
+        """
+        if self._dist_names is None:
+            self.load()
+        if normalize_dist_name(package_name) in self._dist_names:
+            return True
+        return package_name in self._import_names
+
+    def invalidate(self):
+        self._dist_names = None
+        self._import_names = None
+        try:
+            os.remove(self.cache_path)
+        except OSError:
+            pass
+
+    def load(self):
+        key = self._cache_key()
+        data = self._read_cache()
+        if data is not None and data.get("key") == key:
+            self._dist_names = set(data["distributions"])
+            self._import_names = set(data["modules"])
+            return
+        self._scan()
+        self._write_cache(key)
+
+    def _search_path(self):
+        search_path = sys.path[:]
+        if self.target_path not in search_path:
+            search_path.insert(0, self.target_path)
+        return search_path
+
+    def _cache_key(self):
+        try:
+            mtime = os.stat(self.target_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        return {
+            "version": CACHE_VERSION,
+            "python": sys.version,
+            "targetMtime": mtime,
+            "path": self._search_path(),
+        }
+
+    def _scan(self):
+        # the metadata folders are found by their names, which is a lot
+        # cheaper than parsing the METADATA file of every distribution
+        dist_names = set()
+        import_names = set()
+        for folder in self._search_path():
+            try:
+                entries = list(os.scandir(folder or "."))
+            except OSError:
+                continue
+            for entry in entries:
+                base, ext = os.path.splitext(entry.name)
+                if ext not in METADATA_EXTENSIONS:
+                    continue
+                dist_names.add(normalize_dist_name(base.split("-")[0]))
+                try:
+                    with open(
+                        os.path.join(entry.path, "top_level.txt"), encoding="utf-8"
+                    ) as f:
+                        import_names.update(f.read().split())
+                except OSError:
+                    continue
+        self._dist_names = dist_names
+        self._import_names = import_names
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, key):
+        data = {
+            "key": key,
+            "distributions": sorted(self._dist_names),
+            "modules": sorted(self._import_names),
+        }
+        try:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except OSError as e:
+            logger.debug(f"Could not write the package index cache: {e}")
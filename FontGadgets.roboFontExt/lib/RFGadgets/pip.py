@@ -2,8 +2,9 @@ import os
 import sys
 import AppKit
 import subprocess
-from importlib import metadata
+import threading
 import logging
+from RFGadgets.packageIndex import InstalledPackageIndex
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -27,6 +28,13 @@ class PIPManager:
     def __init__(self):
         self.target_path = self._get_robo_font_external_packages_folder()
         self._ensure_target_path_exists()
+        # the cache is kept outside the target folder, writing it shouldn't
+        # change the mtime of the folder
+        cache_path = os.path.join(
+            os.path.dirname(self.target_path),
+            f"{os.path.basename(self.target_path)}-fontgadgets-index.json",
+        )
+        self.package_index = InstalledPackageIndex(self.target_path, cache_path)
 
     def _get_robo_font_external_packages_folder(self):
         app_support_path = AppKit.NSSearchPathForDirectoriesInDomains(
@@ -56,10 +64,132 @@ class PIPManager:
             pip_args.append("--no-deps")
         pip_args.append(package_name)
         return_code = self._run_pip_command(pip_args)
+        self.package_index.invalidate()
         if return_code == 0:
             return self.target_path
         return None
 
+    def install_packages(
+        self,
+        package_specs,
+        install_dependencies=True,
+        wheel_cache=None,
+        progress_callback=None,
+    ):
+        """
+        Installs all the package specs with a single pip run, so the
+        requirements are resolved and installed once instead of once per
+        package.
+
+        Args:
+            package_specs (list): The pip requirement specs.
+            install_dependencies (bool): Install the dependencies of the specs.
+            wheel_cache (str): Optional folder where the wheels are built and
+                kept. The packages are installed from this folder, so later
+                reinstalls of the same specs work offline.
+            progress_callback: Called with `(package_spec, status)` where the
+                status is 'installing', 'installed' or 'failed'.
+
+        Returns:
+            A dict of each spec to True if it was installed, pip installs
+            either all or none of the specs of a run, so if the batch fails
+            the specs are installed one by one to find the failing ones.
+        """
+        package_specs = list(dict.fromkeys(package_specs))
+        if not package_specs:
+            return {}
+
+        def report(package_spec, status):
+            if progress_callback is not None:
+                progress_callback(package_spec, status)
+
+        for package_spec in package_specs:
+            report(package_spec, "installing")
+        pip_args = ["install", "--upgrade", "--target", self.target_path]
+        if not install_dependencies:
+            pip_args.append("--no-deps")
+        if wheel_cache is not None:
+            self._build_wheels(package_specs, install_dependencies, wheel_cache)
+            pip_args += ["--no-index", "--find-links", wheel_cache]
+            pip_args += [self._get_offline_requirement(s) for s in package_specs]
+        else:
+            pip_args += package_specs
+        return_code = self._run_pip_command(pip_args)
+        self.package_index.invalidate()
+
+        results = {}
+        if return_code == 0:
+            for package_spec in package_specs:
+                results[package_spec] = True
+                report(package_spec, "installed")
+            return results
+        logger.debug("Batch installation failed, installing the packages one by one.")
+        for package_spec in package_specs:
+            installed = self.install_package(package_spec, install_dependencies) is not None
+            results[package_spec] = installed
+            report(package_spec, "installed" if installed else "failed")
+        return results
+
+    def install_packages_in_background(
+        self,
+        package_specs,
+        install_dependencies=True,
+        wheel_cache=None,
+        progress_callback=None,
+        completion_callback=None,
+    ):
+        """
+        Runs `install_packages` in a worker thread so the app is not blocked
+        while pip runs. The progress and completion callbacks are called on
+        the main thread, the completion callback gets the dict of results.
+
+        Returns:
+            The started thread.
+        """
+
+        def progress(package_spec, status):
+            if progress_callback is not None:
+                _call_on_main_thread(progress_callback, package_spec, status)
+
+        def run():
+            results = {}
+            try:
+                results = self.install_packages(
+                    package_specs,
+                    install_dependencies=install_dependencies,
+                    wheel_cache=wheel_cache,
+                    progress_callback=progress,
+                )
+            except Exception as e:
+                logger.error(f"Background installation failed: {e}")
+                results = {package_spec: False for package_spec in package_specs}
+            finally:
+                if completion_callback is not None:
+                    _call_on_main_thread(completion_callback, results)
+
+        thread = threading.Thread(
+            target=run, name="FontGadgets pip installer", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _build_wheels(self, package_specs, install_dependencies, wheel_cache):
+        # wheels already in the cache are reused by pip, if this fails (e.g.
+        # offline) the install still uses whatever the cache contains
+        os.makedirs(wheel_cache, exist_ok=True)
+        pip_args = ["wheel", "--wheel-dir", wheel_cache, "--find-links", wheel_cache]
+        if not install_dependencies:
+            pip_args.append("--no-deps")
+        pip_args += package_specs
+        return self._run_pip_command(pip_args)
+
+    def _get_offline_requirement(self, package_spec):
+        # a VCS url can't be resolved with `--no-index`, but its wheel can be
+        # found in the cache by the distribution name
+        if package_spec.startswith("git+"):
+            return self._get_dist_name_from_spec(package_spec)
+        return package_spec
+
     def _get_dist_name_from_spec(self, package_spec):
         if package_spec.startswith("git+"):
             # 'git+https:.../repo.git'
@@ -87,34 +217,18 @@ class PIPManager:
             sys.path.insert(0, self.target_path)
 
         return_code = self._run_pip_command(pip_args)
+        self.package_index.invalidate()
 
         sys.path[:] = original_sys_path
         return return_code == 0
 
     def _is_package_installed(self, package_name):
-        original_sys_path = sys.path[:]
-        if self.target_path not in sys.path:
-            sys.path.insert(0, self.target_path)
+        # distribution name (e.g., 'GitPython') or import name (e.g., 'git')
+        return self.package_index.is_installed(package_name)
 
-        found = False
-        try:
-            # distribution name (e.g., 'GitPython')
-            metadata.distribution(package_name)
-            found = True
-        except metadata.PackageNotFoundError:
-            # import name (e.g., 'git')
-            for dist in metadata.distributions():
-                try:
-                    top_levels = dist.read_text('top_level.txt')
-                    if top_levels and package_name in top_levels.split():
-                        found = True
-                        break
-                except Exception:
-                    continue
-        finally:
-            sys.path[:] = original_sys_path
-
-        return found
+
+def _call_on_main_thread(func, *args):
+    AppKit.NSOperationQueue.mainQueue().addOperationWithBlock_(lambda: func(*args))
 
 
 pipManager = PIPManager()
@@ -0,0 +1,299 @@
+"""
+Low overhead timing of functions and code blocks with an aggregating registry.
+
+Example:
+    from RFGadgets.profiler import profiled, timed, registry
+
+    @profiled()
+    def checkBounds(glyph):
+        ...
+
+    with timed("drawing"):
+        ...
+
+    print(registry.toCSV())
+
+The timings are measured with `time.perf_counter_ns` and aggregated per name
+(count, total, min, max and a histogram), nothing is printed. Set
+`RFGadgets.profiler.ENABLED = False` before the decorated modules are
+imported to get the bare functions back without any wrapper.
+"""
+import csv
+import functools
+import io
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+ENABLED = True
+
+# upper bounds of the histogram buckets in nanoseconds: 10µs, 100µs, 1ms,
+# 10ms, 100ms, 1s and the rest
+BUCKET_BOUNDS_NS: Tuple[int, ...] = (
+    10_000,
+    100_000,
+    1_000_000,
+    10_000_000,
+    100_000_000,
+    1_000_000_000,
+)
+BUCKET_LABELS: Tuple[str, ...] = (
+    "<10us",
+    "<100us",
+    "<1ms",
+    "<10ms",
+    "<100ms",
+    "<1s",
+    ">=1s",
+)
+
+
+class TimingStats:
+    """
+    Aggregated timings of one name. Durations are stored in nanoseconds.
+
+    With a `sampleSize` the last durations are kept for the percentiles, and
+    with a `slowestSize` the keys of the slowest calls (e.g. glyph names)
+    are kept.
+    """
+
+    __slots__ = (
+        "count",
+        "total",
+        "minimum",
+        "maximum",
+        "buckets",
+        "_samples",
+        "_slowest",
+        "_slowestSize",
+    )
+
+    def __init__(self, sampleSize: int = 0, slowestSize: int = 0) -> None:
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self._samples = deque(maxlen=sampleSize) if sampleSize else None
+        self._slowest: Optional[Dict[Hashable, int]] = {} if slowestSize else None
+        self._slowestSize = slowestSize
+
+    def add(self, durationNs: int, weight: int = 1, key: Optional[Hashable] = None) -> None:
+        self.count += weight
+        self.total += durationNs * weight
+        if self.minimum is None or durationNs < self.minimum:
+            self.minimum = durationNs
+        if durationNs > self.maximum:
+            self.maximum = durationNs
+        for i, bound in enumerate(BUCKET_BOUNDS_NS):
+            if durationNs < bound:
+                self.buckets[i] += weight
+                break
+        else:
+            self.buckets[-1] += weight
+        if self._samples is not None:
+            self._samples.append(durationNs)
+        if key is not None and self._slowest is not None:
+            self._addSlowest(key, durationNs)
+
+    def _addSlowest(self, key: Hashable, durationNs: int) -> None:
+        slowest = self._slowest
+        if key in slowest:
+            if durationNs > slowest[key]:
+                slowest[key] = durationNs
+        elif len(slowest) < self._slowestSize:
+            slowest[key] = durationNs
+        else:
+            fastest = min(slowest, key=slowest.get)
+            if durationNs > slowest[fastest]:
+                del slowest[fastest]
+                slowest[key] = durationNs
+
+    def percentile(self, percent: float) -> int:
+        """
+        Returns the percentile of the sampled durations in nanoseconds.
+        """
+        if not self._samples:
+            return 0
+        samples = sorted(self._samples)
+        index = min(int(round(percent / 100 * (len(samples) - 1))), len(samples) - 1)
+        return samples[index]
+
+    def slowest(self) -> List[Hashable]:
+        if not self._slowest:
+            return []
+        return sorted(self._slowest, key=self._slowest.get, reverse=True)
+
+    def asDict(self) -> Dict[str, Any]:
+        """
+        Returns the statistics, durations are in milliseconds.
+        """
+        result = {
+            "count": self.count,
+            "total": self.total / 1e6,
+            "mean": self.total / self.count / 1e6 if self.count else 0.0,
+            "min": (self.minimum or 0) / 1e6,
+            "max": self.maximum / 1e6,
+            "histogram": dict(zip(BUCKET_LABELS, self.buckets)),
+        }
+        if self._samples is not None:
+            result["p50"] = self.percentile(50) / 1e6
+            result["p99"] = self.percentile(99) / 1e6
+        if self._slowest is not None:
+            result["slowest"] = self.slowest()
+        return result
+
+
+class TimingRegistry:
+    """
+    Thread-safe registry of `TimingStats` by name.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, TimingStats] = {}
+
+    def record(self, name: str, durationNs: int, weight: int = 1) -> None:
+        """
+        Adds a duration to the stats of the name. If the calls are sampled,
+        `weight` is the number of calls that the measured call represents.
+        """
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = TimingStats()
+            stats.add(durationNs, weight)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: stats.asDict() for name, stats in sorted(self._stats.items())}
+
+    def toJSON(self, path: Optional[str] = None, **kwargs: Any) -> str:
+        """
+        Returns the snapshot as JSON, and writes it to the path if given.
+        """
+        text = json.dumps(self.snapshot(), **kwargs)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def toCSV(self, path: Optional[str] = None) -> str:
+        """
+        Returns the snapshot as CSV with one row per name, and writes it to
+        the path if given.
+        """
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(
+            ["name", "count", "total_ms", "mean_ms", "min_ms", "max_ms"]
+            + list(BUCKET_LABELS)
+        )
+        for name, stats in self.snapshot().items():
+            writer.writerow(
+                [
+                    name,
+                    stats["count"],
+                    f"{stats['total']:.6f}",
+                    f"{stats['mean']:.6f}",
+                    f"{stats['min']:.6f}",
+                    f"{stats['max']:.6f}",
+                ]
+                + list(stats["histogram"].values())
+            )
+        text = output.getvalue()
+        if path is not None:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+        return text
+
+
+registry = TimingRegistry()
+
+
+def profiled(
+    name: Optional[str] = None,
+    sampleEvery: int = 1,
+    registry: TimingRegistry = registry,
+    enabled: Optional[bool] = None,
+) -> Callable[[Callable], Callable]:
+    """
+    Decorator that records the wall time of each call of the function.
+
+    Args:
+        name (str): Name of the timings, defaults to the qualified name of
+            the function.
+        sampleEvery (int): Only time one of every `sampleEvery` calls, the
+            measured call is counted `sampleEvery` times.
+        registry (TimingRegistry): Where the timings are recorded.
+        enabled (bool): If False, the function is returned as it is. Defaults
+            to the module level `ENABLED`.
+    """
+    if enabled is None:
+        enabled = ENABLED
+
+    def decorator(func: Callable) -> Callable:
+        if not enabled:
+            return func
+        key = name or f"{func.__module__}.{func.__qualname__}"
+        record = registry.record
+        clock = time.perf_counter_ns
+
+        if sampleEvery <= 1:
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    record(key, clock() - start)
+
+        else:
+            calls = [0]
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                calls[0] += 1
+                if calls[0] % sampleEvery:
+                    return func(*args, **kwargs)
+                start = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    record(key, clock() - start, sampleEvery)
+
+        return wrapper
+
+    return decorator
+
+
+class timed:
+    """
+    Context manager that records the wall time of a block of code.
+
+    Example:
+        with timed("updateChanges"):
+            ...
+    """
+
+    __slots__ = ("name", "registry", "_start")
+
+    def __init__(self, name: str, registry: TimingRegistry = registry) -> None:
+        self.name = name
+        self.registry = registry
+        self._start = 0
+
+    def __enter__(self) -> "timed":
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if ENABLED:
+            self.registry.record(self.name, time.perf_counter_ns() - self._start)
@@ -0,0 +1,190 @@
+"""
+Measures where the startup time of the extension goes, per phase of the
+startup script and per imported module, like `python -X importtime` but
+only while the trace is running.
+
+Example:
+    trace = StartupTrace()
+    trace.start()
+    with trace.phase("subscribers"):
+        ...
+    trace.stop()
+    print(trace.summary())
+    trace.writeLog(path)
+"""
+import sys
+import time
+import logging
+import logging.handlers
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+from typing import Dict, List, Optional, Tuple
+
+LOGGER_NAME = "fontgadgets.startup"
+TOP_COUNT = 15
+
+
+class _TimedLoader:
+    """
+    Wraps the loader of a module spec to time the execution of the module.
+    The original loader is put back on the module once it is executed.
+    """
+
+    def __init__(self, loader, trace: "StartupTrace") -> None:
+        self._loader = loader
+        self._trace = trace
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        create = getattr(self._loader, "create_module", None)
+        if create is None:
+            return None
+        return create(spec)
+
+    def exec_module(self, module):
+        name = module.__name__
+        trace = self._trace
+        trace._enterModule()
+        start = time.perf_counter_ns()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            trace._exitModule(name, time.perf_counter_ns() - start)
+            module.__loader__ = self._loader
+            spec = getattr(module, "__spec__", None)
+            if spec is not None and spec.loader is self:
+                spec.loader = self._loader
+
+
+class _TimingFinder(MetaPathFinder):
+    def __init__(self, trace: "StartupTrace") -> None:
+        self._trace = trace
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                loader = spec.loader
+                if loader is not None and hasattr(loader, "exec_module"):
+                    spec.loader = _TimedLoader(loader, self._trace)
+                return spec
+        return None
+
+
+class StartupTrace:
+    """
+    Records the wall time of named phases and of the modules imported while
+    the trace is running. The module timings are cumulative (including the
+    modules they import) and self (excluding them), in nanoseconds.
+
+    Args:
+        startedAt (int): `time.perf_counter_ns()` of when the startup began,
+            if it was before the trace could be created.
+    """
+
+    def __init__(self, startedAt: Optional[int] = None) -> None:
+        self.phases: List[Tuple[str, int]] = []
+        self.modules: Dict[str, List[int]] = {}
+        self._childTimes: List[int] = []
+        self._finder: Optional[_TimingFinder] = None
+        self._startedAt = startedAt
+        self.total = 0
+
+    @property
+    def isRunning(self) -> bool:
+        return self._finder is not None
+
+    def start(self) -> None:
+        if self._finder is not None:
+            return
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+        if self._startedAt is None:
+            self._startedAt = time.perf_counter_ns()
+
+    def stop(self) -> None:
+        """
+        Stops tracing the imports and sets the total time. The total is also
+        set if only the phases were timed.
+        """
+        if self._finder is not None:
+            try:
+                sys.meta_path.remove(self._finder)
+            except ValueError:
+                pass
+            self._finder = None
+        if self._startedAt is not None:
+            self.total = time.perf_counter_ns() - self._startedAt
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter_ns() - start))
+
+    def addPhase(self, name: str, duration: int) -> None:
+        """
+        Adds a phase that was measured outside of the trace, in nanoseconds.
+        """
+        self.phases.append((name, duration))
+
+    def _enterModule(self) -> None:
+        self._childTimes.append(0)
+
+    def _exitModule(self, name: str, duration: int) -> None:
+        children = self._childTimes.pop()
+        if self._childTimes:
+            self._childTimes[-1] += duration
+        self.modules[name] = [duration, duration - children]
+
+    def topModules(self, count: int = TOP_COUNT) -> List[Tuple[str, int, int]]:
+        """
+        Returns `(name, cumulative, self)` of the modules with the highest
+        self time.
+        """
+        rows = [(name, t[0], t[1]) for name, t in self.modules.items()]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:count]
+
+    def summary(self, count: int = TOP_COUNT) -> str:
+        lines = [f"FontGadgets startup: {self.total / 1e6:.1f} ms"]
+        lines.append(f"{'phase':<40} {'ms':>9}")
+        for name, duration in self.phases:
+            lines.append(f"{name:<40} {duration / 1e6:>9.2f}")
+        lines.append("")
+        title = f"modules ({len(self.modules)}), top by self time"
+        lines.append(f"{title:<40} {'self ms':>9} {'cumul ms':>9}")
+        for name, cumulative, selfTime in self.topModules(count):
+            lines.append(f"{name:<40} {selfTime / 1e6:>9.2f} {cumulative / 1e6:>9.2f}")
+        return "\n".join(lines)
+
+    def writeLog(
+        self,
+        path: str,
+        count: int = TOP_COUNT,
+        maxBytes: int = 256 * 1024,
+        backupCount: int = 3,
+    ) -> None:
+        """
+        Appends the summary to a log file, which is rotated once it gets
+        larger than `maxBytes`.
+        """
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=maxBytes, backupCount=backupCount, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s\n%(message)s\n"))
+        logger.addHandler(handler)
+        try:
+            logger.info(self.summary(count))
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
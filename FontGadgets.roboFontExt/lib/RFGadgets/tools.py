@@ -1,54 +1,81 @@
 import time
 import importlib
-from types import ModuleType
 import AppKit
 from warnings import warn
 import logging
 import sys
+from RFGadgets.profiler import registry
+from RFGadgets.moduleReloader import ModuleReloader
 
 logger = logging.getLogger('fontgadgets.timer')
 handler = logging.StreamHandler(sys.stdout)
 logger.addHandler(handler)
+# each timed call is printed by default, set the level to WARNING to hide them
+logger.setLevel(logging.DEBUG)
 
 def reloadSubModules(moduleName, skipSubModules=set(), skipPaths=set()):
 	"""
 	Use this inside RF to reload your packages when you're editing their code.
+	All the imported submodules are reloaded, the ones that are imported by the
+	others first. Use `reloadChanged` to only reload the changed modules.
 	"""
+	assert isinstance(moduleName, str), "The 'moduleName' argument should be a string type!"
 	try:
-		module = importlib.import_module(moduleName)
+		importlib.import_module(moduleName)
 	except ModuleNotFoundError:
 		return skipSubModules, skipPaths
-
-	assert isinstance(moduleName, str), "The 'moduleName' argument should be a string type!"
-	for attributeName in dir(module):
-		if attributeName in skipSubModules:
+	reloader = ModuleReloader([moduleName])
+	names = []
+	for name, path in reloader.trackedModules().items():
+		if name.rpartition('.')[2] in skipSubModules or name in skipSubModules or path in skipPaths:
 			continue
-		fullAttrName = f"{module.__name__}.{attributeName}"
-		attribute = getattr(module, attributeName)
-		if isinstance(attribute, ModuleType):
-			if not hasattr(attribute, '__file__') or attribute.__file__ in skipPaths:
-				continue
-			skipPaths.add(attribute.__file__)
-			skipSubModules.add(fullAttrName)
-			skipSubModules, skipPaths = reloadSubModules(fullAttrName, skipSubModules, skipPaths)
-	importlib.reload(module)
+		names.append(name)
+		skipSubModules.add(name)
+		skipPaths.add(path)
+	for name in reloader.reloadOrder(names):
+		importlib.reload(sys.modules[name])
 	return skipSubModules, skipPaths
 
+_reloaders = {}
+
+def reloadChanged(packageNames=("fontgadgets",), afterReload=None):
+	"""
+	Reloads the modules of the given packages whose files changed since the
+	previous call (or since they were imported) and the modules that import
+	them, in the order of their imports. The reload time of each module is
+	logged and recorded in `RFGadgets.profiler.registry`. Returns the
+	`RFGadgets.moduleReloader.ReloadReport`.
+	"""
+	key = tuple(packageNames)
+	reloader = _reloaders.get(key)
+	if reloader is None:
+		reloader = _reloaders[key] = ModuleReloader(key)
+	report = reloader.reload(afterReload=afterReload)
+	for name, duration in report.timings:
+		registry.record(f"reload:{name}", duration)
+	logger.debug(str(report))
+	return report
+
 def timeit(method):
 	"""
-	A decorator that makes it possible to time functions.
+	A decorator that makes it possible to time functions. The timings are also
+	recorded in `RFGadgets.profiler.registry`, use `RFGadgets.profiler.profiled`
+	to only aggregate them without logging each call. Each call is logged at
+	DEBUG level on the `fontgadgets.timer` logger, which prints them unless
+	its level is raised.
 	"""
+	name = method.__name__
+	key = f"{method.__module__}.{method.__qualname__}"
 	def timed(*args, **kw):
-		logger.setLevel(logging.DEBUG)
-		ts = time.time()
+		ts = time.perf_counter_ns()
 		result = method(*args, **kw)
-		te = time.time()
+		duration = time.perf_counter_ns() - ts
+		registry.record(key, duration)
 		if 'log_time' in kw:
-			name = kw.get('log_name', method.__name__.upper())
-			kw['log_time'][name] = int((te - ts) * 1000)
+			log_name = kw.get('log_name', name.upper())
+			kw['log_time'][log_name] = duration // 1000000
 		else:
-			logger.debug('%r  %2.2f ms' %(method.__name__, (te - ts) * 1000))
-		logger.setLevel(logging.WARNING)
+			logger.debug('%r  %2.2f ms', name, duration / 1e6)
 		return result
 	return timed
 
@@ -78,15 +105,20 @@ def reloadAll():
     """
     This functions is only used inside RF and can be used to relaod all the
     fontgadgets modules. This is used during the development of this package
-    inside RF.
+    inside RF. Only the changed modules and the modules that import them are
+    reloaded, see `reloadChanged`.
     """
     from fontgadgets import getEnvironment
     if getEnvironment() != "RoboFont":
     	raise EnvironmentError("`reloadAll` is only designed to be used inside RoboFont!")
     import fontgadgets.tools
 
-    reloadSubModules("fontgadgets.tools")
+    def afterReload(name, module):
+        if name == "fontgadgets.tools":
+            module.DEBUG = True
+
     fontgadgets.tools.DEBUG = True
-    reloadSubModules("fontgadgets", skipSubModules=set(["tools"]))
-    fontgadgets.tools.DEBUG = False
-    reloadSubModules("fontgadgets.robofont")
+    try:
+        return reloadChanged(["fontgadgets"], afterReload=afterReload)
+    finally:
+        sys.modules["fontgadgets.tools"].DEBUG = False
@@ -0,0 +1,165 @@
+"""
+Caches the results of the `RFGadgets.UI` helpers that scan the windows or
+the glyph collection, so tools that call them on every redraw don't pay the
+scan each time.
+
+The registry doesn't import AppKit, the values are computed by the given
+providers and a cached value is used as long as:
+
+- it wasn't invalidated (by a notification, see `RFGadgets.UI`), and
+- the token of its kind is the same as when it was computed, e.g. the
+  timestamp of the current event of the app for the selection, which
+  changes with every click or key press. The selection is only reused
+  within one event of the app.
+
+Each kind of value has a version that is incremented when a recomputed
+value is different from the previous one, so callers can ask if something
+changed since they last looked:
+
+    version = uiState.version
+    ...
+    if uiState.changedSince(version, SELECTION):
+        ...
+"""
+import weakref
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+WINDOWS = "windows"
+SELECTION = "selection"
+VISIBILITY = "visibility"
+KINDS = (WINDOWS, SELECTION, VISIBILITY)
+
+_MISSING = object()
+
+
+def _weak(obj: Any) -> Callable[[], Any]:
+    try:
+        return weakref.ref(obj)
+    except TypeError:
+        # objects without weak reference support are kept alive
+        return lambda: obj
+
+
+class UIStateRegistry:
+    """
+    Args:
+        windowsProvider: Returns the vanilla windows by name, like
+            `mojo.UI.getVanillaWindows`. The windows are kept with weak
+            references.
+        selectionProvider: Returns the selected glyph names.
+        visibilityProvider: Returns the visible glyph names of the current
+            font window.
+        tokens: Functions by kind that return a hashable value, a cached
+            value is recomputed when the token of its kind changed.
+    """
+
+    def __init__(
+        self,
+        windowsProvider: Callable[[], Dict[str, List[Any]]],
+        selectionProvider: Callable[[], List[str]],
+        visibilityProvider: Callable[[], List[str]],
+        tokens: Optional[Dict[str, Callable[[], Hashable]]] = None,
+    ) -> None:
+        self._providers = {
+            WINDOWS: windowsProvider,
+            SELECTION: selectionProvider,
+            VISIBILITY: visibilityProvider,
+        }
+        self._tokens = dict(tokens or {})
+        # kind: (token, value)
+        self._cache: Dict[str, Tuple[Hashable, Any]] = {}
+        self._keys: Dict[str, Any] = {}
+        self._versions = dict.fromkeys(KINDS, 0)
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        """
+        Incremented when any of the values changed.
+        """
+        return self._version
+
+    def versionOf(self, kind: str) -> int:
+        self._get(kind)
+        return self._versions[kind]
+
+    def changedSince(self, version: int, kind: Optional[str] = None) -> bool:
+        """
+        Returns True if the value of the given kind (or any value) changed
+        after `version`, a value of `version` from before.
+        """
+        kinds = KINDS if kind is None else (kind,)
+        for k in kinds:
+            self._get(k)
+            if self._versions[k] > version:
+                return True
+        return False
+
+    def invalidate(self, kind: Optional[str] = None) -> None:
+        if kind is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(kind, None)
+
+    def invalidateWindows(self, *args: Any) -> None:
+        self._cache.pop(WINDOWS, None)
+
+    def invalidateSelection(self, *args: Any) -> None:
+        self._cache.pop(SELECTION, None)
+
+    def invalidateVisibility(self, *args: Any) -> None:
+        self._cache.pop(VISIBILITY, None)
+
+    def _token(self, kind: str) -> Hashable:
+        tokenFunc = self._tokens.get(kind)
+        return None if tokenFunc is None else tokenFunc()
+
+    def _get(self, kind: str) -> Any:
+        token = self._token(kind)
+        cached = self._cache.get(kind, _MISSING)
+        if cached is not _MISSING and cached[0] == token:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        value, key = self._compute(kind)
+        self._cache[kind] = (token, value)
+        if key != self._keys.get(kind, _MISSING):
+            self._keys[kind] = key
+            self._version += 1
+            self._versions[kind] = self._version
+        return value
+
+    def _compute(self, kind: str) -> Tuple[Any, Any]:
+        value = self._providers[kind]()
+        if kind == WINDOWS:
+            refs = {
+                name: tuple(_weak(window) for window in windows)
+                for name, windows in value.items()
+            }
+            key = tuple(
+                (name, tuple(id(window) for window in windows))
+                for name, windows in value.items()
+            )
+            return refs, key
+        value = tuple(value)
+        return value, value
+
+    def vanillaWindows(self) -> Dict[str, List[Any]]:
+        refs = self._get(WINDOWS)
+        result = {}
+        for name, windowRefs in refs.items():
+            windows = [ref() for ref in windowRefs]
+            if None in windows:
+                # a window was released without a close notification
+                self.invalidateWindows()
+                return self.vanillaWindows()
+            result[name] = windows
+        return result
+
+    def selectedGlyphNames(self) -> Tuple[str, ...]:
+        return self._get(SELECTION)
+
+    def visibleGlyphNames(self) -> Tuple[str, ...]:
+        return self._get(VISIBILITY)
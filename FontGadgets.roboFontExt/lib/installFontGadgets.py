@@ -1,14 +1,32 @@
-import importlib
-from RFGadgets.pip import pipManager, PIP_PACKAGES
+import time
+startupStart = time.perf_counter_ns()
+import os
 from mojo.extensions import setExtensionDefault, getExtensionDefault
+# importing the package applies the RFGadgets.UI patches
+from RFGadgets.startupTrace import StartupTrace
+from RFGadgets import UI
+# the phases are always timed, the imported modules are only traced and the
+# log is only written when it's turned on
+traceStartup = bool(
+    os.environ.get("FONTGADGETS_TRACE_STARTUP")
+    or getExtensionDefault("design.bahman.fontgadgets.traceStartup", False)
+)
+startupTrace = StartupTrace(startedAt=startupStart)
+startupTrace.addPhase("RFGadgets.UI", time.perf_counter_ns() - startupStart)
+if traceStartup:
+    startupTrace.start()
+import importlib
+with startupTrace.phase("RFGadgets.pip"):
+    from RFGadgets.pip import pipManager, PIP_PACKAGES
 import sys
-import os
 import logging
-from RFGadgets.observers.startup import startActivatedObservers
-from RFGadgets import UI
+from RFGadgets.observers.startup import startActivatedObservers, startDeferredObservers
 """
 This is the start up script for robofont.
 """
+STARTUP_LOG_PATH = os.path.join(
+    os.path.dirname(pipManager.target_path), "FontGadgets-startup.log"
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -17,7 +35,10 @@ if (logger.hasHandlers()):
 handler = logging.StreamHandler()
 logger.addHandler(handler)
 
-logs = startActivatedObservers()
+# the subscribers don't wait for the pip check, the ones whose required
+# packages can't be imported yet are deferred until they are installed
+with startupTrace.phase("subscribers"):
+    logs = startActivatedObservers()
 logger.debug("\n".join(logs))
 
 root = os.path.dirname(__file__)
@@ -25,26 +46,36 @@ if root not in sys.path:
     sys.path.append(root)
 
 not_found_pip_packages = {}
-for import_name, package_spec in PIP_PACKAGES.items():
-    dist_name = import_name
-    if 'git+' in package_spec:
-        dist_name = 'fontgadgets'
+with startupTrace.phase("pip package check"):
+    for import_name, package_spec in PIP_PACKAGES.items():
+        dist_name = import_name
+        if 'git+' in package_spec:
+            dist_name = 'fontgadgets'
+
+        if not pipManager._is_package_installed(dist_name):
+             logger.warning(f"Package '{package_spec}' (as '{import_name}') will be installed.")
+             not_found_pip_packages[import_name] = package_spec
+        else:
+            logger.debug(f"Package '{package_spec}' (as '{import_name}') is already installed.")
+
+
+def reloadFontGadgets():
+    try:
+        import fontgadgets
+        importlib.reload(fontgadgets)
+    except ImportError as e:
+        logger.error(f"Failed to import a required module: {e}")
 
-    if not pipManager._is_package_installed(dist_name):
-         logger.warning(f"Package '{package_spec}' (as '{import_name}') will be installed.")
-         not_found_pip_packages[import_name] = package_spec
-    else:
-        logger.debug(f"Package '{package_spec}' (as '{import_name}') is already installed.")
 
 if not_found_pip_packages:
     installed_packages = getExtensionDefault(
         "design.bahman.fontgadgets.installedByPIP", fallback=[]
     )
-    for import_name, package_spec in not_found_pip_packages.items():
-        logger.warning(
-            f"Attempting installation of package '{package_spec}' ..."
-        )
-        if pipManager.install_package(package_spec, install_dependencies=False):
+
+    def installProgress(package_spec, status):
+        if status == "installing":
+            logger.warning(f"Attempting installation of package '{package_spec}' ...")
+        elif status == "installed":
             # if installation is successful, add it to the list and save immediately
             if package_spec not in installed_packages:
                 installed_packages.append(package_spec)
@@ -54,8 +85,27 @@ if not_found_pip_packages:
         else:
             logger.error(f"Installation of '{package_spec}' failed.")
 
-try:
-    import fontgadgets
-    importlib.reload(fontgadgets)
-except ImportError as e:
-    logger.error(f"Failed to import a required module: {e}")
+    def installDidFinish(results):
+        reloadFontGadgets()
+        logs = startDeferredObservers()
+        if logs:
+            logger.debug("\n".join(logs))
+
+    # pip runs in a worker thread, RoboFont stays usable while installing
+    pipManager.install_packages_in_background(
+        list(not_found_pip_packages.values()),
+        install_dependencies=False,
+        progress_callback=installProgress,
+        completion_callback=installDidFinish,
+    )
+else:
+    with startupTrace.phase("fontgadgets reload"):
+        reloadFontGadgets()
+
+startupTrace.stop()
+logger.debug(f"FontGadgets startup took {startupTrace.total / 1e6:.1f} ms")
+if traceStartup:
+    try:
+        startupTrace.writeLog(STARTUP_LOG_PATH)
+    except OSError as e:
+        logger.debug(f"Could not write the startup log: {e}")